@@ -0,0 +1,168 @@
+"""Benchmark GET /api/colleges (SQL filters, keyset pages) against the list-comprehension filter path
+
+Loads synthetic colleges into a SQLite file, checks that walking every page
+of each query returns exactly the colleges of the original filter chain,
+and times the first page against that filter.
+
+Usage: python benchmarks/bench_college_catalog.py [num_colleges]
+"""
+from datetime import datetime, timezone
+import os
+import random
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+
+from src.models.user import db
+from src.routes.colleges import COLLEGES, CollegeIndexes, colleges_bp
+from src.services.college_loader import load_colleges
+
+CATEGORIES = ['Engineering', 'Medical', 'Management', 'Law', 'Arts', 'Science', 'Pharmacy']
+STATES = ['Delhi', 'Maharashtra', 'Tamil Nadu', 'Karnataka', 'Gujarat', 'Uttar Pradesh',
+          'West Bengal', 'Kerala', 'Rajasthan', 'Telangana', 'Punjab', 'Bihar']
+TYPES = ['Government', 'Private', 'Deemed', 'Autonomous']
+
+
+EXAMS = ['JEE Main', 'JEE Advanced', 'NEET UG', 'CAT', 'CLAT', 'CUET UG']
+NAME_PREFIXES = ['Institute of Technology', 'College of Engineering', 'Medical College',
+                 'School of Management', 'University', 'Law School', 'Institute of Science']
+CITY_COORDINATES = {
+    'Mumbai': (19.08, 72.88), 'Pune': (18.52, 73.86), 'Chennai': (13.08, 80.27), 'Bengaluru': (12.97, 77.59),
+    'Hyderabad': (17.39, 78.49), 'Kolkata': (22.57, 88.36), 'Jaipur': (26.91, 75.79), 'Lucknow': (26.85, 80.95),
+    'Patna': (25.59, 85.14), 'Kochi': (9.93, 76.27), 'Ahmedabad': (23.02, 72.57), 'Bhopal': (23.26, 77.41),
+    'Indore': (22.72, 75.86), 'Nagpur': (21.15, 79.09), 'Surat': (21.17, 72.83), 'Varanasi': (25.32, 82.97)
+}
+CITIES = list(CITY_COORDINATES)
+
+
+def make_colleges(count, seed=7):
+    rng = random.Random(seed)
+    colleges = []
+    for college_id in range(1, count + 1):
+        state = rng.choice(STATES)
+        city = rng.choice(CITIES)
+        exam_name = rng.choice(EXAMS)
+        closing_rank = rng.randint(100, 200000)
+        city_lat, city_lon = CITY_COORDINATES[city]
+        colleges.append({
+            'id': college_id,
+            'name': f'{city} {rng.choice(NAME_PREFIXES)} {college_id}',
+            'full_name': f'{rng.choice(NAME_PREFIXES)} {city} Campus {college_id}',
+            'location': f'{city} Sector {rng.randint(1, 500)}, {state}',
+            'state': state,
+            'coordinates': {'lat': round(city_lat + rng.uniform(-0.5, 0.5), 5),
+                            'lon': round(city_lon + rng.uniform(-0.5, 0.5), 5)},
+            'type': rng.choice(TYPES),
+            'category': rng.choice(CATEGORIES),
+            'nirf_ranking': rng.randint(1, 1000),
+            'accepted_exams': [exam_name],
+            'cutoffs': {
+                exam_name: {
+                    category: {'rank': int(closing_rank * factor), 'percentile': round(100 - factor, 2)}
+                    for category, factor in (('general', 1), ('obc', 1.5), ('sc', 3), ('st', 4))
+                }
+            }
+        })
+    return colleges
+
+
+def legacy_filter(data, category=None, state=None, college_type=None, search='',
+                  min_ranking=None, max_ranking=None):
+    """The original get_all_colleges filter chain"""
+    colleges = data.copy()
+    if category:
+        colleges = [college for college in colleges if college['category'].lower() == category.lower()]
+    if state:
+        colleges = [college for college in colleges if college['state'].lower() == state.lower()]
+    if college_type:
+        colleges = [college for college in colleges if college['type'].lower() == college_type.lower()]
+    if search:
+        colleges = [college for college in colleges if
+                    search in college['name'].lower() or
+                    search in college['full_name'].lower() or
+                    search in college['location'].lower()]
+    if min_ranking:
+        colleges = [college for college in colleges if college['nirf_ranking'] >= min_ranking]
+    if max_ranking:
+        colleges = [college for college in colleges if college['nirf_ranking'] <= max_ranking]
+    return colleges
+
+
+QUERIES = [
+    {},
+    {'category': 'engineering'},
+    {'category': 'Engineering', 'state': 'delhi'},
+    {'category': 'Medical', 'state': 'Kerala', 'college_type': 'private'},
+    {'max_ranking': 50},
+    {'min_ranking': 100, 'max_ranking': 200, 'category': 'Law'},
+    {'search': 'sector 42'},
+    {'search': 'pune'},
+    {'search': 'a'},
+    {'state': 'Punjab', 'search': 'institute'}
+]
+
+
+# Query arguments of /api/colleges for each legacy_filter keyword
+ARGUMENTS = {'category': 'category', 'state': 'state', 'college_type': 'type', 'search': 'search',
+             'min_ranking': 'min_ranking', 'max_ranking': 'max_ranking'}
+
+
+def make_app(database_uri):
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = 'bench'
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_uri
+    app.register_blueprint(colleges_bp, url_prefix='/api')
+    db.init_app(app)
+    return app
+
+
+def list_ids(client, query, limit=100, pages=None):
+    """Ids of the colleges listed for query, walking up to pages pages (all by default)"""
+    ids, cursor = [], None
+    arguments = {ARGUMENTS[name]: value for name, value in query.items()}
+    while pages is None or pages > 0:
+        page_arguments = dict(arguments, limit=limit, fields='id')
+        if cursor:
+            page_arguments['cursor'] = cursor
+        body = client.get('/api/colleges', query_string=page_arguments).get_json()
+        ids.extend(college['id'] for college in body['colleges'])
+        cursor = body['next_cursor']
+        if not cursor:
+            break
+        pages = None if pages is None else pages - 1
+    return ids
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    colleges = make_colleges(count)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        app = make_app(f'sqlite:///{os.path.join(workdir, "bench.db")}')
+        build_time = timeit.timeit(
+            lambda: CollegeIndexes(colleges, datetime.now(timezone.utc)), number=1
+        )
+        COLLEGES.current = CollegeIndexes(colleges, datetime.now(timezone.utc))
+        with app.app_context():
+            db.create_all()
+            load_colleges(colleges)
+        client = app.test_client()
+        print(f'{count} colleges, catalog build {build_time * 1000:.1f} ms')
+        print(f'{"query":<70} {"legacy ms":>10} {"page 1 ms":>10}')
+
+        for query in QUERIES:
+            expected = [college['id'] for college in legacy_filter(colleges, **query)]
+            assert list_ids(client, query) == sorted(expected), f'result mismatch for {query}'
+
+            runs = 20
+            legacy = timeit.timeit(lambda: legacy_filter(colleges, **query), number=runs) / runs
+            first_page = timeit.timeit(lambda: list_ids(client, query, pages=1), number=runs) / runs
+            print(f'{str(query):<70} {legacy * 1000:>10.3f} {first_page * 1000:>10.3f}')
+
+
+if __name__ == '__main__':
+    main()
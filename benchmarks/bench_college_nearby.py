@@ -0,0 +1,67 @@
+"""Benchmark grid-indexed nearby college queries against a full distance scan
+
+Usage: python benchmarks/bench_college_nearby.py [num_colleges]
+"""
+import math
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_college_catalog import make_colleges
+from src.services.college_catalog import CollegeCatalog
+from src.services.geo_index import EARTH_RADIUS_KM
+
+QUERIES = [
+    {'lat': 19.07, 'lon': 72.87, 'radius_km': 5},
+    {'lat': 19.07, 'lon': 72.87, 'radius_km': 25, 'category': 'Engineering'},
+    {'lat': 12.97, 'lon': 77.59, 'radius_km': 100, 'college_type': 'Government'},
+    {'lat': 28.61, 'lon': 77.21, 'limit': 10},
+    {'lat': 22.0, 'lon': 79.0, 'limit': 20, 'category': 'Law', 'state': 'Kerala'}
+]
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0)))
+
+
+def scan_nearby(colleges, lat, lon, radius_km=None, limit=None, category=None, state=None, college_type=None):
+    """Distance to every matching college, sorted"""
+    found = []
+    for college in colleges:
+        if category and college['category'].lower() != category.lower():
+            continue
+        if state and college['state'].lower() != state.lower():
+            continue
+        if college_type and college['type'].lower() != college_type.lower():
+            continue
+        distance = haversine(lat, lon, college['coordinates']['lat'], college['coordinates']['lon'])
+        if radius_km is None or distance <= radius_km:
+            found.append((distance, college['id'], college))
+    found.sort(key=lambda item: item[:2])
+    return [(college, distance) for distance, _, college in found[:limit]]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    colleges = make_colleges(count)
+    catalog = CollegeCatalog(colleges)
+    print(f'{count} colleges')
+    print(f'{"query":<90} {"results":>8} {"scan ms":>9} {"grid ms":>9}')
+
+    for query in QUERIES:
+        expected = scan_nearby(colleges, **query)
+        actual = catalog.nearby(**query)
+        assert [college['id'] for college, _ in actual] == [college['id'] for college, _ in expected], query
+
+        runs = 20
+        scan = timeit.timeit(lambda: scan_nearby(colleges, **query), number=2) / 2
+        grid = timeit.timeit(lambda: catalog.nearby(**query), number=runs) / runs
+        print(f'{str(query):<90} {len(actual):>8} {scan * 1000:>9.3f} {grid * 1000:>9.3f}')
+
+
+if __name__ == '__main__':
+    main()
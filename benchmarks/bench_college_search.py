@@ -0,0 +1,44 @@
+"""Benchmark college autocomplete latency on a synthetic catalog
+
+Usage: python benchmarks/bench_college_search.py [num_colleges]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_college_catalog import make_colleges
+from src.services.college_catalog import CollegeCatalog
+
+QUERIES = [
+    'p',
+    'pune i',
+    'mumbai institute of tech',
+    'bengaluru sector 4',
+    'hyderbad',
+    'chenai medical',
+    'law school kochi',
+    'nothing like this'
+]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    colleges = make_colleges(count)
+
+    build_time = timeit.timeit(lambda: CollegeCatalog(colleges), number=1)
+    catalog = CollegeCatalog(colleges)
+    print(f'{count} colleges, index build {build_time * 1000:.1f} ms')
+    print(f'{"query":<30} {"results":>8} {"fuzzy":>6} {"ms":>8}')
+
+    for query in QUERIES:
+        suggestions = catalog.autocomplete(query, limit=10)
+        runs = 50
+        elapsed = timeit.timeit(lambda: catalog.autocomplete(query, limit=10), number=runs) / runs
+        fuzzy = sum(1 for _, is_fuzzy in suggestions if is_fuzzy)
+        print(f'{query:<30} {len(suggestions):>8} {fuzzy:>6} {elapsed * 1000:>8.3f}')
+
+
+if __name__ == '__main__':
+    main()
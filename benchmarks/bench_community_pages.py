@@ -0,0 +1,110 @@
+"""Benchmark: first vs deep pages of the community question listing
+
+Fills a SQLite file with synthetic questions, then walks each listing order
+by cursor and times page 1 against the last pages reached. With keyset
+pagination a deep page should cost about the same as the first.
+
+Usage: python benchmarks/bench_community_pages.py [num_questions] [pages]
+"""
+from datetime import datetime, timedelta
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+
+from src.models.community import Question, QuestionTag
+from src.models.user import User, db
+from src.routes.community import community_bp
+
+CATEGORIES = ['JEE Preparation', 'NEET Preparation', 'College Life', 'Career Guidance', 'Scholarships']
+TAGS = ['physics', 'chemistry', 'maths', 'biology', 'iit', 'nit', 'strategy', 'mock-tests', 'cutoffs', 'hostel']
+LIMIT = 50
+
+
+def make_app(database_uri):
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = 'bench'
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_uri
+    app.register_blueprint(community_bp, url_prefix='/api/community')
+    db.init_app(app)
+    return app
+
+
+def fill(count):
+    random.seed(25)
+    db.session.execute(db.insert(User), [{
+        'username': f'bench-{i}', 'email': f'bench-{i}@example.com', 'password_hash': 'x', 'full_name': f'User {i}'
+    } for i in range(100)])
+    user_ids = db.session.scalars(db.select(User.id)).all()
+    started = datetime.utcnow() - timedelta(days=365)
+
+    for first in range(0, count, 10000):
+        questions, tags = [], []
+        for number in range(first + 1, min(first + 10000, count) + 1):
+            category = random.choice(CATEGORIES)
+            created_at = started + timedelta(seconds=number * 30)
+            questions.append({
+                'id': number,
+                'user_id': random.choice(user_ids),
+                'title': f'Question {number} about preparation',
+                'content': 'How should I plan the next few months of preparation?',
+                'category': category,
+                'category_key': category.lower(),
+                'votes': random.randint(-5, 200),
+                'is_answered': random.random() < 0.6,
+                'created_at': created_at,
+                'updated_at': created_at
+            })
+            for position, tag in enumerate(random.sample(TAGS, 3), 1):
+                tags.append({'question_id': number, 'tag_key': tag, 'tag': tag, 'position': position,
+                             'created_at': created_at})
+        db.session.execute(db.insert(Question), questions)
+        db.session.execute(db.insert(QuestionTag), tags)
+    db.session.commit()
+
+
+def walk(client, params, pages):
+    """Milliseconds per page, walking up to pages pages by cursor"""
+    timings, cursor = [], None
+    for _ in range(pages):
+        query = dict(params, limit=LIMIT)
+        if cursor:
+            query['cursor'] = cursor
+        started = time.perf_counter()
+        response = client.get('/api/community/questions', query_string=query)
+        timings.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200
+        cursor = response.get_json()['next_cursor']
+        if not cursor:
+            break
+    return timings
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    pages = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+    with tempfile.TemporaryDirectory() as workdir:
+        app = make_app(f'sqlite:///{os.path.join(workdir, "bench.db")}')
+        with app.app_context():
+            db.create_all()
+            fill(count)
+        client = app.test_client()
+
+        print(f'{count} questions, {LIMIT} per page')
+        for params in ({}, {'sort_by': 'popular'}, {'sort_by': 'unanswered'},
+                       {'category': 'neet preparation'}, {'tag': 'physics'}):
+            timings = walk(client, params, pages)
+            deep = timings[-10:]
+            print(f'{str(params):40} page 1 {timings[0]:6.2f} ms, '
+                  f'pages {len(timings) - len(deep) + 1}-{len(timings)} median {statistics.median(deep):6.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
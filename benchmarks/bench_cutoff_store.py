@@ -0,0 +1,103 @@
+"""Benchmark the memory-mapped cutoff store on a synthetic multi-year cutoff CSV
+
+Checks latest-round recommendations against the in-memory catalog path and
+times recommendation and history queries.
+
+Usage: python benchmarks/bench_cutoff_store.py [num_colleges]
+"""
+import csv
+import os
+import random
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_college_catalog import make_colleges
+from src.services.college_catalog import CollegeCatalog
+from src.services.cutoff_store import CSV_COLUMNS, CutoffStore, build_cutoff_store
+
+EXAM = 'JEE Main'
+CATEGORIES = ['general', 'obc', 'sc', 'st']
+YEARS = range(2020, 2025)
+ROUNDS = range(1, 7)
+QUOTAS = ['AI', 'HS']
+PROGRAMS = ['CSE', 'ECE', 'ME', 'CE', 'EE']
+CATEGORY_FACTORS = {'general': 1, 'obc': 1.5, 'sc': 3, 'st': 4}
+
+
+def write_cutoff_csv(path, colleges, seed=11):
+    """Write one row per college x year x round x quota x program x category; returns the latest-round cutoffs"""
+    rng = random.Random(seed)
+    latest = {}
+    with open(path, 'w', newline='') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(CSV_COLUMNS)
+        for college in colleges:
+            base = rng.randint(500, 150000)
+            for year in YEARS:
+                for round_number in ROUNDS:
+                    for quota in QUOTAS:
+                        for program in PROGRAMS:
+                            closing = base * (1 + 0.05 * round_number) * rng.uniform(0.9, 1.1)
+                            for category in CATEGORIES:
+                                rank = int(closing * CATEGORY_FACTORS[category])
+                                writer.writerow((college['id'], EXAM, category, year, round_number,
+                                                 quota, program, rank, ''))
+                                if year == YEARS[-1] and round_number == ROUNDS[-1]:
+                                    key = (college['id'], category)
+                                    latest[key] = max(latest.get(key, 0), rank)
+    return latest
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    colleges = make_colleges(count)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        csv_path = os.path.join(workdir, 'cutoffs.csv')
+        store_path = os.path.join(workdir, 'store')
+        latest = write_cutoff_csv(csv_path, colleges)
+
+        build_time = timeit.timeit(lambda: build_cutoff_store(csv_path, store_path), number=1)
+        store = CutoffStore(store_path)
+        size = sum(os.path.getsize(os.path.join(store_path, name)) for name in os.listdir(store_path))
+        print(f'{len(store)} cutoff rows, build {build_time:.2f} s, '
+              f'{size / 1e6:.1f} MB on disk (CSV {os.path.getsize(csv_path) / 1e6:.1f} MB)')
+
+        # The latest round's most lenient cutoffs, as the in-memory catalog would hold them
+        for college in colleges:
+            college['accepted_exams'] = [EXAM]
+            college['cutoffs'] = {EXAM: {category: {'rank': latest[(college['id'], category)]}
+                                         for category in CATEGORIES}}
+        catalog = CollegeCatalog(colleges)
+
+        print(f'{"query":<40} {"matches":>8} {"catalog ms":>11} {"store ms":>9}')
+        for rank in (1000, 20000, 100000):
+            for category in ('general', 'sc'):
+                expected = [(college['id'], status) for college, status, _ in
+                            catalog.recommend(EXAM, rank, None, category)]
+                matches, _ = catalog.recommend_from_store(store, EXAM, rank, None, category)
+                assert [(college['id'], status) for college, status, _ in matches] == expected, (rank, category)
+
+                runs = 20
+                in_memory = timeit.timeit(lambda: catalog.recommend(EXAM, rank, None, category), number=runs) / runs
+                mapped = timeit.timeit(lambda: catalog.recommend_from_store(store, EXAM, rank, None, category),
+                                       number=runs) / runs
+                print(f'{f"rank {rank} {category}":<40} {len(matches):>8} '
+                      f'{in_memory * 1000:>11.3f} {mapped * 1000:>9.3f}')
+
+        college_id = colleges[count // 2]['id']
+        history = store.history(college_id)
+        runs = 50
+        elapsed = timeit.timeit(lambda: store.history(college_id), number=runs) / runs
+        points = sum(len(series['points']) for series in history)
+        print(f'history of one college: {len(history)} series, {points} points, {elapsed * 1000:.3f} ms')
+        elapsed = timeit.timeit(lambda: store.history(college_id, category='obc', quota='AI', program='CSE'),
+                                number=runs) / runs
+        print(f'history of one college, one series: {elapsed * 1000:.3f} ms')
+
+
+if __name__ == '__main__':
+    main()
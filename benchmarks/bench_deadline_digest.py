@@ -0,0 +1,64 @@
+"""Benchmark deadline digest generation over many synthetic profiles in a SQLite file
+
+Usage: python benchmarks/bench_deadline_digest.py [num_profiles]
+"""
+from datetime import date
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+
+from src.models.outbox import NotificationOutbox
+from src.models.user import UserProfile, db
+from src.routes.exams import EXAMS
+from src.services.deadline_digest import generate_deadline_digests
+
+# A day on which several of the built-in exams have deadlines in the next 30 days
+DIGEST_DAY = date(2025, 2, 10)
+
+
+def max_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    rng = random.Random(3)
+    exam_ids = [exam['id'] for exam in EXAMS.current.data]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{os.path.join(workdir, "bench.db")}'
+        db.init_app(app)
+        with app.app_context():
+            db.create_all()
+            for start in range(0, count, 10000):
+                db.session.execute(db.insert(UserProfile), [
+                    {'user_id': user_id, 'preferred_exams': json.dumps(rng.sample(exam_ids, rng.randint(0, 3)))}
+                    for user_id in range(start + 1, min(start + 10000, count) + 1)
+                ])
+            db.session.commit()
+            db.session.remove()
+
+            rss_before = max_rss_mb()
+            stats = generate_deadline_digests(EXAMS.current.data, today=DIGEST_DAY)
+            rss_after = max_rss_mb()
+            queued = db.session.scalar(db.select(db.func.count(NotificationOutbox.id)))
+
+            print(f"{stats['profiles']} profiles -> {stats['digests']} digests ({queued} in outbox) "
+                  f"in {stats['seconds']} s, {stats['profiles_per_second']} profiles/s")
+            print(f'peak RSS {rss_before:.0f} MB before, {rss_after:.0f} MB after')
+
+            # A second run for the same day replaces the unsent digests
+            generate_deadline_digests(EXAMS.current.data, today=DIGEST_DAY)
+            assert db.session.scalar(db.select(db.func.count(NotificationOutbox.id))) == queued
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""Benchmark pre-encoded catalog fragments against jsonify for list and detail responses
+
+Usage: python benchmarks/bench_fragments.py [num_colleges]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, jsonify
+
+from benchmarks.bench_college_catalog import make_colleges
+from src.services.fragments import FragmentCache, spliced_response
+from src.services.projection import parse_fields, projection_plan
+
+LIST_FIELDS = parse_fields('name,nirf_ranking,fees.annual')
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    colleges = make_colleges(count)
+    app = Flask(__name__)
+
+    build_time = timeit.timeit(lambda: FragmentCache('bench_colleges', colleges), number=1)
+    fragments = FragmentCache('bench_colleges', colleges)
+    print(f'{count} colleges, fragment cache build {build_time * 1000:.1f} ms')
+    print(f'{"response":<30} {"jsonify ms":>11} {"spliced ms":>11} {"speedup":>8} {"bytes":>16}')
+
+    cases = [
+        ('detail', lambda: jsonify({'college': colleges[0]}),
+         lambda: spliced_response({'college': fragments.get(colleges[0]['id'])})),
+        ('list of 50', lambda: jsonify({'colleges': colleges[:50], 'total': 50}),
+         lambda: spliced_response({'colleges': fragments.many(colleges[:50]), 'total': 50})),
+        ('list of 500', lambda: jsonify({'colleges': colleges[:500], 'total': 500}),
+         lambda: spliced_response({'colleges': fragments.many(colleges[:500]), 'total': 500})),
+        ('list of 500, ?fields=', lambda: jsonify({'colleges': colleges[:500], 'total': 500}),
+         lambda: spliced_response({'colleges': fragments.many(colleges[:500], LIST_FIELDS), 'total': 500}))
+    ]
+
+    with app.app_context():
+        for name, plain, spliced in cases:
+            expected = plain().get_json()
+            if name.endswith('?fields='):
+                expected['colleges'] = [projection_plan(LIST_FIELDS)(college) for college in expected['colleges']]
+            assert expected == spliced().get_json(), f'body mismatch for {name}'
+            runs = 200
+            plain_time = timeit.timeit(plain, number=runs) / runs
+            spliced_time = timeit.timeit(spliced, number=runs) / runs
+            sizes = f'{len(plain().data)} -> {len(spliced().data)}'
+            print(f'{name:<30} {plain_time * 1000:>11.3f} {spliced_time * 1000:>11.3f} '
+                  f'{plain_time / spliced_time:>7.1f}x {sizes:>16}')
+
+
+if __name__ == '__main__':
+    main()
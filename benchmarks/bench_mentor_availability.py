@@ -0,0 +1,110 @@
+"""Benchmark the bitmap availability engine on synthetic mentors and bookings
+
+Checks "which mentors are free in this window" against a per-mentor loop over
+the weekly patterns and times both.
+
+Usage: python benchmarks/bench_mentor_availability.py [num_mentors]
+"""
+from datetime import date, datetime, timedelta
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.mentor_availability import WEEKDAYS, MentorAvailability
+
+HORIZON_DAYS = 30
+FIRST_DAY = date(2025, 7, 1)
+
+
+def make_mentors(count, seed=5):
+    rng = random.Random(seed)
+    mentors = []
+    for mentor_id in range(1, count + 1):
+        starts = sorted(rng.sample(range(8, 22), rng.randint(1, 4)))
+        mentors.append({
+            'id': mentor_id,
+            'is_available': rng.random() < 0.9,
+            'availability': {
+                'days': rng.sample(WEEKDAYS, rng.randint(2, 6)),
+                'time_slots': [f'{hour:02d}:00-{hour + 1:02d}:00' for hour in starts]
+            }
+        })
+    return mentors
+
+
+def make_bookings(mentors, rate, seed=6):
+    """Book roughly rate of all slots in the horizon"""
+    rng = random.Random(seed)
+    bookings = []
+    for mentor in mentors:
+        for offset in range(HORIZON_DAYS):
+            day = FIRST_DAY + timedelta(days=offset)
+            if day.strftime('%A') not in mentor['availability']['days']:
+                continue
+            for time_slot in mentor['availability']['time_slots']:
+                if rng.random() < rate:
+                    start = datetime.strptime(time_slot.split('-')[0], '%H:%M').time()
+                    bookings.append((mentor['id'], datetime.combine(day, start)))
+    return bookings
+
+
+def free_in_window_loop(mentors, bookings, start, end):
+    """The same query as a loop over every mentor, day and slot"""
+    booked = set(bookings)
+    matches = []
+    for mentor in mentors:
+        if not mentor['is_available']:
+            continue
+        slots = []
+        day = start.date()
+        while day <= end.date():
+            if day.strftime('%A') in mentor['availability']['days']:
+                for time_slot in sorted(mentor['availability']['time_slots']):
+                    slot_start = datetime.combine(day, datetime.strptime(time_slot.split('-')[0], '%H:%M').time())
+                    if start <= slot_start < end and (mentor['id'], slot_start) not in booked:
+                        slots.append((slot_start, time_slot))
+            day += timedelta(days=1)
+        if slots:
+            matches.append((mentor['id'], slots))
+    return matches
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    mentors = make_mentors(count)
+    bookings = make_bookings(mentors, rate=0.3)
+
+    build = timeit.timeit(lambda: MentorAvailability(mentors), number=1)
+    availability = MentorAvailability(mentors)
+    print(f'{count} mentors, {len(bookings)} bookings, compiled in {build * 1000:.1f} ms')
+
+    runs = 5
+    elapsed = timeit.timeit(lambda: availability.free(bookings, FIRST_DAY, HORIZON_DAYS), number=runs) / runs
+    print(f'free slots of every mentor over {HORIZON_DAYS} days: {elapsed * 1000:.1f} ms')
+
+    print(f'{"window":<28} {"mentors":>8} {"bitmap ms":>10} {"loop ms":>9}')
+    for hours in (2, 24, 24 * 7):
+        start = datetime.combine(FIRST_DAY + timedelta(days=3), datetime.min.time()).replace(hour=9)
+        end = start + timedelta(hours=hours)
+        days = ((end - timedelta(microseconds=1)).date() - start.date()).days + 1
+
+        def bitmap_query():
+            window_bookings = [booking for booking in bookings if start.date() <= booking[1].date() <= end.date()]
+            free = availability.free(window_bookings, start.date(), days)
+            return availability.free_in_window(free, availability.window_mask(start, end, start.date(), days),
+                                               start.date())
+
+        expected = free_in_window_loop(mentors, bookings, start, end)
+        assert bitmap_query() == expected, hours
+
+        bitmap = timeit.timeit(bitmap_query, number=runs) / runs
+        loop = timeit.timeit(lambda: free_in_window_loop(mentors, bookings, start, end), number=1)
+        print(f'{f"{hours} h from {start:%Y-%m-%d %H:%M}":<28} {len(expected):>8} '
+              f'{bitmap * 1000:>10.1f} {loop * 1000:>9.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""Load test: many students booking the same mentor slot at once
+
+Every request is released at the same moment from its own thread. Exactly one
+booking must succeed; the rest must get 409 quickly. Runs against a SQLite
+file unless a database URI is given (e.g. a scratch PostgreSQL database to
+test real concurrent inserts); only the rows it creates are removed afterwards.
+
+Usage: python benchmarks/bench_mentor_booking.py [num_students] [database_uri]
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+
+from src.models.mentorship import MentorBooking
+from src.models.user import User, db
+from src.routes.mentorship import MENTORS, mentorship_bp
+
+MENTOR_ID = 1
+
+
+def next_slot(mentor):
+    """(session_date, session_time) of the mentor's first slot on an available day next week or later"""
+    day = date.today() + timedelta(days=7)
+    while day.strftime('%A') not in mentor['availability']['days']:
+        day += timedelta(days=1)
+    return day.isoformat(), mentor['availability']['time_slots'][0].split('-')[0]
+
+
+def make_app(database_uri):
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = 'bench'
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_uri
+    app.register_blueprint(mentorship_bp, url_prefix='/api')
+    db.init_app(app)
+    return app
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    mentor = next(mentor for mentor in MENTORS.current.data if mentor['id'] == MENTOR_ID)
+    session_date, session_time = next_slot(mentor)
+    run = uuid.uuid4().hex[:8]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        database_uri = sys.argv[2] if len(sys.argv) > 2 else f'sqlite:///{os.path.join(workdir, "bench.db")}'
+        app = make_app(database_uri)
+        with app.app_context():
+            db.create_all()
+            db.session.execute(db.insert(User), [{
+                'username': f'bench-{run}-{i}',
+                'email': f'bench-{run}-{i}@example.com',
+                'password_hash': 'x',
+                'full_name': f'Student {i}'
+            } for i in range(count)])
+            db.session.commit()
+            user_ids = db.session.scalars(
+                db.select(User.id).where(User.username.startswith(f'bench-{run}-')).order_by(User.id)
+            ).all()
+
+        clients = []
+        for user_id in user_ids:
+            client = app.test_client()
+            with client.session_transaction() as client_session:
+                client_session['user_id'] = user_id
+            clients.append(client)
+
+        barrier = threading.Barrier(count)
+
+        def book(client):
+            barrier.wait()
+            started = time.perf_counter()
+            response = client.post(f'/api/mentors/{MENTOR_ID}/book', json={
+                'session_date': session_date,
+                'session_time': session_time
+            })
+            return response.status_code, time.perf_counter() - started
+
+        with ThreadPoolExecutor(max_workers=count) as pool:
+            results = list(pool.map(book, clients))
+
+        statuses = {}
+        for status, _ in results:
+            statuses[status] = statuses.get(status, 0) + 1
+        latencies = sorted(elapsed * 1000 for _, elapsed in results)
+        print(f'{count} concurrent bookings of one slot ({session_date} {session_time}): {statuses}')
+        print(f'latency ms: median {statistics.median(latencies):.1f}, '
+              f'p99 {latencies[int(len(latencies) * 0.99) - 1]:.1f}, max {latencies[-1]:.1f}')
+
+        with app.app_context():
+            booked = db.session.scalar(
+                db.select(db.func.count(MentorBooking.id)).where(MentorBooking.user_id.in_(user_ids))
+            )
+            db.session.execute(db.delete(MentorBooking).where(MentorBooking.user_id.in_(user_ids)))
+            db.session.execute(db.delete(User).where(User.id.in_(user_ids)))
+            db.session.commit()
+        print(f'{booked} booking row(s) stored')
+        assert statuses.get(201) == 1 and statuses.get(409) == count - 1 and booked == 1
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""Benchmark the sparse student-mentor matcher on synthetic students and mentors
+
+Checks a sample of students against scoring every mentor one by one, then
+times matching every student in chunks.
+
+Usage: python benchmarks/bench_mentor_matching.py [num_users] [num_mentors] [chunk_size]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.mentor_matching import FEATURE_WEIGHTS, MentorMatcher
+
+EXAMS = [
+    {'id': 1, 'name': 'JEE Main', 'stream': 'Engineering'},
+    {'id': 2, 'name': 'JEE Advanced', 'stream': 'Engineering'},
+    {'id': 3, 'name': 'NEET UG', 'stream': 'Medical'},
+    {'id': 4, 'name': 'CUET UG', 'stream': 'University Admissions'},
+    {'id': 5, 'name': 'BITSAT', 'stream': 'Engineering'},
+    {'id': 6, 'name': 'CAT', 'stream': 'Management'},
+    {'id': 7, 'name': 'CLAT', 'stream': 'Law'}
+]
+COLLEGES = [{'id': i, 'name': name} for i, name in enumerate([
+    'IIT Delhi', 'IIT Bombay', 'IIT Madras', 'NIT Trichy', 'NIT Warangal', 'AIIMS Delhi',
+    'IIM Ahmedabad', 'IIM Bangalore', 'NLSIU Bangalore', 'BITS Pilani', 'Delhi University'
+], start=1)]
+TRACKS = ['Medical Career Guidance', 'MBA Admissions', 'Career Switch', 'Legal Studies', 'NIT Admissions']
+EXPERTISE = ['JEE Preparation', 'NEET Preparation', 'Campus Life', 'Placements', 'Time Management']
+STREAMS = ['Engineering', 'Medical', 'Management', 'Law', None]
+COUNT = 10
+
+
+def make_mentors(count, seed=8):
+    rng = random.Random(seed)
+    return [{
+        'id': mentor_id,
+        'college': rng.choice(COLLEGES)['name'],
+        'specializations': rng.sample([exam['name'] for exam in EXAMS] + TRACKS, rng.randint(1, 3)),
+        'expertise': rng.sample(EXPERTISE, 2),
+        'rating': round(rng.uniform(3.5, 5.0), 1),
+        'is_available': rng.random() < 0.9
+    } for mentor_id in range(1, count + 1)]
+
+
+def make_users(count, seed=9):
+    rng = random.Random(seed)
+    names = [exam['name'] for exam in EXAMS]
+    return [(
+        rng.choice(STREAMS),
+        rng.sample(names + [exam['id'] for exam in EXAMS], rng.randint(0, 3)),
+        rng.sample([college['name'] for college in COLLEGES] + [college['id'] for college in COLLEGES],
+                   rng.randint(0, 2))
+    ) for _ in range(count)]
+
+
+def match_loop(matcher, mentors, mentor_features, user):
+    """Top matches of one student by scoring every mentor"""
+    features = matcher.user_features(*user)
+    scored = []
+    for mentor in mentors:
+        score = sum(FEATURE_WEIGHTS[feature[0]] for feature in features & mentor_features[mentor['id']])
+        if score:
+            scored.append((-score, -mentor['rating'], mentor['id']))
+    return [(mentor_id, -score) for score, _, mentor_id in sorted(scored)[:COUNT]]
+
+
+def main():
+    num_users = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    num_mentors = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    chunk_size = int(sys.argv[3]) if len(sys.argv) > 3 else 2000
+    mentors = make_mentors(num_mentors)
+    users = make_users(num_users)
+
+    started = time.perf_counter()
+    matcher = MentorMatcher(mentors, EXAMS, COLLEGES)
+    print(f'{num_mentors} mentors, {len(matcher.vocabulary)} features, '
+          f'encoded in {(time.perf_counter() - started) * 1000:.1f} ms')
+
+    started = time.perf_counter()
+    matches = []
+    for start in range(0, num_users, chunk_size):
+        chunk = users[start:start + chunk_size]
+        matches.extend(matcher.match([matcher.user_features(*user) for user in chunk], COUNT))
+    elapsed = time.perf_counter() - started
+    print(f'{num_users} users matched in chunks of {chunk_size}: {elapsed:.2f} s '
+          f'({num_users / elapsed:.0f} users/s)')
+
+    mentor_features = {mentor['id']: matcher._mentor_features(mentor) if mentor['is_available'] else set()
+                       for mentor in mentors}
+    sample = range(0, num_users, max(1, num_users // 200))
+    started = time.perf_counter()
+    for index in sample:
+        assert matches[index] == match_loop(matcher, mentors, mentor_features, users[index]), index
+    per_user = (time.perf_counter() - started) / len(sample)
+    print(f'per-mentor loop: {per_user * 1000:.1f} ms/user, about {per_user * num_users:.0f} s for every user')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""Benchmark the mentor ranking engine on a synthetic marketplace
+
+Checks the first pages of a listing and a search against filtering and fully
+sorting every mentor, and times both.
+
+Usage: python benchmarks/bench_mentor_ranking.py [num_mentors]
+"""
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.mentor_ranking import MentorRanker
+
+COLLEGES = ['IIT Delhi', 'IIT Bombay', 'NIT Trichy', 'AIIMS Delhi', 'BITS Pilani', 'Delhi University', 'IIIT Hyderabad']
+LOCATIONS = ['Delhi', 'Mumbai', 'Chennai', 'Pilani', 'Hyderabad', 'Bangalore', 'Kolkata']
+EXPERTISE = ['JEE Preparation', 'NEET Preparation', 'Computer Science', 'Campus Life', 'Placements',
+             'Medical Studies', 'Study Techniques', 'Time Management', 'Physics', 'Mathematics']
+SPECIALIZATIONS = ['JEE Main', 'JEE Advanced', 'BITSAT', 'NEET UG', 'AIIMS', 'CUET', 'CLAT']
+PAGE = 20
+
+
+def make_mentors(count, seed=7):
+    rng = random.Random(seed)
+    return [{
+        'id': mentor_id,
+        'college': rng.choice(COLLEGES),
+        'location': rng.choice(LOCATIONS),
+        'expertise': rng.sample(EXPERTISE, rng.randint(2, 4)),
+        'specializations': rng.sample(SPECIALIZATIONS, rng.randint(1, 3)),
+        'rating': round(rng.uniform(3.5, 5.0), 1),
+        'reviews_count': rng.randint(0, 200),
+        'success_stories': rng.randint(0, 60),
+        'pricing': {'per_session': rng.choice(range(299, 999, 50))},
+        'is_available': rng.random() < 0.8
+    } for mentor_id in range(1, count + 1)]
+
+
+def list_sorted(mentors, expertise, max_price):
+    """The listing as a filter over every mentor and a full sort"""
+    matches = [mentor for mentor in mentors if mentor['is_available']
+               and any(expertise in value.lower() for value in mentor['expertise'])
+               and mentor['pricing']['per_session'] <= max_price]
+    matches.sort(key=lambda mentor: (-mentor['rating'], mentor['id']))
+    return [mentor['id'] for mentor in matches[:PAGE]], len(matches)
+
+
+def search_sorted(mentors, ranker, target_exam, areas):
+    """The search as a filter over every mentor and a full sort by the search score"""
+    positions = [position for position, mentor in enumerate(mentors)
+                 if any(target_exam in value.lower() for value in mentor['specializations'])
+                 and any(area in value.lower() for area in areas for value in mentor['expertise'])]
+    positions.sort(key=lambda position: (-ranker.search_score[position], mentors[position]['id']))
+    return [mentors[position]['id'] for position in positions[:PAGE]], len(positions)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    mentors = make_mentors(count)
+
+    build = timeit.timeit(lambda: MentorRanker(mentors), number=1)
+    ranker = MentorRanker(mentors)
+    print(f'{count} mentors, indexed in {build * 1000:.1f} ms')
+
+    def list_ranked():
+        mask = ranker.available & ranker.text_mask('expertise', 'prep') & (ranker.price <= 600)
+        positions, _, total = ranker.top(mask, ranker.rating, PAGE)
+        return ranker.ids[positions].tolist(), total
+
+    def search_ranked():
+        mask = ranker.text_mask('specializations', 'jee')
+        mask &= ranker.text_mask('expertise', 'physics') | ranker.text_mask('expertise', 'computer')
+        positions, _, total = ranker.top(mask, ranker.search_score, PAGE)
+        return ranker.ids[positions].tolist(), total
+
+    cases = [
+        ('listing', list_ranked, lambda: list_sorted(mentors, 'prep', 600)),
+        ('search', search_ranked, lambda: search_sorted(mentors, ranker, 'jee', ['physics', 'computer'])),
+    ]
+    print(f'{"query":<10} {"matches":>8} {"ranked ms":>10} {"sorted ms":>10}')
+    runs = 5
+    for name, ranked, full_sort in cases:
+        expected = full_sort()
+        assert ranked() == expected, name
+        ranked_ms = timeit.timeit(ranked, number=runs) / runs * 1000
+        sorted_ms = timeit.timeit(full_sort, number=runs) / runs * 1000
+        print(f'{name:<10} {expected[1]:>8} {ranked_ms:>10.1f} {sorted_ms:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,14 @@
+import hmac
 import os
 import sys
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory
+import click
+from flask import Flask, request, send_from_directory
 from flask_cors import CORS
 from src.models.user import db
+from src.models.outbox import NotificationOutbox
 from src.routes.user import user_bp
 from src.routes.auth import auth_bp
 from src.routes.payments import payments_bp
@@ -13,6 +16,7 @@ from src.routes.exams import exams_bp
 from src.routes.colleges import colleges_bp
 from src.routes.mentorship import mentorship_bp
 from src.routes.community import community_bp
+from src.services.catalogs import install_reload_signal, refresh_catalogs
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
@@ -28,6 +32,10 @@ app.register_blueprint(colleges_bp, url_prefix='/api')
 app.register_blueprint(mentorship_bp, url_prefix='/api')
 app.register_blueprint(community_bp, url_prefix='/api/community')
 
+# Catalog data files are reloaded when they change on disk, or on SIGHUP
+app.before_request(refresh_catalogs)
+install_reload_signal(app)
+
 # Database configuration
 app.config["SQLALCHEMY_DATABASE_URI"] = (
     f"postgresql://{os.environ.get('PGUSER')}:{os.environ.get('PGPASSWORD')}@"
@@ -36,9 +44,90 @@ app.config["SQLALCHEMY_DATABASE_URI"] = (
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db.init_app(app)
 
-# Create database tables
+# Create database tables, upgrade tables from earlier versions, and bring the
+# college tables in line with the catalog file
 with app.app_context():
+    from src.services.schema_upgrade import upgrade_schema
+
     db.create_all()
+    upgrade_schema()
+    from src.routes.colleges import COLLEGES
+    from src.services.college_loader import sync_colleges
+
+    sync_colleges(COLLEGES.current.data, COLLEGES.current.version)
+
+@app.cli.command('upgrade-db')
+def upgrade_db_command():
+    """Add the columns and indexes newer versions added to existing tables (also done at startup)"""
+    from src.services.schema_upgrade import upgrade_schema
+
+    applied = upgrade_schema()
+    print(f'Applied: {", ".join(applied)}' if applied else 'Schema is up to date')
+
+@app.cli.command('load-colleges')
+def load_colleges_command():
+    """Import the college catalog file into the college tables (also done at startup and on reload)"""
+    from src.routes.colleges import COLLEGES
+    from src.services.college_loader import load_colleges
+
+    count = load_colleges(COLLEGES.current.data)
+    print(f'Loaded {count} colleges')
+
+@app.cli.command('build-cutoff-store')
+@click.argument('csv_path')
+@click.argument('output_dir')
+def build_cutoff_store_command(csv_path, output_dir):
+    """Convert a cutoff CSV into the memory-mapped store read via CUTOFF_STORE_PATH"""
+    from src.services.cutoff_store import build_cutoff_store
+
+    count = build_cutoff_store(csv_path, output_dir)
+    print(f'Wrote {count} cutoff rows to {output_dir}')
+
+@app.cli.command('send-deadline-digests')
+@click.option('--window-days', default=30, show_default=True, help='Include deadlines this many days ahead')
+@click.option('--batch-size', default=2000, show_default=True, help='Profiles per fetch and rows per insert')
+def send_deadline_digests_command(window_days, batch_size):
+    """Queue a deadline digest in the outbox for every user with a bookmarked exam closing soon"""
+    from src.routes.exams import EXAMS
+    from src.services.deadline_digest import generate_deadline_digests
+
+    def report(stats):
+        print(f"{stats['profiles']} profiles, {stats['digests']} digests, "
+              f"{stats['profiles_per_second']} profiles/s", end='\r')
+
+    stats = generate_deadline_digests(EXAMS.current.data, window_days=window_days, batch_size=batch_size, progress=report)
+    print(f"Scanned {stats['profiles']} profiles and queued {stats['digests']} digests "
+          f"in {stats['seconds']} s ({stats['profiles_per_second']} profiles/s)")
+
+@app.cli.command('suggest-mentors')
+@click.option('--count', default=10, show_default=True, help='Mentors suggested per user')
+@click.option('--chunk-size', default=2000, show_default=True, help='Users scored per sparse matrix product')
+def suggest_mentors_command(count, chunk_size):
+    """Match every user against the mentor catalog and store their top mentor suggestions"""
+    from src.routes.colleges import COLLEGES
+    from src.routes.exams import EXAMS
+    from src.routes.mentorship import MENTORS
+    from src.services.mentor_matching import generate_mentor_suggestions
+
+    def report(stats):
+        print(f"{stats['users']} users, {stats['suggested']} suggested, "
+              f"{stats['users_per_second']} users/s", end='\r')
+
+    stats = generate_mentor_suggestions(MENTORS.current.data, EXAMS.current.data, COLLEGES.current.data,
+                                        count=count, chunk_size=chunk_size, progress=report)
+    print(f"Matched {stats['users']} users and stored suggestions for {stats['suggested']} "
+          f"in {stats['seconds']} s ({stats['users_per_second']} users/s)")
+
+@app.cli.command('check-facets')
+def check_facets_command():
+    """Compare every maintained facet count against a full recount"""
+    from src.services.facets import FACET_COUNTERS, check_all
+
+    mismatches = check_all()
+    for name in FACET_COUNTERS:
+        print(f'{name}: {"MISMATCH " + str(mismatches[name]) if name in mismatches else "ok"}')
+    if mismatches:
+        raise SystemExit(1)
 
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
@@ -65,6 +154,33 @@ def health_check():
         'version': '1.0.0'
     }, 200
 
+# Conditional request (ETag) counters for the catalog endpoints
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    from src.services.etags import etag_stats
+
+    return etag_stats(), 200
+
+# Catalog file versions, and an on-demand reload for operators
+@app.route('/api/catalogs', methods=['GET'])
+def catalogs_status():
+    from src.services.catalogs import catalog_status
+
+    return catalog_status(), 200
+
+@app.route('/api/catalogs/reload', methods=['POST'])
+def reload_catalogs_now():
+    from src.services.catalogs import reload_catalogs
+
+    # Disabled unless CATALOG_RELOAD_TOKEN is set; callers send it as X-Reload-Token
+    token = os.environ.get('CATALOG_RELOAD_TOKEN')
+    if not token:
+        return {'error': 'Catalog reload is disabled'}, 403
+    if not hmac.compare_digest(request.headers.get('X-Reload-Token', ''), token):
+        return {'error': 'Invalid reload token'}, 403
+
+    return {'catalogs': reload_catalogs()}, 200
+
 # API documentation endpoint
 @app.route('/api/docs', methods=['GET'])
 def api_docs():
@@ -90,12 +206,18 @@ def api_docs():
                 'POST /api/exams/bookmark': 'Bookmark an exam',
                 'DELETE /api/exams/bookmark': 'Remove exam bookmark',
                 'GET /api/exams/bookmarks': 'Get bookmarked exams',
+                'GET /api/exams/bookmarks.ics': 'iCalendar feed of bookmarked exam dates (session or ?token=)',
+                'GET /api/exams/bookmarks/calendar-link': 'Get a subscription URL for the bookmarks calendar feed',
                 'GET /api/exams/recommendations': 'Get personalized exam recommendations'
             },
             'Colleges': {
-                'GET /api/colleges': 'Get all colleges with filtering',
+                'GET /api/colleges': 'Get colleges with filtering (cursor-paginated)',
                 'GET /api/colleges/{id}': 'Get college details',
+                'GET /api/colleges/{id}/cutoffs/trend': 'Get college cutoff history',
+                'GET /api/colleges/autocomplete': 'Autocomplete college names (typo-tolerant)',
+                'GET /api/colleges/nearby': 'Get colleges near a point (lat, lon, radius_km)',
                 'POST /api/colleges/recommendations': 'Get college recommendations based on scores',
+                'POST /api/colleges/recommendations/batch': 'Get recommendations for many students (NDJSON)',
                 'POST /api/colleges/compare': 'Compare multiple colleges',
                 'GET /api/colleges/categories': 'Get college categories',
                 'GET /api/colleges/states': 'Get college states',
@@ -104,20 +226,22 @@ def api_docs():
                 'DELETE /api/colleges/shortlist/{id}': 'Remove from shortlist'
             },
             'Mentorship': {
-                'GET /api/mentors': 'Get all mentors with filtering',
+                'GET /api/mentors': 'Get mentors by rating with filtering (cursor-paginated)',
                 'GET /api/mentors/{id}': 'Get mentor details',
-                'POST /api/mentors/search': 'Search mentors by criteria',
-                'POST /api/mentors/{id}/book': 'Book mentor session',
+                'POST /api/mentors/search': 'Search mentors by criteria, best matches first (cursor-paginated)',
+                'GET /api/mentors/free': 'Find mentors with an open slot in a time window (?start=&end=)',
+                'GET /api/mentors/suggested': 'Get mentors matched to the current user by the suggest-mentors job',
+                'POST /api/mentors/{id}/book': 'Book mentor session; the slot is held until hold_expires_at for payment',
                 'GET /api/mentors/{id}/availability': 'Get mentor availability',
                 'GET /api/bookings': 'Get user bookings',
                 'POST /api/bookings/{id}/cancel': 'Cancel booking',
-                'GET /api/mentors/{id}/reviews': 'Get mentor reviews',
+                'GET /api/mentors/{id}/reviews': 'Get mentor reviews with live rating totals (cursor-paginated)',
                 'POST /api/mentors/{id}/reviews': 'Add mentor review',
                 'GET /api/mentors/categories': 'Get mentor categories',
                 'GET /api/mentors/colleges': 'Get mentor colleges'
             },
             'Community': {
-                'GET /api/community/questions': 'Get all questions',
+                'GET /api/community/questions': 'Get questions, newest, most voted or unanswered first (cursor-paginated)',
                 'GET /api/community/questions/{id}': 'Get question details',
                 'POST /api/community/questions': 'Ask a question',
                 'POST /api/community/questions/{id}/answers': 'Post an answer',
@@ -132,7 +256,7 @@ def api_docs():
             },
             'Payments': {
                 'GET /api/payments/plans': 'Get payment plans',
-                'POST /api/payments/create-payment': 'Create payment intent',
+                'POST /api/payments/create-payment': 'Create payment intent for a plan (plan_id) or a held mentor booking (booking_id)',
                 'POST /api/payments/simulate-gateway/{id}': 'Simulate payment (demo)',
                 'POST /api/payments/verify-payment': 'Verify payment status',
                 'GET /api/payments/history': 'Get payment history',
@@ -140,6 +264,12 @@ def api_docs():
                 'POST /api/payments/cancel-subscription': 'Cancel subscription',
                 'POST /api/payments/refund': 'Request refund'
             },
+            'System': {
+                'GET /api/health': 'Health check',
+                'GET /api/cache/stats': 'ETag hit/miss counters and bytes saved',
+                'GET /api/catalogs': 'Catalog data file versions',
+                'POST /api/catalogs/reload': 'Reload every catalog data file (X-Reload-Token header)'
+            },
             'User Management': {
                 'GET /api/users': 'Get all users (admin)',
                 'GET /api/users/{id}': 'Get user details',
@@ -0,0 +1,122 @@
+from src.models.user import db
+from datetime import datetime
+import json
+
+class College(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(200), nullable=False)
+    full_name = db.Column(db.String(300), nullable=False)
+    location = db.Column(db.String(200), nullable=False)
+    state = db.Column(db.String(100), nullable=False)
+    type = db.Column(db.String(50), nullable=False)  # Government, Private, etc.
+    category = db.Column(db.String(50), nullable=False)  # Engineering, Medical, etc.
+    nirf_ranking = db.Column(db.Integer, nullable=True, index=True)
+    established = db.Column(db.Integer, nullable=True)
+    website = db.Column(db.String(300), nullable=True)
+
+    # Campus coordinates in decimal degrees
+    latitude = db.Column(db.Float, nullable=True)
+    longitude = db.Column(db.Float, nullable=True)
+
+    # Fees
+    fees_annual = db.Column(db.Integer, nullable=True)
+    fees_currency = db.Column(db.String(3), default='INR')
+    fees_category = db.Column(db.String(100), nullable=True)
+
+    # Nested details kept as JSON strings
+    accepted_exams = db.Column(db.Text, nullable=True)
+    placement = db.Column(db.Text, nullable=True)
+    facilities = db.Column(db.Text, nullable=True)
+    images = db.Column(db.Text, nullable=True)
+
+    description = db.Column(db.Text, nullable=True)
+    icon = db.Column(db.String(10), nullable=True)
+
+    # Relationships
+    courses = db.relationship('CollegeCourse', backref='college', lazy=True,
+                              order_by='CollegeCourse.position', cascade='all, delete-orphan')
+    cutoffs = db.relationship('CollegeCutoff', backref='college', lazy=True,
+                              order_by='CollegeCutoff.id', cascade='all, delete-orphan')
+
+    def __repr__(self):
+        return f'<College {self.name}>'
+
+    def to_dict(self):
+        cutoffs = {}
+        for cutoff in self.cutoffs:
+            cutoffs.setdefault(cutoff.exam, {})[cutoff.category] = cutoff.to_dict()
+
+        college = {
+            'id': self.id,
+            'name': self.name,
+            'full_name': self.full_name,
+            'location': self.location,
+            'state': self.state,
+            'type': self.type,
+            'category': self.category,
+            'nirf_ranking': self.nirf_ranking,
+            'established': self.established,
+            'website': self.website,
+            'fees': {
+                'annual': self.fees_annual,
+                'currency': self.fees_currency,
+                'category': self.fees_category
+            },
+            'courses': [course.name for course in self.courses],
+            'accepted_exams': json.loads(self.accepted_exams) if self.accepted_exams else [],
+            'cutoffs': cutoffs,
+            'placement': json.loads(self.placement) if self.placement else {},
+            'facilities': json.loads(self.facilities) if self.facilities else [],
+            'description': self.description,
+            'icon': self.icon,
+            'images': json.loads(self.images) if self.images else []
+        }
+        if self.latitude is not None and self.longitude is not None:
+            college['coordinates'] = {'lat': self.latitude, 'lon': self.longitude}
+        return college
+
+# Case-insensitive filter columns of /api/colleges
+db.Index('ix_college_category', db.func.lower(College.category), College.id)
+db.Index('ix_college_state', db.func.lower(College.state), College.id)
+db.Index('ix_college_type', db.func.lower(College.type), College.id)
+
+class CollegeCourse(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    college_id = db.Column(db.Integer, db.ForeignKey('college.id'), nullable=False, index=True)
+    position = db.Column(db.Integer, nullable=False, default=0)  # order within the college
+    name = db.Column(db.String(200), nullable=False)
+
+    def __repr__(self):
+        return f'<CollegeCourse {self.college_id} - {self.name}>'
+
+class CollegeCutoff(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    college_id = db.Column(db.Integer, db.ForeignKey('college.id'), nullable=False, index=True)
+    exam = db.Column(db.String(100), nullable=False)  # JEE Advanced, NEET UG, etc.
+    category = db.Column(db.String(20), nullable=False)  # general, obc, sc, st
+    rank = db.Column(db.Integer, nullable=True)
+    percentile = db.Column(db.Float, nullable=True)
+
+    __table_args__ = (
+        db.Index('ix_college_cutoff_exam_category_rank', 'exam', 'category', 'rank'),
+    )
+
+    def __repr__(self):
+        return f'<CollegeCutoff {self.college_id} {self.exam}/{self.category}>'
+
+    def to_dict(self):
+        cutoff = {}
+        if self.rank is not None:
+            cutoff['rank'] = self.rank
+        if self.percentile is not None:
+            cutoff['percentile'] = self.percentile
+        return cutoff
+
+class CatalogTableVersion(db.Model):
+    # Content version of the catalog data last loaded into a set of tables, for ETags of views reading them
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.String(16), nullable=False)
+    loaded_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<CatalogTableVersion {self.name} {self.version}>'
@@ -0,0 +1,136 @@
+from src.models.user import db
+from datetime import datetime
+
+class Question(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    title = db.Column(db.String(300), nullable=False)
+    content = db.Column(db.Text, nullable=False)
+    category = db.Column(db.String(100), nullable=False)
+    category_key = db.Column(db.String(100), nullable=False)  # lowercased category, for filtering
+
+    # Counters, updated in place with single UPDATE statements
+    votes = db.Column(db.Integer, nullable=False, default=0)
+    answers_count = db.Column(db.Integer, nullable=False, default=0)
+    views = db.Column(db.Integer, nullable=False, default=0)
+
+    is_answered = db.Column(db.Boolean, nullable=False, default=False)
+    best_answer_id = db.Column(db.Integer, nullable=True)
+    status = db.Column(db.String(20), nullable=False, default='open')
+
+    # Timestamps
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationships
+    author = db.relationship('User', lazy=True)
+    tags = db.relationship('QuestionTag', backref='question', lazy=True,
+                           order_by='QuestionTag.position', cascade='all, delete-orphan')
+    answers = db.relationship('Answer', backref='question', lazy=True, cascade='all, delete-orphan')
+
+    __table_args__ = (
+        # One index per listing order, newest id breaking ties, so every page is an index range scan
+        db.Index('ix_question_recent', 'created_at', 'id'),
+        db.Index('ix_question_popular', 'votes', 'id'),
+        db.Index('ix_question_unanswered', 'is_answered', 'created_at', 'id'),
+        db.Index('ix_question_category_recent', 'category_key', 'created_at', 'id'),
+        db.Index('ix_question_category_popular', 'category_key', 'votes', 'id'),
+        db.Index('ix_question_user', 'user_id', 'created_at'),
+    )
+
+    def __repr__(self):
+        return f'<Question {self.id}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'title': self.title,
+            'content': self.content,
+            'category': self.category,
+            'tags': [tag.tag for tag in self.tags],
+            'author': {
+                'id': self.author.id,
+                'username': self.author.username,
+                'reputation': 0,
+                'is_verified': self.author.is_verified
+            },
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat(),
+            'votes': self.votes,
+            'answers_count': self.answers_count,
+            'views': self.views,
+            'is_answered': self.is_answered,
+            'best_answer_id': self.best_answer_id,
+            'status': self.status
+        }
+
+class QuestionTag(db.Model):
+    question_id = db.Column(db.Integer, db.ForeignKey('question.id'), primary_key=True)
+    tag_key = db.Column(db.String(50), primary_key=True)  # lowercased tag, for filtering
+    tag = db.Column(db.String(50), nullable=False)
+    position = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, nullable=False)  # copy of the question's, so tag pages are ordered by index
+
+    __table_args__ = (
+        db.Index('ix_question_tag_recent', 'tag_key', 'created_at', 'question_id'),
+    )
+
+    def __repr__(self):
+        return f'<QuestionTag {self.question_id} {self.tag}>'
+
+class Answer(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    question_id = db.Column(db.Integer, db.ForeignKey('question.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    content = db.Column(db.Text, nullable=False)
+    votes = db.Column(db.Integer, nullable=False, default=0)
+    is_best_answer = db.Column(db.Boolean, nullable=False, default=False)
+    is_helpful = db.Column(db.Boolean, nullable=False, default=False)
+
+    # Timestamps
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    author = db.relationship('User', lazy=True)
+
+    __table_args__ = (
+        db.Index('ix_answer_question', 'question_id', 'is_best_answer', 'votes'),
+        db.Index('ix_answer_user', 'user_id', 'created_at'),
+    )
+
+    def __repr__(self):
+        return f'<Answer {self.id}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'question_id': self.question_id,
+            'content': self.content,
+            'author': {
+                'id': self.author.id,
+                'username': self.author.username,
+                'reputation': 0,
+                'is_verified': self.author.is_verified,
+                'college': None
+            },
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat(),
+            'votes': self.votes,
+            'is_best_answer': self.is_best_answer,
+            'is_helpful': self.is_helpful
+        }
+
+class QuestionFacetCount(db.Model):
+    # Maintained number of questions per category or tag, updated in the transaction adding or deleting them
+    facet = db.Column(db.String(20), primary_key=True)  # category, tag
+    key = db.Column(db.String(100), primary_key=True)  # lowercased value
+    label = db.Column(db.String(100), nullable=False)  # spelling of the first question counted
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        # Most used values first
+        db.Index('ix_question_facet_count', 'facet', 'count'),
+    )
+
+    def __repr__(self):
+        return f'<QuestionFacetCount {self.facet} {self.key} {self.count}>'
@@ -0,0 +1,128 @@
+from src.models.user import db
+from datetime import datetime
+import uuid
+
+class MentorBooking(db.Model):
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    mentor_id = db.Column(db.Integer, nullable=False)  # id in the mentor catalog
+
+    # The booked slot
+    slot_start = db.Column(db.DateTime, nullable=False)
+    slot_end = db.Column(db.DateTime, nullable=False)
+
+    # Booking details
+    session_type = db.Column(db.String(20), nullable=False, default='single')  # single, package_5, package_10
+    sessions_count = db.Column(db.Integer, nullable=False, default=1)
+    amount = db.Column(db.Float, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pending_payment')  # pending_payment, confirmed, completed, cancelled, expired
+    message = db.Column(db.Text, nullable=True)
+    hold_expires_at = db.Column(db.DateTime, nullable=True)  # UTC; a pending_payment booking holds its slot until then
+
+    # Timestamps
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    cancelled_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        # One booking per mentor slot, not counting cancelled ones or lapsed holds; the database picks the winner of a race
+        db.Index('uq_mentor_booking_slot', 'mentor_id', 'slot_start', unique=True,
+                 postgresql_where=db.text("status NOT IN ('cancelled', 'expired')"),
+                 sqlite_where=db.text("status NOT IN ('cancelled', 'expired')")),
+        db.Index('ix_mentor_booking_user_slot', 'user_id', 'slot_start'),
+        # Live and lapsed holds, read by the hold sweeper
+        db.Index('ix_mentor_booking_hold', 'status', 'hold_expires_at'),
+    )
+
+    def __repr__(self):
+        return f'<MentorBooking {self.mentor_id} {self.slot_start} {self.status}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'mentor_id': self.mentor_id,
+            'session_date': self.slot_start.strftime('%Y-%m-%d'),
+            'session_time': self.slot_start.strftime('%H:%M'),
+            'slot_end': self.slot_end.isoformat(),
+            'session_type': self.session_type,
+            'sessions_count': self.sessions_count,
+            'amount': self.amount,
+            'status': self.status,
+            'message': self.message,
+            'hold_expires_at': self.hold_expires_at.isoformat() if self.hold_expires_at else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'cancelled_at': self.cancelled_at.isoformat() if self.cancelled_at else None
+        }
+
+class MentorReview(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    mentor_id = db.Column(db.Integer, nullable=False)  # id in the mentor catalog
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    rating = db.Column(db.Integer, nullable=False)  # 1 to 5 stars
+    comment = db.Column(db.Text, nullable=True)
+    verified = db.Column(db.Boolean, nullable=False, default=False)  # reviewer had a session with the mentor
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # One review per student and mentor
+        db.UniqueConstraint('mentor_id', 'user_id', name='uq_mentor_review_user'),
+        # Newest-first keyset pages of a mentor's reviews
+        db.Index('ix_mentor_review_mentor_id', 'mentor_id', 'id'),
+    )
+
+    def __repr__(self):
+        return f'<MentorReview {self.mentor_id} {self.rating}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'mentor_id': self.mentor_id,
+            'user_name': 'Anonymous Student',
+            'rating': self.rating,
+            'comment': self.comment,
+            'date': self.created_at.strftime('%Y-%m-%d') if self.created_at else None,
+            'verified': self.verified
+        }
+
+class MentorRatingAggregate(db.Model):
+    # Running totals of a mentor's stored reviews, updated in the same transaction as each review
+    mentor_id = db.Column(db.Integer, primary_key=True)
+    reviews_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum = db.Column(db.Integer, nullable=False, default=0)
+
+    # Star histogram
+    stars_1 = db.Column(db.Integer, nullable=False, default=0)
+    stars_2 = db.Column(db.Integer, nullable=False, default=0)
+    stars_3 = db.Column(db.Integer, nullable=False, default=0)
+    stars_4 = db.Column(db.Integer, nullable=False, default=0)
+    stars_5 = db.Column(db.Integer, nullable=False, default=0)
+
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f'<MentorRatingAggregate {self.mentor_id} {self.reviews_count}>'
+
+    def to_dict(self):
+        return {
+            'mentor_id': self.mentor_id,
+            'reviews_count': self.reviews_count,
+            'rating_sum': self.rating_sum,
+            'rating_histogram': {str(stars): getattr(self, f'stars_{stars}') for stars in range(1, 6)},
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+class MentorSuggestion(db.Model):
+    # Written by the suggest-mentors job; one row per user so the endpoint reads it by primary key
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    mentors = db.Column(db.Text, nullable=False)  # JSON list of [mentor_id, score], best first
+    computed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<MentorSuggestion {self.user_id}>'
+
+    def to_dict(self):
+        return {
+            'user_id': self.user_id,
+            'mentors': self.mentors,
+            'computed_at': self.computed_at.isoformat() if self.computed_at else None
+        }
@@ -0,0 +1,30 @@
+from src.models.user import db
+from datetime import datetime
+
+class NotificationOutbox(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    kind = db.Column(db.String(50), nullable=False)  # deadline_digest, etc.
+    digest_date = db.Column(db.Date, nullable=False)  # day the notification was generated for
+    payload = db.Column(db.Text, nullable=False)  # JSON string
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)  # set by the sender once delivered
+
+    __table_args__ = (
+        db.Index('ix_notification_outbox_kind_date_user', 'kind', 'digest_date', 'user_id'),
+        db.Index('ix_notification_outbox_unsent', 'sent_at', 'id'),
+    )
+
+    def __repr__(self):
+        return f'<NotificationOutbox {self.kind} {self.user_id} {self.digest_date}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'kind': self.kind,
+            'digest_date': self.digest_date.isoformat() if self.digest_date else None,
+            'payload': self.payload,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'sent_at': self.sent_at.isoformat() if self.sent_at else None
+        }
@@ -70,6 +70,7 @@ class Payment(db.Model):
     # Service details
     service_type = db.Column(db.String(50), nullable=False)  # premium, mentorship, etc.
     service_duration = db.Column(db.Integer, nullable=True)  # in days
+    booking_id = db.Column(db.String(36), nullable=True)  # MentorBooking paid for, for mentorship payments
     
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -93,6 +94,7 @@ class Payment(db.Model):
             'gateway_payment_id': self.gateway_payment_id,
             'service_type': self.service_type,
             'service_duration': self.service_duration,
+            'booking_id': self.booking_id,
             'created_at': self.created_at.isoformat(),
             'completed_at': self.completed_at.isoformat() if self.completed_at else None
         }
@@ -1,5 +1,6 @@
 from flask import Blueprint, jsonify, request, session
 from src.models.user import User, UserProfile, db
+from src.routes.exams import EXAMS
 from datetime import datetime
 import json
 import re
@@ -213,6 +214,7 @@ def update_profile():
         profile.updated_at = datetime.utcnow()
         
         db.session.commit()
+        EXAMS.current.recommender.invalidate(user.id)
         
         return jsonify({
             'message': 'Profile updated successfully',
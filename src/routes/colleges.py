@@ -1,410 +1,310 @@
-from flask import Blueprint, jsonify, request, session
+from flask import Blueprint, Response, current_app, jsonify, request, session, stream_with_context
 from src.models.user import User, UserProfile, db
+from src.models.college import College
+from src.services.college_batch import STATUS_NAMES, CutoffMatrix, score_batch
+from src.services.catalogs import Catalog, CatalogSnapshot
+from src.services.college_catalog import CollegeCatalog, cutoff_status
+from src.services.college_compare import ComparisonMatrix
+from src.services.cutoff_store import open_cutoff_store
+from src.services.college_loader import loaded_version, sync_colleges
+from src.services.etags import conditional, register_dataset_source
+from src.services.facets import FacetCounter
+from src.services.fragments import FragmentCache, encode, spliced_response
+from src.services.pagination import decode_cursor, encode_cursor, page_size
+from src.services.projection import parse_fields, projection_plan
 import json
+import os
 
 colleges_bp = Blueprint('colleges', __name__)
 
-# College data (in real implementation, this would be in database)
-COLLEGES_DATA = [
-    {
-        "id": 1,
-        "name": "IIT Delhi",
-        "full_name": "Indian Institute of Technology Delhi",
-        "location": "New Delhi, Delhi",
-        "state": "Delhi",
-        "type": "Government",
-        "category": "Engineering",
-        "nirf_ranking": 2,
-        "established": 1961,
-        "website": "https://home.iitd.ac.in/",
-        "fees": {
-            "annual": 250000,
-            "currency": "INR",
-            "category": "Tuition + Hostel"
-        },
-        "courses": [
-            "B.Tech Computer Science",
-            "B.Tech Electrical Engineering", 
-            "B.Tech Mechanical Engineering",
-            "B.Tech Civil Engineering",
-            "M.Tech", "PhD"
-        ],
-        "accepted_exams": ["JEE Advanced"],
-        "cutoffs": {
-            "JEE Advanced": {
-                "general": {"rank": 500, "percentile": 99.8},
-                "obc": {"rank": 800, "percentile": 99.7},
-                "sc": {"rank": 1500, "percentile": 99.5},
-                "st": {"rank": 2000, "percentile": 99.3}
-            }
-        },
-        "placement": {
-            "average_package": 1800000,
-            "highest_package": 5000000,
-            "placement_rate": 95
-        },
-        "facilities": [
-            "World-class laboratories",
-            "Modern hostels",
-            "Sports complex",
-            "Library with vast collection",
-            "Research centers"
-        ],
-        "description": "Premier engineering institute known for excellence in technology and research.",
-        "icon": "🏛️",
-        "images": [
-            "/images/iit-delhi-campus.jpg",
-            "/images/iit-delhi-lab.jpg"
-        ]
-    },
-    {
-        "id": 2,
-        "name": "IIT Bombay",
-        "full_name": "Indian Institute of Technology Bombay",
-        "location": "Mumbai, Maharashtra",
-        "state": "Maharashtra",
-        "type": "Government",
-        "category": "Engineering",
-        "nirf_ranking": 3,
-        "established": 1958,
-        "website": "https://www.iitb.ac.in/",
-        "fees": {
-            "annual": 250000,
-            "currency": "INR",
-            "category": "Tuition + Hostel"
-        },
-        "courses": [
-            "B.Tech Computer Science",
-            "B.Tech Electrical Engineering",
-            "B.Tech Aerospace Engineering",
-            "B.Tech Chemical Engineering",
-            "M.Tech", "PhD"
-        ],
-        "accepted_exams": ["JEE Advanced"],
-        "cutoffs": {
-            "JEE Advanced": {
-                "general": {"rank": 400, "percentile": 99.85},
-                "obc": {"rank": 700, "percentile": 99.75},
-                "sc": {"rank": 1200, "percentile": 99.6},
-                "st": {"rank": 1800, "percentile": 99.4}
-            }
-        },
-        "placement": {
-            "average_package": 2000000,
-            "highest_package": 5500000,
-            "placement_rate": 96
-        },
-        "facilities": [
-            "State-of-the-art infrastructure",
-            "Research parks",
-            "Innovation labs",
-            "Cultural centers",
-            "Medical facilities"
-        ],
-        "description": "Top-ranked IIT known for computer science and engineering excellence.",
-        "icon": "🏛️",
-        "images": [
-            "/images/iit-bombay-campus.jpg"
-        ]
-    },
-    {
-        "id": 3,
-        "name": "IIT Madras",
-        "full_name": "Indian Institute of Technology Madras",
-        "location": "Chennai, Tamil Nadu",
-        "state": "Tamil Nadu",
-        "type": "Government",
-        "category": "Engineering",
-        "nirf_ranking": 1,
-        "established": 1959,
-        "website": "https://www.iitm.ac.in/",
-        "fees": {
-            "annual": 250000,
-            "currency": "INR",
-            "category": "Tuition + Hostel"
-        },
-        "courses": [
-            "B.Tech Computer Science",
-            "B.Tech Electrical Engineering",
-            "B.Tech Ocean Engineering",
-            "B.Tech Metallurgical Engineering",
-            "M.Tech", "PhD"
-        ],
-        "accepted_exams": ["JEE Advanced"],
-        "cutoffs": {
-            "JEE Advanced": {
-                "general": {"rank": 300, "percentile": 99.9},
-                "obc": {"rank": 600, "percentile": 99.8},
-                "sc": {"rank": 1000, "percentile": 99.65},
-                "st": {"rank": 1500, "percentile": 99.5}
-            }
-        },
-        "placement": {
-            "average_package": 2200000,
-            "highest_package": 6000000,
-            "placement_rate": 97
-        },
-        "facilities": [
-            "Sprawling green campus",
-            "Advanced research facilities",
-            "Incubation centers",
-            "Sports facilities",
-            "Cultural venues"
-        ],
-        "description": "India's top engineering institute with world-class research facilities.",
-        "icon": "🏛️",
-        "images": []
-    },
-    {
-        "id": 4,
-        "name": "NIT Trichy",
-        "full_name": "National Institute of Technology Tiruchirappalli",
-        "location": "Tiruchirappalli, Tamil Nadu",
-        "state": "Tamil Nadu",
-        "type": "Government",
-        "category": "Engineering",
-        "nirf_ranking": 9,
-        "established": 1964,
-        "website": "https://www.nitt.edu/",
-        "fees": {
-            "annual": 150000,
-            "currency": "INR",
-            "category": "Tuition + Hostel"
-        },
-        "courses": [
-            "B.Tech Computer Science",
-            "B.Tech Electronics and Communication",
-            "B.Tech Mechanical Engineering",
-            "B.Tech Civil Engineering",
-            "M.Tech", "MBA"
-        ],
-        "accepted_exams": ["JEE Main"],
-        "cutoffs": {
-            "JEE Main": {
-                "general": {"rank": 2000, "percentile": 99.5},
-                "obc": {"rank": 3500, "percentile": 99.2},
-                "sc": {"rank": 8000, "percentile": 98.5},
-                "st": {"rank": 12000, "percentile": 97.8}
-            }
-        },
-        "placement": {
-            "average_package": 1200000,
-            "highest_package": 4000000,
-            "placement_rate": 92
-        },
-        "facilities": [
-            "Modern laboratories",
-            "Central library",
-            "Sports complex",
-            "Hostels",
-            "Medical center"
-        ],
-        "description": "Premier NIT known for excellent engineering education and placements.",
-        "icon": "🏫",
-        "images": []
-    },
-    {
-        "id": 5,
-        "name": "AIIMS Delhi",
-        "full_name": "All India Institute of Medical Sciences Delhi",
-        "location": "New Delhi, Delhi",
-        "state": "Delhi",
-        "type": "Government",
-        "category": "Medical",
-        "nirf_ranking": 1,
-        "established": 1956,
-        "website": "https://www.aiims.edu/",
-        "fees": {
-            "annual": 1500,
-            "currency": "INR",
-            "category": "Tuition only"
-        },
-        "courses": [
-            "MBBS",
-            "MD/MS",
-            "DM/MCh",
-            "PhD",
-            "Nursing",
-            "Paramedical"
-        ],
-        "accepted_exams": ["NEET UG"],
-        "cutoffs": {
-            "NEET UG": {
-                "general": {"rank": 50, "percentile": 99.99},
-                "obc": {"rank": 150, "percentile": 99.95},
-                "sc": {"rank": 500, "percentile": 99.8},
-                "st": {"rank": 800, "percentile": 99.7}
-            }
-        },
-        "placement": {
-            "average_package": "Government Service",
-            "highest_package": "Government Service",
-            "placement_rate": 100
-        },
-        "facilities": [
-            "Super specialty hospital",
-            "Research centers",
-            "Modern hostels",
-            "Library",
-            "Sports facilities"
-        ],
-        "description": "India's premier medical institute with world-class healthcare education.",
-        "icon": "🏥",
-        "images": []
-    },
-    {
-        "id": 6,
-        "name": "IIM Ahmedabad",
-        "full_name": "Indian Institute of Management Ahmedabad",
-        "location": "Ahmedabad, Gujarat",
-        "state": "Gujarat",
-        "type": "Government",
-        "category": "Management",
-        "nirf_ranking": 1,
-        "established": 1961,
-        "website": "https://www.iima.ac.in/",
-        "fees": {
-            "annual": 2500000,
-            "currency": "INR",
-            "category": "2-year program total"
-        },
-        "courses": [
-            "MBA",
-            "Executive MBA",
-            "PhD",
-            "Fellow Programme"
-        ],
-        "accepted_exams": ["CAT"],
-        "cutoffs": {
-            "CAT": {
-                "general": {"rank": 50, "percentile": 99.5},
-                "obc": {"rank": 100, "percentile": 99.2},
-                "sc": {"rank": 200, "percentile": 98.5},
-                "st": {"rank": 300, "percentile": 98.0}
-            }
-        },
-        "placement": {
-            "average_package": 3400000,
-            "highest_package": 7000000,
-            "placement_rate": 100
-        },
-        "facilities": [
-            "Modern classrooms",
-            "Case study rooms",
-            "Library",
-            "Hostels",
-            "Sports facilities"
-        ],
-        "description": "India's top business school with global recognition.",
-        "icon": "🏢",
-        "images": []
-    }
-]
+class CollegeIndexes(CatalogSnapshot):
+    """The college catalog with its search and geo indexes, cutoff and comparison matrices, facets and fragments"""
+
+    def __init__(self, colleges, modified_at):
+        super().__init__(colleges, modified_at)
+        self.catalog = CollegeCatalog(colleges)
+        self.cutoff_matrix = CutoffMatrix(self.catalog)
+        self.comparison = ComparisonMatrix(colleges)
+        self.category_facet = FacetCounter('college_category', lambda c: c['category'], lambda: colleges)
+        self.state_facet = FacetCounter('college_state', lambda c: c['state'], lambda: colleges)
+        self.fragments = FragmentCache('colleges', colleges)
+
+# College catalog, loaded from src/data/colleges.json and swapped in whole on
+# reload, after the college tables are brought in line with it
+COLLEGES = Catalog('colleges', CollegeIndexes, sync=sync_colleges)
+
+# The college tables /api/colleges filters and pages on; their version is read
+# from the database, so a load by another process changes the ETag too
+register_dataset_source('college_table', loaded_version)
+
+# Multi-year cutoff table built by `flask build-cutoff-store`, memory-mapped when configured
+COLLEGE_CUTOFF_STORE = open_cutoff_store(os.environ.get('CUTOFF_STORE_PATH'))
+
+# Maximum number of students in one batch recommendation request
+MAX_BATCH_SIZE = 10000
+
+# Search matches up to this many ids are passed to SQL as an id list;
+# broader searches fall back to a LIKE filter
+MAX_SEARCH_IDS = 1000
+
+# Maximum number of autocomplete suggestions
+MAX_SUGGESTIONS = 20
+
+# Maximum number of colleges in one comparison
+MAX_COMPARE = 100
+
+# Limits of /colleges/nearby
+DEFAULT_NEARBY_LIMIT = 10
+MAX_NEARBY_LIMIT = 100
+MAX_NEARBY_RADIUS_KM = 3000
+
+def _to_number(value, cast):
+    """Convert a JSON field to a number, returning None if it is missing or invalid"""
+    if value is None:
+        return None
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        return None
 
 @colleges_bp.route('/colleges', methods=['GET'])
+@conditional('colleges', 'college_table')
 def get_all_colleges():
-    """Get all colleges with optional filtering"""
+    """Get colleges with optional filtering, one keyset-paginated page at a time
+    
+    Pass the returned next_cursor as ?cursor= to fetch the following page. The
+    total is only counted for the first page. ?fields=id,name,fees.annual
+    returns only the listed (dotted) fields of each college.
+    """
     category = request.args.get('category')
     state = request.args.get('state')
     college_type = request.args.get('type')
     search = request.args.get('search', '').lower()
     min_ranking = request.args.get('min_ranking', type=int)
     max_ranking = request.args.get('max_ranking', type=int)
+    cursor = request.args.get('cursor')
+    limit = page_size(request.args.get('limit', type=int))
+    
+    try:
+        fields = parse_fields(request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    indexes = COLLEGES.current
+    query = db.select(College)
     
-    colleges = COLLEGES_DATA.copy()
+    # While this worker still serves another catalog version than the tables
+    # hold (mid-reload), search and records come from the tables alone
+    in_step = indexes.version == loaded_version()
     
     # Apply filters
     if category:
-        colleges = [college for college in colleges if college['category'].lower() == category.lower()]
+        query = query.where(db.func.lower(College.category) == category.lower())
     
     if state:
-        colleges = [college for college in colleges if college['state'].lower() == state.lower()]
+        query = query.where(db.func.lower(College.state) == state.lower())
     
     if college_type:
-        colleges = [college for college in colleges if college['type'].lower() == college_type.lower()]
+        query = query.where(db.func.lower(College.type) == college_type.lower())
     
     if search:
-        colleges = [college for college in colleges if 
-                   search in college['name'].lower() or 
-                   search in college['full_name'].lower() or
-                   search in college['location'].lower()]
+        search_ids = indexes.catalog.search_ids(search) if in_step else None
+        if search_ids is not None and len(search_ids) <= MAX_SEARCH_IDS:
+            query = query.where(College.id.in_(search_ids))
+        else:
+            query = query.where(db.or_(
+                db.func.lower(College.name).contains(search, autoescape=True),
+                db.func.lower(College.full_name).contains(search, autoescape=True),
+                db.func.lower(College.location).contains(search, autoescape=True)
+            ))
     
     if min_ranking:
-        colleges = [college for college in colleges if college['nirf_ranking'] >= min_ranking]
+        query = query.where(College.nirf_ranking >= min_ranking)
     
     if max_ranking:
-        colleges = [college for college in colleges if college['nirf_ranking'] <= max_ranking]
+        query = query.where(College.nirf_ranking <= max_ranking)
+    
+    total = None
+    if cursor:
+        try:
+            after_id = int(decode_cursor(cursor)['id'])
+        except (KeyError, TypeError, ValueError):
+            return jsonify({'error': 'Invalid cursor'}), 400
+        query = query.where(College.id > after_id)
+    else:
+        total = db.session.scalar(query.with_only_columns(db.func.count(College.id)).order_by(None))
+    
+    # Fetch one extra id to know whether another page follows
+    page_ids = db.session.scalars(
+        query.with_only_columns(College.id).order_by(College.id).limit(limit + 1)
+    ).all()
+    
+    next_cursor = None
+    if len(page_ids) > limit:
+        page_ids = page_ids[:limit]
+        next_cursor = encode_cursor({'id': page_ids[-1]})
+    
+    # Rows come from the pre-encoded catalog; only unknown ids are loaded
+    fragments = [indexes.fragments.get(college_id, fields) if in_step else None for college_id in page_ids]
+    missing = [college_id for college_id, fragment in zip(page_ids, fragments) if fragment is None]
+    if missing:
+        rows = db.session.scalars(
+            db.select(College)
+            .where(College.id.in_(missing))
+            .options(db.selectinload(College.courses), db.selectinload(College.cutoffs))
+        ).all()
+        records = [college.to_dict() for college in rows]
+        if in_step:
+            encoded = indexes.fragments.many(records, fields)
+        else:
+            project = projection_plan(fields) if fields is not None else None
+            encoded = [encode(project(record) if project else record) for record in records]
+        loaded = dict(zip([college.id for college in rows], encoded))
+        fragments = [fragment or loaded[college_id] for college_id, fragment in zip(page_ids, fragments)]
+    
+    response = {
+        'colleges': fragments,
+        'next_cursor': next_cursor,
+        'limit': limit
+    }
+    if total is not None:
+        response['total'] = total
+    
+    return spliced_response(response)
+
+@colleges_bp.route('/colleges/autocomplete', methods=['GET'])
+@conditional('colleges')
+def autocomplete_colleges():
+    """Suggest colleges for a partially typed name or location, tolerating one typo per word"""
+    query = request.args.get('q', '')
+    limit = min(request.args.get('limit', 10, type=int), MAX_SUGGESTIONS)
+    
+    if not query.strip() or limit < 1:
+        return jsonify({'suggestions': [], 'total': 0}), 200
+    
+    suggestions = [{
+        'id': college['id'],
+        'name': college['name'],
+        'full_name': college['full_name'],
+        'location': college['location'],
+        'category': college['category'],
+        'nirf_ranking': college['nirf_ranking'],
+        'match': 'fuzzy' if fuzzy else 'exact'
+    } for college, fuzzy in COLLEGES.current.catalog.autocomplete(query, limit)]
+    
+    return jsonify({
+        'suggestions': suggestions,
+        'total': len(suggestions)
+    }), 200
+
+@colleges_bp.route('/colleges/nearby', methods=['GET'])
+@conditional('colleges')
+def get_nearby_colleges():
+    """Get colleges nearest to a point, optionally within radius_km and filtered like /colleges
+    
+    Without radius_km the limit nearest colleges are returned (10 by default);
+    with it, every college in the radius unless a limit is also given.
+    """
+    lat = request.args.get('lat', type=float)
+    lon = request.args.get('lon', type=float)
+    radius_km = request.args.get('radius_km', type=float)
+    limit = request.args.get('limit', type=int)
+    
+    if lat is None or lon is None or not -90 <= lat <= 90 or not -180 <= lon <= 180:
+        return jsonify({'error': 'Valid lat and lon are required'}), 400
+    
+    if radius_km is not None and not 0 < radius_km <= MAX_NEARBY_RADIUS_KM:
+        return jsonify({'error': f'radius_km must be between 0 and {MAX_NEARBY_RADIUS_KM}'}), 400
+    
+    if limit is not None and limit < 1:
+        return jsonify({'error': 'limit must be positive'}), 400
+    
+    if radius_km is None and limit is None:
+        limit = DEFAULT_NEARBY_LIMIT
+    if limit is not None:
+        limit = min(limit, MAX_NEARBY_LIMIT)
+    
+    nearby = COLLEGES.current.catalog.nearby(
+        lat, lon, radius_km=radius_km, limit=limit,
+        category=request.args.get('category'),
+        state=request.args.get('state'),
+        college_type=request.args.get('type')
+    )
+    
+    colleges = []
+    for college, distance in nearby:
+        college_copy = college.copy()
+        college_copy['distance_km'] = round(distance, 2)
+        colleges.append(college_copy)
     
     return jsonify({
         'colleges': colleges,
-        'total': len(colleges)
+        'total': len(colleges),
+        'center': {'lat': lat, 'lon': lon},
+        'radius_km': radius_km
+    }), 200
+
+@colleges_bp.route('/colleges/<int:college_id>/cutoffs/trend', methods=['GET'])
+def get_college_cutoff_trend(college_id):
+    """Get a college's cutoff history by exam, category, quota and program"""
+    if COLLEGES.current.catalog.get(college_id) is None:
+        return jsonify({'error': 'College not found'}), 404
+    
+    if COLLEGE_CUTOFF_STORE is None:
+        return jsonify({'error': 'Cutoff history is not available'}), 404
+    
+    category = request.args.get('category')
+    series = COLLEGE_CUTOFF_STORE.history(
+        college_id,
+        exam_name=request.args.get('exam'),
+        category=category.lower() if category else None,
+        quota=request.args.get('quota'),
+        program=request.args.get('program')
+    )
+    
+    return jsonify({
+        'college_id': college_id,
+        'series': series,
+        'total': len(series)
     }), 200
 
 @colleges_bp.route('/colleges/<int:college_id>', methods=['GET'])
+@conditional('colleges')
 def get_college_details(college_id):
     """Get detailed information about a specific college"""
-    college = next((college for college in COLLEGES_DATA if college['id'] == college_id), None)
+    college = COLLEGES.current.fragments.get(college_id)
     
     if not college:
         return jsonify({'error': 'College not found'}), 404
     
-    return jsonify({'college': college}), 200
+    return spliced_response({'college': college})
 
-@colleges_bp.route('/colleges/recommendations', methods=['POST'])
-def get_college_recommendations():
-    """Get personalized college recommendations based on exam scores"""
-    data = request.json
+def _parse_recommendation_criteria(data):
+    """Read recommendation criteria from a request body, returning (criteria, error)"""
     exam_name = data.get('exam_name')
-    rank = data.get('rank', type=int)
-    percentile = data.get('percentile', type=float)
+    rank = _to_number(data.get('rank'), int)
+    percentile = _to_number(data.get('percentile'), float)
     category = data.get('category', 'general').lower()
     preferred_states = data.get('preferred_states', [])
     preferred_categories = data.get('preferred_categories', [])
     
     if not exam_name or (not rank and not percentile):
-        return jsonify({'error': 'Exam name and rank/percentile are required'}), 400
+        return None, 'Exam name and rank/percentile are required'
     
-    recommendations = []
+    return (exam_name, rank, percentile, category, preferred_states, preferred_categories), None
+
+def _recommendations_payload(criteria, matches):
+    """Build the recommendations response body from (college, status, cutoff_data) matches"""
+    exam_name, rank, percentile, category = criteria[:4]
     
-    for college in COLLEGES_DATA:
-        if exam_name in college['accepted_exams']:
-            cutoff_data = college['cutoffs'].get(exam_name, {}).get(category, {})
-            
-            if cutoff_data:
-                eligible = False
-                
-                # Check eligibility based on rank or percentile
-                if rank and 'rank' in cutoff_data:
-                    eligible = rank <= cutoff_data['rank']
-                elif percentile and 'percentile' in cutoff_data:
-                    eligible = percentile >= cutoff_data['percentile']
-                
-                if eligible:
-                    college_copy = college.copy()
-                    college_copy['eligibility_status'] = 'eligible'
-                    college_copy['cutoff_info'] = cutoff_data
-                    recommendations.append(college_copy)
-                else:
-                    # Include colleges slightly above cutoff as "reach" options
-                    if rank and 'rank' in cutoff_data and rank <= cutoff_data['rank'] * 1.2:
-                        college_copy = college.copy()
-                        college_copy['eligibility_status'] = 'reach'
-                        college_copy['cutoff_info'] = cutoff_data
-                        recommendations.append(college_copy)
-    
-    # Apply preference filters
-    if preferred_states:
-        recommendations = [college for college in recommendations 
-                         if college['state'] in preferred_states]
-    
-    if preferred_categories:
-        recommendations = [college for college in recommendations 
-                         if college['category'] in preferred_categories]
-    
-    # Sort by NIRF ranking (lower is better)
-    recommendations.sort(key=lambda x: x['nirf_ranking'])
+    recommendations = []
+    for college, status, cutoff_data in matches:
+        college_copy = college.copy()
+        college_copy['eligibility_status'] = status
+        college_copy['cutoff_info'] = cutoff_data
+        recommendations.append(college_copy)
     
-    return jsonify({
+    return {
         'recommendations': recommendations,
         'total': len(recommendations),
         'criteria': {
@@ -413,67 +313,133 @@ def get_college_recommendations():
             'percentile': percentile,
             'category': category
         }
-    }), 200
+    }
+
+@colleges_bp.route('/colleges/recommendations', methods=['POST'])
+def get_college_recommendations():
+    """Get personalized college recommendations based on exam scores
+    
+    With a cutoff store configured, colleges are judged on one counselling
+    round: the latest, or the year/round given in the body, optionally
+    narrowed to a quota and program.
+    """
+    data = request.json
+    criteria, error = _parse_recommendation_criteria(data)
+    if error:
+        return jsonify({'error': error}), 400
+    
+    catalog = COLLEGES.current.catalog
+    if COLLEGE_CUTOFF_STORE is None:
+        # Matches come back already sorted by NIRF ranking (lower is better)
+        matches = catalog.recommend(*criteria)
+        return jsonify(_recommendations_payload(criteria, matches)), 200
+    
+    return jsonify(_store_recommendations_payload(catalog, criteria, data)), 200
+
+def _store_recommendations_payload(catalog, criteria, data):
+    """Recommendations judged on one round of the cutoff store, chosen by the request body"""
+    matches, cutoff_round = catalog.recommend_from_store(
+        COLLEGE_CUTOFF_STORE, *criteria,
+        year=_to_number(data.get('year'), int),
+        round_number=_to_number(data.get('round'), int),
+        quota=data.get('quota'),
+        program=data.get('program')
+    )
+    payload = _recommendations_payload(criteria, matches)
+    payload['cutoff_round'] = {'year': cutoff_round[0], 'round': cutoff_round[1]} if cutoff_round else None
+    return payload
+
+@colleges_bp.route('/colleges/recommendations/batch', methods=['POST'])
+def get_batch_college_recommendations():
+    """Get college recommendations for many students, streamed back as NDJSON
+    
+    With a cutoff store configured, each student is judged like a single
+    recommendation request, on the round their own entry selects.
+    """
+    data = request.json
+    students = data.get('students', [])
+    
+    if not students or not isinstance(students, list) or not all(isinstance(s, dict) for s in students):
+        return jsonify({'error': 'A list of students is required'}), 400
+    
+    if len(students) > MAX_BATCH_SIZE:
+        return jsonify({'error': f'At most {MAX_BATCH_SIZE} students are allowed per batch'}), 400
+    
+    parsed = [_parse_recommendation_criteria(student) for student in students]
+    rows = [criteria for criteria, error in parsed if criteria]
+    indexes = COLLEGES.current
+    
+    def generate():
+        if COLLEGE_CUTOFF_STORE is None:
+            scored = score_batch(indexes.cutoff_matrix, rows)
+        for index, (criteria, error) in enumerate(parsed):
+            if error:
+                line = {'index': index, 'error': error}
+            elif COLLEGE_CUTOFF_STORE is not None:
+                line = _store_recommendations_payload(indexes.catalog, criteria, students[index])
+                line['index'] = index
+            else:
+                ordinals, statuses = next(scored)
+                band = indexes.catalog.cutoff_band(criteria[0], criteria[3])
+                matches = [
+                    (indexes.catalog.college_at(ordinal), STATUS_NAMES[status], band.cutoff_info[ordinal])
+                    for ordinal, status in zip(ordinals.tolist(), statuses.tolist())
+                ]
+                line = _recommendations_payload(criteria, matches)
+                line['index'] = index
+            if 'student_id' in students[index]:
+                line['student_id'] = students[index]['student_id']
+            yield current_app.json.dumps(line) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
 
 @colleges_bp.route('/colleges/compare', methods=['POST'])
 def compare_colleges():
-    """Compare multiple colleges"""
+    """Compare multiple colleges metric by metric
+    
+    Returns value columns aligned with college_ids, and per metric the rank
+    of each college (1 is best, None when the value is missing) and the ids
+    of the best and worst colleges.
+    """
     data = request.json
     college_ids = data.get('college_ids', [])
     
-    if not college_ids or len(college_ids) < 2:
+    if not isinstance(college_ids, list) or len(college_ids) < 2:
         return jsonify({'error': 'At least 2 college IDs are required for comparison'}), 400
     
-    colleges_to_compare = []
-    for college_id in college_ids:
-        college = next((college for college in COLLEGES_DATA if college['id'] == college_id), None)
-        if college:
-            colleges_to_compare.append(college)
+    if len(college_ids) > MAX_COMPARE:
+        return jsonify({'error': f'At most {MAX_COMPARE} colleges can be compared at once'}), 400
+    
+    if not all(isinstance(college_id, int) for college_id in college_ids):
+        return jsonify({'error': 'College IDs must be integers'}), 400
     
-    if len(colleges_to_compare) < 2:
+    comparison = COLLEGES.current.comparison.compare(college_ids)
+    
+    if len(comparison['college_ids']) < 2:
         return jsonify({'error': 'Not enough valid colleges found for comparison'}), 400
     
-    # Create comparison matrix
-    comparison = {
-        'colleges': colleges_to_compare,
-        'comparison_points': [
-            'NIRF Ranking',
-            'Annual Fees',
-            'Average Placement Package',
-            'Placement Rate',
-            'Established Year',
-            'Location'
-        ]
-    }
+    comparison['comparison_points'] = [metric['label'] for metric in comparison['metrics']] + ['Location']
     
     return jsonify(comparison), 200
 
 @colleges_bp.route('/colleges/categories', methods=['GET'])
+@conditional('colleges')
 def get_college_categories():
     """Get all available college categories"""
-    categories = list(set(college['category'] for college in COLLEGES_DATA))
-    category_counts = {}
-    
-    for category in categories:
-        category_counts[category] = len([college for college in COLLEGES_DATA if college['category'] == category])
-    
+    category_facet = COLLEGES.current.category_facet
     return jsonify({
-        'categories': categories,
-        'counts': category_counts
+        'categories': category_facet.values(),
+        'counts': category_facet.counts()
     }), 200
 
 @colleges_bp.route('/colleges/states', methods=['GET'])
+@conditional('colleges')
 def get_college_states():
     """Get all states with colleges"""
-    states = list(set(college['state'] for college in COLLEGES_DATA))
-    state_counts = {}
-    
-    for state in states:
-        state_counts[state] = len([college for college in COLLEGES_DATA if college['state'] == state])
-    
+    state_facet = COLLEGES.current.state_facet
     return jsonify({
-        'states': sorted(states),
-        'counts': state_counts
+        'states': state_facet.sorted_values(),
+        'counts': state_facet.counts()
     }), 200
 
 @colleges_bp.route('/colleges/shortlist', methods=['POST'])
@@ -490,7 +456,7 @@ def add_to_shortlist():
             return jsonify({'error': 'College ID is required'}), 400
         
         # Check if college exists
-        college = next((college for college in COLLEGES_DATA if college['id'] == college_id), None)
+        college = COLLEGES.current.catalog.get(college_id)
         if not college:
             return jsonify({'error': 'College not found'}), 404
         
@@ -519,22 +485,83 @@ def add_to_shortlist():
 
 @colleges_bp.route('/colleges/shortlist', methods=['GET'])
 def get_shortlisted_colleges():
-    """Get user's shortlisted colleges"""
+    """Get user's shortlisted colleges in the order they were added
+    
+    With ?annotate=true each college carries score_comparison: how the
+    user's saved exam scores compare with its cutoffs.
+    """
     if 'user_id' not in session:
         return jsonify({'error': 'Authentication required'}), 401
     
-    profile = UserProfile.query.filter_by(user_id=session['user_id']).first()
+    annotate = request.args.get('annotate', 'false').lower() == 'true'
+    
+    # The only query: both JSON columns of the profile
+    profile = db.session.execute(
+        db.select(UserProfile.shortlisted_colleges, UserProfile.exam_scores)
+        .where(UserProfile.user_id == session['user_id'])
+    ).first()
     if not profile or not profile.shortlisted_colleges:
-        return jsonify({'shortlisted_colleges': []}), 200
+        return jsonify({'shortlisted_colleges': [], 'total': 0}), 200
     
     shortlisted_ids = json.loads(profile.shortlisted_colleges)
-    shortlisted_colleges = [college for college in COLLEGES_DATA if college['id'] in shortlisted_ids]
+    
+    if not annotate:
+        fragments = [COLLEGES.current.fragments.get(college_id) for college_id in dict.fromkeys(shortlisted_ids)]
+        fragments = [fragment for fragment in fragments if fragment is not None]
+        return spliced_response({
+            'shortlisted_colleges': fragments,
+            'total': len(fragments)
+        })
+    
+    exam_scores = json.loads(profile.exam_scores) if profile.exam_scores else {}
+    
+    catalog = COLLEGES.current.catalog
+    shortlisted_colleges = []
+    for college_id in dict.fromkeys(shortlisted_ids):
+        college = catalog.get(college_id)
+        if college is None:
+            continue
+        college_copy = college.copy()
+        college_copy['score_comparison'] = _score_comparison(college, exam_scores)
+        shortlisted_colleges.append(college_copy)
     
     return jsonify({
         'shortlisted_colleges': shortlisted_colleges,
         'total': len(shortlisted_colleges)
     }), 200
 
+def _score_comparison(college, exam_scores):
+    """Compare saved exam scores ({exam: {rank, percentile, category}}) with a college's cutoffs
+
+    With a cutoff store configured, the cutoffs are the store's latest round,
+    as recommendations use.
+    """
+    comparison = []
+    for exam_name, score_data in exam_scores.items():
+        if not isinstance(score_data, dict):
+            continue
+        category = str(score_data.get('category') or 'general').lower()
+        if COLLEGE_CUTOFF_STORE is None:
+            cutoff_data = college['cutoffs'].get(exam_name, {}).get(category)
+        else:
+            cutoff_data = COLLEGE_CUTOFF_STORE.cutoff(college['id'], exam_name, category)
+        if not cutoff_data:
+            continue
+        rank = _to_number(score_data.get('rank'), int)
+        percentile = _to_number(score_data.get('percentile'), float)
+        status = cutoff_status(cutoff_data, rank, percentile)
+        if status is None:
+            continue
+        comparison.append({
+            'exam': exam_name,
+            'category': category,
+            'rank': rank,
+            'percentile': percentile,
+            'cutoff': cutoff_data,
+            'status': status
+        })
+    return comparison
+
 @colleges_bp.route('/colleges/shortlist/<int:college_id>', methods=['DELETE'])
 def remove_from_shortlist(college_id):
     """Remove college from shortlist"""
@@ -1,180 +1,127 @@
 from flask import Blueprint, jsonify, request, session
+from src.models.community import Answer, Question, QuestionTag
 from src.models.user import User, db
+from src.services.pagination import decode_cursor, encode_cursor, page_size
+from src.services.question_facets import QUESTION_CATEGORY_FACET, QUESTION_TAG_FACET
 from datetime import datetime
-import uuid
-import json
 
 community_bp = Blueprint('community', __name__)
 
-# Sample community data (in real implementation, this would be in database)
-QUESTIONS_DATA = [
-    {
-        "id": 1,
-        "title": "Best strategy for JEE Main preparation in final 3 months?",
-        "content": "I'm in 12th grade and have 3 months left for JEE Main. What should be my strategy to maximize my score? Currently scoring around 180/300 in mock tests.",
-        "category": "JEE Main",
-        "tags": ["jee-main", "preparation", "strategy", "mock-tests"],
-        "author": {
-            "id": 101,
-            "username": "student_2025",
-            "reputation": 45,
-            "is_verified": False
-        },
-        "created_at": "2024-06-20T10:30:00Z",
-        "updated_at": "2024-06-20T10:30:00Z",
-        "votes": 15,
-        "answers_count": 8,
-        "views": 234,
-        "is_answered": True,
-        "best_answer_id": 101,
-        "status": "open"
-    },
-    {
-        "id": 2,
-        "title": "IIT Delhi vs IIT Bombay for Computer Science - Which is better?",
-        "content": "I have qualified JEE Advanced and can get CS in both IIT Delhi and IIT Bombay. Which one should I choose considering placements, research opportunities, and campus life?",
-        "category": "College Selection",
-        "tags": ["iit-delhi", "iit-bombay", "computer-science", "placements"],
-        "author": {
-            "id": 102,
-            "username": "jee_qualified",
-            "reputation": 78,
-            "is_verified": True
-        },
-        "created_at": "2024-06-19T15:45:00Z",
-        "updated_at": "2024-06-20T09:15:00Z",
-        "votes": 32,
-        "answers_count": 12,
-        "views": 567,
-        "is_answered": True,
-        "best_answer_id": 205,
-        "status": "open"
-    },
-    {
-        "id": 3,
-        "title": "NEET preparation while managing board exams - Need advice",
-        "content": "How do I balance NEET preparation with 12th board exams? I'm finding it difficult to manage time between both. Any tips from successful candidates?",
-        "category": "NEET",
-        "tags": ["neet", "board-exams", "time-management", "preparation"],
-        "author": {
-            "id": 103,
-            "username": "medical_aspirant",
-            "reputation": 23,
-            "is_verified": False
-        },
-        "created_at": "2024-06-18T12:20:00Z",
-        "updated_at": "2024-06-19T16:30:00Z",
-        "votes": 8,
-        "answers_count": 5,
-        "views": 189,
-        "is_answered": False,
-        "best_answer_id": None,
-        "status": "open"
-    }
-]
+# Listing orders: the sort column, newest id breaking ties
+QUESTION_SORTS = ('recent', 'popular', 'unanswered')
 
-ANSWERS_DATA = [
-    {
-        "id": 101,
-        "question_id": 1,
-        "content": "Focus on revision and mock tests. Don't try to learn new topics now. Solve previous year papers and identify weak areas. Practice time management. Take at least 2 mock tests per week.",
-        "author": {
-            "id": 201,
-            "username": "iit_student_2023",
-            "reputation": 156,
-            "is_verified": True,
-            "college": "IIT Delhi"
-        },
-        "created_at": "2024-06-20T11:15:00Z",
-        "updated_at": "2024-06-20T11:15:00Z",
-        "votes": 12,
-        "is_best_answer": True,
-        "is_helpful": True
-    },
-    {
-        "id": 205,
-        "question_id": 2,
-        "content": "Both are excellent choices. IIT Bombay has slightly better industry connections in Mumbai, while IIT Delhi has proximity to government and policy circles. For CS, both have similar placement records. Choose based on your preference for city and campus culture.",
-        "author": {
-            "id": 202,
-            "username": "cs_graduate",
-            "reputation": 234,
-            "is_verified": True,
-            "college": "IIT Bombay"
-        },
-        "created_at": "2024-06-19T16:30:00Z",
-        "updated_at": "2024-06-19T16:30:00Z",
-        "votes": 18,
-        "is_best_answer": True,
-        "is_helpful": True
-    }
-]
+def _listing_query(category, tag, sort_by):
+    """Questions matching the filters, with the column the listing is ordered by"""
+    query = db.select(Question)
+    
+    if category:
+        query = query.where(Question.category_key == category.lower())
+    
+    if sort_by == 'unanswered':
+        query = query.where(Question.is_answered.is_(False))
+    
+    sort_column = Question.votes if sort_by == 'popular' else Question.created_at
+    
+    if tag:
+        # Newest-first tag pages walk the tag index, which carries created_at
+        query = query.join(QuestionTag, QuestionTag.question_id == Question.id).where(
+            QuestionTag.tag_key == tag.lower()
+        )
+        if sort_column is Question.created_at:
+            sort_column = QuestionTag.created_at
+    
+    return query, sort_column
+
+def _after(sort_column, id_column, value, last_id):
+    """Rows after (value, last_id) in descending (sort_column, id_column) order"""
+    return db.or_(sort_column < value, db.and_(sort_column == value, id_column < last_id))
 
 @community_bp.route('/questions', methods=['GET'])
 def get_questions():
-    """Get all questions with optional filtering"""
+    """Get questions with optional filtering, one keyset-paginated page at a time
+    
+    Pass the returned next_cursor as ?cursor= to fetch the following page; the
+    total is only counted for the first page.
+    """
     category = request.args.get('category')
     tag = request.args.get('tag')
     sort_by = request.args.get('sort_by', 'recent')  # recent, popular, unanswered
     search = request.args.get('search', '').lower()
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 10, type=int)
+    cursor = request.args.get('cursor')
+    limit = page_size(request.args.get('limit', type=int))
     
-    questions = QUESTIONS_DATA.copy()
+    if sort_by not in QUESTION_SORTS:
+        sort_by = 'recent'
     
-    # Apply filters
-    if category:
-        questions = [q for q in questions if q['category'].lower() == category.lower()]
-    
-    if tag:
-        questions = [q for q in questions if tag.lower() in [t.lower() for t in q['tags']]]
+    query, sort_column = _listing_query(category, tag, sort_by)
+    id_column = QuestionTag.question_id if sort_column is QuestionTag.created_at else Question.id
     
     if search:
-        questions = [q for q in questions if 
-                    search in q['title'].lower() or 
-                    search in q['content'].lower()]
-    
-    # Apply sorting
-    if sort_by == 'popular':
-        questions.sort(key=lambda x: x['votes'], reverse=True)
-    elif sort_by == 'unanswered':
-        questions = [q for q in questions if not q['is_answered']]
-        questions.sort(key=lambda x: x['created_at'], reverse=True)
-    else:  # recent
-        questions.sort(key=lambda x: x['created_at'], reverse=True)
-    
-    # Pagination
-    start = (page - 1) * per_page
-    end = start + per_page
-    paginated_questions = questions[start:end]
+        query = query.where(db.or_(
+            db.func.lower(Question.title).contains(search, autoescape=True),
+            db.func.lower(Question.content).contains(search, autoescape=True)
+        ))
+    
+    total = None
+    if cursor:
+        try:
+            values = decode_cursor(cursor)
+            if values['sort'] != sort_by:
+                raise ValueError('Invalid cursor')
+            value = int(values['votes']) if sort_by == 'popular' else datetime.fromisoformat(values['created_at'])
+            query = query.where(_after(sort_column, id_column, value, int(values['id'])))
+        except (KeyError, TypeError, ValueError):
+            return jsonify({'error': 'Invalid cursor'}), 400
+    else:
+        total = db.session.scalar(query.with_only_columns(db.func.count(Question.id)).order_by(None))
+    
+    # Fetch one extra row to know whether another page follows
+    questions = db.session.scalars(
+        query.order_by(sort_column.desc(), id_column.desc())
+        .limit(limit + 1)
+        .options(db.selectinload(Question.author), db.selectinload(Question.tags))
+    ).all()
+    
+    next_cursor = None
+    if len(questions) > limit:
+        questions = questions[:limit]
+        last = questions[-1]
+        if sort_by == 'popular':
+            next_cursor = encode_cursor({'sort': sort_by, 'votes': last.votes, 'id': last.id})
+        else:
+            next_cursor = encode_cursor({'sort': sort_by, 'created_at': last.created_at.isoformat(), 'id': last.id})
     
     return jsonify({
-        'questions': paginated_questions,
-        'total': len(questions),
-        'page': page,
-        'per_page': per_page,
-        'total_pages': (len(questions) + per_page - 1) // per_page
+        'questions': [question.to_dict() for question in questions],
+        'total': total,
+        'next_cursor': next_cursor,
+        'limit': limit
     }), 200
 
 @community_bp.route('/questions/<int:question_id>', methods=['GET'])
 def get_question_details(question_id):
     """Get detailed information about a specific question"""
-    question = next((q for q in QUESTIONS_DATA if q['id'] == question_id), None)
-    
-    if not question:
+    # Count the view in place, so concurrent views are not lost
+    viewed = db.session.execute(
+        db.update(Question).where(Question.id == question_id).values(views=Question.views + 1)
+    ).rowcount
+    if not viewed:
         return jsonify({'error': 'Question not found'}), 404
+    db.session.commit()
     
-    # Get answers for this question
-    answers = [a for a in ANSWERS_DATA if a['question_id'] == question_id]
-    answers.sort(key=lambda x: (x['is_best_answer'], x['votes']), reverse=True)
+    question = db.session.get(Question, question_id)
     
-    # Increment view count (in real implementation)
-    question_copy = question.copy()
-    question_copy['views'] += 1
+    # Best answer first, then by votes
+    answers = db.session.scalars(
+        db.select(Answer)
+        .where(Answer.question_id == question_id)
+        .order_by(Answer.is_best_answer.desc(), Answer.votes.desc(), Answer.id)
+        .options(db.selectinload(Answer.author))
+    ).all()
     
     return jsonify({
-        'question': question_copy,
-        'answers': answers
+        'question': question.to_dict(),
+        'answers': [answer.to_dict() for answer in answers]
     }), 200
 
 @community_bp.route('/questions', methods=['POST'])
@@ -200,47 +147,49 @@ def ask_question():
         if not category:
             return jsonify({'error': 'Category is required'}), 400
         
+        if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
+            return jsonify({'error': 'Tags must be a list of strings'}), 400
+        
         # Get user info
         user = User.query.get(session['user_id'])
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
-        # Create question
-        question = {
-            'id': len(QUESTIONS_DATA) + 1,
-            'title': title,
-            'content': content,
-            'category': category,
-            'tags': tags,
-            'author': {
-                'id': user.id,
-                'username': user.username,
-                'reputation': 0,  # In real implementation, calculate from user activity
-                'is_verified': user.is_verified
-            },
-            'created_at': datetime.now().isoformat(),
-            'updated_at': datetime.now().isoformat(),
-            'votes': 0,
-            'answers_count': 0,
-            'views': 0,
-            'is_answered': False,
-            'best_answer_id': None,
-            'status': 'open'
-        }
+        now = datetime.utcnow()
+        question = Question(
+            user_id=user.id,
+            title=title,
+            content=content,
+            category=category,
+            category_key=category.lower(),
+            created_at=now,
+            updated_at=now
+        )
+        
+        # Tags are matched case-insensitively; the first spelling of each is kept
+        seen = set()
+        for tag in (tag.strip() for tag in tags):
+            if tag and tag.lower() not in seen:
+                seen.add(tag.lower())
+                question.tags.append(QuestionTag(tag_key=tag.lower(), tag=tag, position=len(seen), created_at=now))
         
-        # In real implementation, save to database
-        QUESTIONS_DATA.append(question)
+        db.session.add(question)
+        QUESTION_CATEGORY_FACET.add(question.category_key, category)
+        for question_tag in question.tags:
+            QUESTION_TAG_FACET.add(question_tag.tag_key, question_tag.tag)
+        db.session.commit()
         
         return jsonify({
             'message': 'Question posted successfully',
-            'question': question
+            'question': question.to_dict()
         }), 201
         
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': 'Internal server error'}), 500
 
 @community_bp.route('/questions/<int:question_id>/answers', methods=['POST'])
-def post_answer():
+def post_answer(question_id):
     """Post an answer to a question"""
     if 'user_id' not in session:
         return jsonify({'error': 'Authentication required'}), 401
@@ -253,7 +202,7 @@ def post_answer():
             return jsonify({'error': 'Answer must be at least 10 characters long'}), 400
         
         # Check if question exists
-        question = next((q for q in QUESTIONS_DATA if q['id'] == question_id), None)
+        question = db.session.get(Question, question_id)
         if not question:
             return jsonify({'error': 'Question not found'}), 404
         
@@ -262,41 +211,38 @@ def post_answer():
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
-        # Create answer
-        answer = {
-            'id': len(ANSWERS_DATA) + 1,
-            'question_id': question_id,
-            'content': content,
-            'author': {
-                'id': user.id,
-                'username': user.username,
-                'reputation': 0,
-                'is_verified': user.is_verified,
-                'college': getattr(user, 'college', None)
-            },
-            'created_at': datetime.now().isoformat(),
-            'updated_at': datetime.now().isoformat(),
-            'votes': 0,
-            'is_best_answer': False,
-            'is_helpful': False
-        }
-        
-        # In real implementation, save to database
-        ANSWERS_DATA.append(answer)
+        answer = Answer(question_id=question_id, user_id=user.id, content=content)
+        db.session.add(answer)
         
         # Update question's answer count
-        question['answers_count'] += 1
+        db.session.execute(
+            db.update(Question).where(Question.id == question_id).values(answers_count=Question.answers_count + 1)
+        )
+        db.session.commit()
         
         return jsonify({
             'message': 'Answer posted successfully',
-            'answer': answer
+            'answer': answer.to_dict()
         }), 201
         
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': 'Internal server error'}), 500
 
+def _vote(model, row_id, vote_type):
+    """Apply an up or down vote in place; returns the new vote count, or None if there is no such row"""
+    step = 1 if vote_type == 'up' else -1
+    voted = db.session.execute(
+        db.update(model).where(model.id == row_id).values(votes=model.votes + step)
+    ).rowcount
+    if not voted:
+        return None
+    votes = db.session.scalar(db.select(model.votes).where(model.id == row_id))
+    db.session.commit()
+    return votes
+
 @community_bp.route('/questions/<int:question_id>/vote', methods=['POST'])
-def vote_question():
+def vote_question(question_id):
     """Vote on a question (upvote/downvote)"""
     if 'user_id' not in session:
         return jsonify({'error': 'Authentication required'}), 401
@@ -308,26 +254,22 @@ def vote_question():
         if vote_type not in ['up', 'down']:
             return jsonify({'error': 'Vote type must be "up" or "down"'}), 400
         
-        question = next((q for q in QUESTIONS_DATA if q['id'] == question_id), None)
-        if not question:
-            return jsonify({'error': 'Question not found'}), 404
-        
         # In real implementation, check if user already voted and update accordingly
-        if vote_type == 'up':
-            question['votes'] += 1
-        else:
-            question['votes'] -= 1
+        votes = _vote(Question, question_id, vote_type)
+        if votes is None:
+            return jsonify({'error': 'Question not found'}), 404
         
         return jsonify({
             'message': f'Question {vote_type}voted successfully',
-            'votes': question['votes']
+            'votes': votes
         }), 200
         
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': 'Internal server error'}), 500
 
 @community_bp.route('/answers/<int:answer_id>/vote', methods=['POST'])
-def vote_answer():
+def vote_answer(answer_id):
     """Vote on an answer (upvote/downvote)"""
     if 'user_id' not in session:
         return jsonify({'error': 'Authentication required'}), 401
@@ -339,86 +281,76 @@ def vote_answer():
         if vote_type not in ['up', 'down']:
             return jsonify({'error': 'Vote type must be "up" or "down"'}), 400
         
-        answer = next((a for a in ANSWERS_DATA if a['id'] == answer_id), None)
-        if not answer:
-            return jsonify({'error': 'Answer not found'}), 404
-        
         # In real implementation, check if user already voted and update accordingly
-        if vote_type == 'up':
-            answer['votes'] += 1
-        else:
-            answer['votes'] -= 1
+        votes = _vote(Answer, answer_id, vote_type)
+        if votes is None:
+            return jsonify({'error': 'Answer not found'}), 404
         
         return jsonify({
             'message': f'Answer {vote_type}voted successfully',
-            'votes': answer['votes']
+            'votes': votes
         }), 200
         
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': 'Internal server error'}), 500
 
 @community_bp.route('/questions/<int:question_id>/best-answer/<int:answer_id>', methods=['POST'])
-def mark_best_answer():
+def mark_best_answer(question_id, answer_id):
     """Mark an answer as the best answer"""
     if 'user_id' not in session:
         return jsonify({'error': 'Authentication required'}), 401
     
     try:
-        question = next((q for q in QUESTIONS_DATA if q['id'] == question_id), None)
+        question = db.session.get(Question, question_id)
         if not question:
             return jsonify({'error': 'Question not found'}), 404
         
         # Check if user is the question author
-        if question['author']['id'] != session['user_id']:
+        if question.user_id != session['user_id']:
             return jsonify({'error': 'Only question author can mark best answer'}), 403
         
-        answer = next((a for a in ANSWERS_DATA if a['id'] == answer_id), None)
-        if not answer or answer['question_id'] != question_id:
+        answer = db.session.get(Answer, answer_id)
+        if not answer or answer.question_id != question_id:
             return jsonify({'error': 'Answer not found'}), 404
         
-        # Update question and answer
-        question['best_answer_id'] = answer_id
-        question['is_answered'] = True
-        answer['is_best_answer'] = True
+        # Update question and answer; a previous best answer loses the mark
+        db.session.execute(
+            db.update(Answer)
+            .where(Answer.question_id == question_id)
+            .where(Answer.is_best_answer.is_(True))
+            .values(is_best_answer=False)
+        )
+        answer.is_best_answer = True
+        question.best_answer_id = answer_id
+        question.is_answered = True
+        db.session.commit()
         
         return jsonify({
             'message': 'Answer marked as best answer successfully'
         }), 200
         
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': 'Internal server error'}), 500
 
 @community_bp.route('/categories', methods=['GET'])
 def get_categories():
     """Get all question categories"""
-    categories = list(set(q['category'] for q in QUESTIONS_DATA))
-    category_counts = {}
-    
-    for category in categories:
-        category_counts[category] = len([q for q in QUESTIONS_DATA if q['category'] == category])
+    counts = QUESTION_CATEGORY_FACET.counts()
     
     return jsonify({
-        'categories': sorted(categories),
-        'counts': category_counts
+        'categories': sorted(counts),
+        'counts': counts
     }), 200
 
 @community_bp.route('/tags', methods=['GET'])
 def get_popular_tags():
     """Get popular tags"""
-    all_tags = []
-    for question in QUESTIONS_DATA:
-        all_tags.extend(question['tags'])
-    
-    # Count tag frequency
-    tag_counts = {}
-    for tag in all_tags:
-        tag_counts[tag] = tag_counts.get(tag, 0) + 1
-    
-    # Sort by frequency
-    popular_tags = sorted(tag_counts.items(), key=lambda x: x[1], reverse=True)
+    popular = QUESTION_TAG_FACET.most_common(20)  # Top 20 tags
     
     return jsonify({
-        'popular_tags': popular_tags[:20]  # Top 20 tags
+        'popular_tags': [[tag, uses] for tag, uses in popular]
     }), 200
 
 @community_bp.route('/my-questions', methods=['GET'])
@@ -427,11 +359,15 @@ def get_my_questions():
     if 'user_id' not in session:
         return jsonify({'error': 'Authentication required'}), 401
     
-    user_questions = [q for q in QUESTIONS_DATA if q['author']['id'] == session['user_id']]
-    user_questions.sort(key=lambda x: x['created_at'], reverse=True)
+    user_questions = db.session.scalars(
+        db.select(Question)
+        .where(Question.user_id == session['user_id'])
+        .order_by(Question.created_at.desc())
+        .options(db.selectinload(Question.author), db.selectinload(Question.tags))
+    ).all()
     
     return jsonify({
-        'questions': user_questions,
+        'questions': [question.to_dict() for question in user_questions],
         'total': len(user_questions)
     }), 200
 
@@ -441,14 +377,20 @@ def get_my_answers():
     if 'user_id' not in session:
         return jsonify({'error': 'Authentication required'}), 401
     
-    user_answers = [a for a in ANSWERS_DATA if a['author']['id'] == session['user_id']]
-    user_answers.sort(key=lambda x: x['created_at'], reverse=True)
+    rows = db.session.execute(
+        db.select(Answer, Question.title)
+        .join(Question, Question.id == Answer.question_id)
+        .where(Answer.user_id == session['user_id'])
+        .order_by(Answer.created_at.desc())
+        .options(db.selectinload(Answer.author))
+    ).all()
     
-    # Get question titles for each answer
-    for answer in user_answers:
-        question = next((q for q in QUESTIONS_DATA if q['id'] == answer['question_id']), None)
-        if question:
-            answer['question_title'] = question['title']
+    # Include the question title of each answer
+    user_answers = []
+    for answer, question_title in rows:
+        answer_dict = answer.to_dict()
+        answer_dict['question_title'] = question_title
+        user_answers.append(answer_dict)
     
     return jsonify({
         'answers': user_answers,
@@ -458,30 +400,67 @@ def get_my_answers():
 @community_bp.route('/stats', methods=['GET'])
 def get_community_stats():
     """Get community statistics"""
-    total_questions = len(QUESTIONS_DATA)
-    total_answers = len(ANSWERS_DATA)
-    answered_questions = len([q for q in QUESTIONS_DATA if q['is_answered']])
+    total_questions = db.session.scalar(db.select(db.func.count(Question.id)))
+    total_answers = db.session.scalar(db.select(db.func.count(Answer.id)))
+    answered_questions = db.session.scalar(
+        db.select(db.func.count(Question.id)).where(Question.is_answered.is_(True))
+    )
     
     # Calculate answer rate
     answer_rate = (answered_questions / total_questions * 100) if total_questions > 0 else 0
     
-    # Get top contributors (simplified)
-    contributors = {}
-    for question in QUESTIONS_DATA:
-        author_id = question['author']['id']
-        contributors[author_id] = contributors.get(author_id, 0) + 1
-    
-    for answer in ANSWERS_DATA:
-        author_id = answer['author']['id']
-        contributors[author_id] = contributors.get(author_id, 0) + 1
-    
-    top_contributors = sorted(contributors.items(), key=lambda x: x[1], reverse=True)[:5]
+    # Get top contributors (questions plus answers)
+    posts = db.union_all(
+        db.select(Question.user_id.label('user_id')),
+        db.select(Answer.user_id.label('user_id'))
+    ).subquery()
+    post_count = db.func.count()
+    top_contributors = db.session.execute(
+        db.select(posts.c.user_id, post_count)
+        .group_by(posts.c.user_id)
+        .order_by(post_count.desc(), posts.c.user_id)
+        .limit(5)
+    ).all()
     
     return jsonify({
         'total_questions': total_questions,
         'total_answers': total_answers,
         'answered_questions': answered_questions,
         'answer_rate': round(answer_rate, 1),
-        'top_contributors': top_contributors
+        'top_contributors': [[user_id, count] for user_id, count in top_contributors]
     }), 200
 
+def delete_user_posts(user_id):
+    """Delete a user's questions and answers, in the caller's transaction"""
+    answered = db.session.execute(
+        db.select(Answer.question_id, db.func.count(Answer.id))
+        .where(Answer.user_id == user_id)
+        .group_by(Answer.question_id)
+    ).all()
+    for question_id, count in answered:
+        db.session.execute(
+            db.update(Question).where(Question.id == question_id).values(answers_count=Question.answers_count - count)
+        )
+    
+    # Questions whose best answer goes lose the mark
+    best = db.select(Answer.id).where(Answer.user_id == user_id).where(Answer.is_best_answer.is_(True))
+    db.session.execute(
+        db.update(Question).where(Question.best_answer_id.in_(best)).values(best_answer_id=None, is_answered=False)
+    )
+    db.session.execute(db.delete(Answer).where(Answer.user_id == user_id))
+    
+    # The questions leave the category and tag counts
+    QUESTION_CATEGORY_FACET.remove(dict(db.session.execute(
+        db.select(Question.category_key, db.func.count(Question.id))
+        .where(Question.user_id == user_id)
+        .group_by(Question.category_key)
+    ).all()))
+    QUESTION_TAG_FACET.remove(dict(db.session.execute(
+        db.select(QuestionTag.tag_key, db.func.count(QuestionTag.question_id))
+        .join(Question, Question.id == QuestionTag.question_id)
+        .where(Question.user_id == user_id)
+        .group_by(QuestionTag.tag_key)
+    ).all()))
+    
+    for question in Question.query.filter_by(user_id=user_id).all():
+        db.session.delete(question)
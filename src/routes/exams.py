@@ -1,275 +1,57 @@
-from flask import Blueprint, jsonify, request, session
+from flask import Blueprint, Response, current_app, jsonify, request, session, url_for
+from itsdangerous import BadSignature, URLSafeSerializer
 from src.models.user import User, UserProfile, db
+from src.services.catalogs import Catalog, CatalogSnapshot
+from src.services.etags import conditional
+from src.services.exam_calendar import ExamCalendar
+from src.services.exam_feed import BookmarkFeeds
+from src.services.exam_recommender import ExamRecommender
+from src.services.facets import FacetCounter
+from src.services.fragments import FragmentCache, spliced_response
+from src.services.projection import parse_fields
+from datetime import datetime, timezone
 import json
-from datetime import datetime
 
 exams_bp = Blueprint('exams', __name__)
 
-# Exam data (in real implementation, this would be in database)
-EXAMS_DATA = [
-    {
-        "id": 1,
-        "name": "JEE Main",
-        "full_name": "Joint Entrance Examination Main",
-        "stream": "Engineering",
-        "level": "Undergraduate",
-        "conducting_body": "National Testing Agency (NTA)",
-        "official_website": "https://jeemain.nta.nic.in/",
-        "application_deadline": "2025-02-25",
-        "exam_date": "2025-04-02",
-        "result_date": "2025-04-30",
-        "eligibility": "12th Pass with PCM",
-        "age_limit": "No age limit",
-        "attempts": "Unlimited",
-        "exam_mode": "Computer Based Test (CBT)",
-        "duration": "3 hours",
-        "subjects": ["Physics", "Chemistry", "Mathematics"],
-        "total_marks": 300,
-        "difficulty": "High",
-        "applicants": "13.8 Lakh",
-        "application_fee": {
-            "general": 650,
-            "obc": 650,
-            "sc": 325,
-            "st": 325
-        },
-        "exam_centers": ["All major cities in India"],
-        "syllabus_topics": [
-            "Physics: Mechanics, Thermodynamics, Waves, Electromagnetism",
-            "Chemistry: Physical, Organic, Inorganic Chemistry",
-            "Mathematics: Algebra, Calculus, Coordinate Geometry, Trigonometry"
-        ],
-        "preparation_tips": [
-            "Focus on NCERT textbooks",
-            "Practice previous year questions",
-            "Take regular mock tests",
-            "Maintain a study schedule"
-        ],
-        "colleges_accepting": ["NITs", "IIITs", "GFTIs", "State Engineering Colleges"],
-        "status": "expired",
-        "icon": "🔧"
-    },
-    {
-        "id": 2,
-        "name": "JEE Advanced",
-        "full_name": "Joint Entrance Examination Advanced",
-        "stream": "Engineering",
-        "level": "Undergraduate",
-        "conducting_body": "IIT (Rotating)",
-        "official_website": "https://jeeadv.ac.in/",
-        "application_deadline": "2025-05-02",
-        "exam_date": "2025-05-18",
-        "result_date": "2025-06-15",
-        "eligibility": "Qualify JEE Main",
-        "age_limit": "25 years (30 for SC/ST)",
-        "attempts": "2 attempts in consecutive years",
-        "exam_mode": "Computer Based Test (CBT)",
-        "duration": "3 hours per paper",
-        "subjects": ["Physics", "Chemistry", "Mathematics"],
-        "total_marks": 372,
-        "difficulty": "Very High",
-        "applicants": "1.87 Lakh",
-        "application_fee": {
-            "general": 2800,
-            "obc": 2800,
-            "sc": 1400,
-            "st": 1400
-        },
-        "exam_centers": ["Limited centers across India"],
-        "syllabus_topics": [
-            "Advanced Physics concepts",
-            "Advanced Chemistry problems",
-            "Higher Mathematics"
-        ],
-        "preparation_tips": [
-            "Master JEE Main syllabus first",
-            "Focus on conceptual understanding",
-            "Practice advanced level problems",
-            "Time management is crucial"
-        ],
-        "colleges_accepting": ["IITs", "ISM Dhanbad"],
-        "status": "expired",
-        "icon": "🏛️"
-    },
-    {
-        "id": 3,
-        "name": "NEET UG",
-        "full_name": "National Eligibility cum Entrance Test (Undergraduate)",
-        "stream": "Medical",
-        "level": "Undergraduate",
-        "conducting_body": "National Testing Agency (NTA)",
-        "official_website": "https://neet.nta.nic.in/",
-        "application_deadline": "2025-03-07",
-        "exam_date": "2025-05-04",
-        "result_date": "2025-06-04",
-        "eligibility": "12th Pass with PCB",
-        "age_limit": "17-25 years (30 for SC/ST/OBC)",
-        "attempts": "Unlimited",
-        "exam_mode": "Pen and Paper (Offline)",
-        "duration": "3 hours 20 minutes",
-        "subjects": ["Physics", "Chemistry", "Biology"],
-        "total_marks": 720,
-        "difficulty": "Very High",
-        "applicants": "22.76 Lakh",
-        "application_fee": {
-            "general": 1700,
-            "obc": 1700,
-            "sc": 1000,
-            "st": 1000
-        },
-        "exam_centers": ["All states and UTs"],
-        "syllabus_topics": [
-            "Physics: Mechanics, Thermodynamics, Optics",
-            "Chemistry: Physical, Organic, Inorganic",
-            "Biology: Botany and Zoology"
-        ],
-        "preparation_tips": [
-            "NCERT is the bible for NEET",
-            "Focus on Biology - highest weightage",
-            "Practice MCQs regularly",
-            "Revise frequently"
-        ],
-        "colleges_accepting": ["AIIMS", "Government Medical Colleges", "Private Medical Colleges"],
-        "status": "expired",
-        "icon": "🩺"
-    },
-    {
-        "id": 4,
-        "name": "CUET UG",
-        "full_name": "Common University Entrance Test (Undergraduate)",
-        "stream": "University Admissions",
-        "level": "Undergraduate",
-        "conducting_body": "National Testing Agency (NTA)",
-        "official_website": "https://cuet.samarth.ac.in/",
-        "application_deadline": "2025-03-24",
-        "exam_date": "2025-05-13",
-        "result_date": "2025-06-30",
-        "eligibility": "12th Pass",
-        "age_limit": "No age limit",
-        "attempts": "Unlimited",
-        "exam_mode": "Computer Based Test (CBT)",
-        "duration": "Varies by subjects chosen",
-        "subjects": ["Languages", "Domain Subjects", "General Test"],
-        "total_marks": "Varies",
-        "difficulty": "Medium",
-        "applicants": "14.9 Lakh",
-        "application_fee": {
-            "general": 650,
-            "obc": 650,
-            "sc": 325,
-            "st": 325
-        },
-        "exam_centers": ["All major cities"],
-        "syllabus_topics": [
-            "Based on NCERT curriculum",
-            "Subject-specific topics",
-            "General awareness"
-        ],
-        "preparation_tips": [
-            "Choose subjects wisely",
-            "Focus on NCERT textbooks",
-            "Practice mock tests",
-            "Stay updated with current affairs"
-        ],
-        "colleges_accepting": ["Central Universities", "State Universities", "Deemed Universities"],
-        "status": "expired",
-        "icon": "🎓"
-    },
-    {
-        "id": 5,
-        "name": "BITSAT",
-        "full_name": "BITS Admission Test",
-        "stream": "Engineering",
-        "level": "Undergraduate",
-        "conducting_body": "BITS Pilani",
-        "official_website": "https://www.bitsadmission.com/",
-        "application_deadline": "2025-06-30",
-        "exam_date": "2025-05-26",
-        "result_date": "2025-07-15",
-        "eligibility": "12th Pass with PCM",
-        "age_limit": "No age limit",
-        "attempts": "Once per year",
-        "exam_mode": "Computer Based Test (CBT)",
-        "duration": "3 hours",
-        "subjects": ["Physics", "Chemistry", "Mathematics", "English", "Logical Reasoning"],
-        "total_marks": 450,
-        "difficulty": "High",
-        "applicants": "3 Lakh",
-        "application_fee": {
-            "general": 3400,
-            "obc": 3400,
-            "sc": 3400,
-            "st": 3400
-        },
-        "exam_centers": ["Multiple cities in India and abroad"],
-        "syllabus_topics": [
-            "NCERT + advanced topics",
-            "English proficiency",
-            "Logical reasoning"
-        ],
-        "preparation_tips": [
-            "Speed and accuracy are key",
-            "Practice English and logical reasoning",
-            "No negative marking advantage",
-            "Time management crucial"
-        ],
-        "colleges_accepting": ["BITS Pilani", "BITS Goa", "BITS Hyderabad"],
-        "status": "urgent",
-        "icon": "⚙️"
-    },
-    {
-        "id": 6,
-        "name": "CAT",
-        "full_name": "Common Admission Test",
-        "stream": "Management",
-        "level": "Postgraduate",
-        "conducting_body": "IIMs (Rotating)",
-        "official_website": "https://iimcat.ac.in/",
-        "application_deadline": "2025-09-21",
-        "exam_date": "2025-11-30",
-        "result_date": "2026-01-15",
-        "eligibility": "Bachelor's Degree",
-        "age_limit": "No age limit",
-        "attempts": "Unlimited",
-        "exam_mode": "Computer Based Test (CBT)",
-        "duration": "2 hours",
-        "subjects": ["Verbal Ability", "Data Interpretation", "Quantitative Ability"],
-        "total_marks": "Percentile based",
-        "difficulty": "Very High",
-        "applicants": "3.29 Lakh",
-        "application_fee": {
-            "general": 2300,
-            "obc": 2300,
-            "sc": 1150,
-            "st": 1150
-        },
-        "exam_centers": ["Major cities across India"],
-        "syllabus_topics": [
-            "Reading comprehension",
-            "Data interpretation and analysis",
-            "Quantitative aptitude"
-        ],
-        "preparation_tips": [
-            "Focus on fundamentals",
-            "Practice time management",
-            "Read extensively",
-            "Take sectional tests"
-        ],
-        "colleges_accepting": ["IIMs", "Top B-Schools", "Management Institutes"],
-        "status": "open",
-        "icon": "💼"
-    }
-]
+class ExamIndexes(CatalogSnapshot):
+    """The exam catalog with its id index, facet, fragments, calendar, recommender and feeds"""
+
+    def __init__(self, exams, modified_at):
+        super().__init__(exams, modified_at)
+        self.by_id = {exam['id']: exam for exam in exams}
+        self.stream_facet = FacetCounter('exam_stream', lambda e: e['stream'], lambda: exams)
+        self.fragments = FragmentCache('exams', exams)
+        self.calendar = ExamCalendar(exams)
+        self.recommender = ExamRecommender(exams)
+        self.feeds = BookmarkFeeds(exams, modified_at)
+
+    def get(self, exam_id):
+        """An exam record by id, or None"""
+        return self.by_id.get(exam_id)
+
+# Exam catalog, loaded from src/data/exams.json and swapped in whole on reload
+EXAMS = Catalog('exams', ExamIndexes)
+
+# Salt for signed calendar feed links, which work without a session cookie
+FEED_TOKEN_SALT = 'exam-calendar-feed'
 
 @exams_bp.route('/exams', methods=['GET'])
+@conditional('exams')
 def get_all_exams():
-    """Get all exams with optional filtering"""
+    """Get all exams with optional filtering and ?fields= projection"""
     stream = request.args.get('stream')
     level = request.args.get('level')
     status = request.args.get('status')
     search = request.args.get('search', '').lower()
     
-    exams = EXAMS_DATA.copy()
+    try:
+        fields = parse_fields(request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    indexes = EXAMS.current
+    exams = indexes.data.copy()
     
     # Apply filters
     if stream:
@@ -287,91 +69,51 @@ def get_all_exams():
                 search in exam['full_name'].lower() or
                 search in exam['stream'].lower()]
     
-    return jsonify({
-        'exams': exams,
+    return spliced_response({
+        'exams': indexes.fragments.many(exams, fields),
         'total': len(exams)
-    }), 200
+    })
 
 @exams_bp.route('/exams/<int:exam_id>', methods=['GET'])
+@conditional('exams')
 def get_exam_details(exam_id):
     """Get detailed information about a specific exam"""
-    exam = next((exam for exam in EXAMS_DATA if exam['id'] == exam_id), None)
+    exam = EXAMS.current.fragments.get(exam_id)
     
     if not exam:
         return jsonify({'error': 'Exam not found'}), 404
     
-    return jsonify({'exam': exam}), 200
+    return spliced_response({'exam': exam})
 
 @exams_bp.route('/exams/streams', methods=['GET'])
+@conditional('exams')
 def get_exam_streams():
     """Get all available exam streams"""
-    streams = list(set(exam['stream'] for exam in EXAMS_DATA))
-    stream_counts = {}
-    
-    for stream in streams:
-        stream_counts[stream] = len([exam for exam in EXAMS_DATA if exam['stream'] == stream])
-    
+    stream_facet = EXAMS.current.stream_facet
     return jsonify({
-        'streams': streams,
-        'counts': stream_counts
+        'streams': stream_facet.values(),
+        'counts': stream_facet.counts()
     }), 200
 
 @exams_bp.route('/exams/upcoming', methods=['GET'])
 def get_upcoming_exams():
     """Get upcoming exams based on current date"""
-    current_date = datetime.now().date()
-    upcoming_exams = []
-    
-    for exam in EXAMS_DATA:
-        try:
-            exam_date = datetime.strptime(exam['exam_date'], '%Y-%m-%d').date()
-            if exam_date >= current_date:
-                days_remaining = (exam_date - current_date).days
-                exam_copy = exam.copy()
-                exam_copy['days_remaining'] = days_remaining
-                upcoming_exams.append(exam_copy)
-        except:
-            continue
+    exams, total = EXAMS.current.calendar.upcoming()
     
-    # Sort by exam date
-    upcoming_exams.sort(key=lambda x: x['exam_date'])
-    
-    return jsonify({
-        'upcoming_exams': upcoming_exams,
-        'total': len(upcoming_exams)
-    }), 200
+    return spliced_response({
+        'upcoming_exams': exams,
+        'total': total
+    })
 
 @exams_bp.route('/exams/deadlines', methods=['GET'])
 def get_exam_deadlines():
     """Get exams with approaching deadlines"""
-    current_date = datetime.now().date()
-    deadline_exams = []
+    exams, total = EXAMS.current.calendar.deadlines()
     
-    for exam in EXAMS_DATA:
-        try:
-            deadline_date = datetime.strptime(exam['application_deadline'], '%Y-%m-%d').date()
-            if deadline_date >= current_date:
-                days_remaining = (deadline_date - current_date).days
-                if days_remaining <= 30:  # Deadlines within 30 days
-                    exam_copy = exam.copy()
-                    exam_copy['deadline_days_remaining'] = days_remaining
-                    if days_remaining <= 7:
-                        exam_copy['urgency'] = 'urgent'
-                    elif days_remaining <= 15:
-                        exam_copy['urgency'] = 'moderate'
-                    else:
-                        exam_copy['urgency'] = 'normal'
-                    deadline_exams.append(exam_copy)
-        except:
-            continue
-    
-    # Sort by deadline
-    deadline_exams.sort(key=lambda x: x['application_deadline'])
-    
-    return jsonify({
-        'deadline_exams': deadline_exams,
-        'total': len(deadline_exams)
-    }), 200
+    return spliced_response({
+        'deadline_exams': exams,
+        'total': total
+    })
 
 @exams_bp.route('/exams/bookmark', methods=['POST'])
 def bookmark_exam():
@@ -387,7 +129,7 @@ def bookmark_exam():
             return jsonify({'error': 'Exam ID is required'}), 400
         
         # Check if exam exists
-        exam = next((exam for exam in EXAMS_DATA if exam['id'] == exam_id), None)
+        exam = EXAMS.current.get(exam_id)
         if not exam:
             return jsonify({'error': 'Exam not found'}), 404
         
@@ -460,56 +202,106 @@ def get_bookmarked_exams():
         return jsonify({'bookmarked_exams': []}), 200
     
     bookmarked_ids = json.loads(profile.preferred_exams)
-    bookmarked_exams = [exam for exam in EXAMS_DATA if exam['id'] in bookmarked_ids]
+    bookmarked_exams = [exam for exam in EXAMS.current.data if exam['id'] in bookmarked_ids]
     
     return jsonify({
         'bookmarked_exams': bookmarked_exams,
         'total': len(bookmarked_exams)
     }), 200
 
-@exams_bp.route('/exams/recommendations', methods=['GET'])
-def get_exam_recommendations():
-    """Get personalized exam recommendations for user"""
-    if 'user_id' not in session:
+def _feed_serializer():
+    return URLSafeSerializer(current_app.secret_key, salt=FEED_TOKEN_SALT)
+
+def _feed_user_id():
+    """User id from the feed link's token, else from the session"""
+    token = request.args.get('token')
+    if token is None:
+        return session.get('user_id')
+    try:
+        return _feed_serializer().loads(token)
+    except BadSignature:
+        return None
+
+def _bookmarked_exam_ids(user_id):
+    preferred_exams = db.session.execute(
+        db.select(UserProfile.preferred_exams).where(UserProfile.user_id == user_id)
+    ).scalar()
+    try:
+        bookmarked = json.loads(preferred_exams) if preferred_exams else []
+    except ValueError:
+        return []
+    return [exam_id for exam_id in bookmarked if isinstance(exam_id, int)] if isinstance(bookmarked, list) else []
+
+@exams_bp.route('/exams/bookmarks.ics', methods=['GET'])
+def get_bookmarks_calendar():
+    """iCalendar feed of the user's bookmarked exam dates"""
+    user_id = _feed_user_id()
+    if user_id is None:
         return jsonify({'error': 'Authentication required'}), 401
     
-    user = User.query.get(session['user_id'])
-    profile = UserProfile.query.filter_by(user_id=session['user_id']).first()
+    # Only the profile's version is read unless the feed has to be rendered
+    updated_at = db.session.execute(
+        db.select(UserProfile.updated_at).where(UserProfile.user_id == user_id)
+    ).scalar()
+    feeds = EXAMS.current.feeds
+    etag, last_modified = feeds.validators(user_id, updated_at)
+    # Until its second has passed, a later change could carry the same Last-Modified
+    validator = last_modified if last_modified <= datetime.now(timezone.utc) else None
     
-    if not user:
-        return jsonify({'error': 'User not found'}), 404
+    if request.if_none_match:
+        not_modified = request.if_none_match.contains(etag)
+    else:
+        not_modified = (request.if_modified_since is not None and validator is not None
+                        and validator <= request.if_modified_since)
     
-    recommendations = []
+    if not_modified:
+        response = Response(status=304)
+    else:
+        body = feeds.feed(user_id, etag, last_modified, lambda: _bookmarked_exam_ids(user_id))
+        response = Response(body, mimetype='text/calendar')
     
-    # Filter exams based on user's stream preference
-    if user.stream:
-        stream_exams = [exam for exam in EXAMS_DATA if exam['stream'].lower() == user.stream.lower()]
-        recommendations.extend(stream_exams)
+    response.set_etag(etag)
+    if validator is not None:
+        response.last_modified = validator
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+@exams_bp.route('/exams/bookmarks/calendar-link', methods=['GET'])
+def get_bookmarks_calendar_link():
+    """Subscription URL for the bookmarked exams calendar feed"""
+    if 'user_id' not in session:
+        return jsonify({'error': 'Authentication required'}), 401
     
-    # Add exams based on class level
-    if user.class_level:
-        if user.class_level in ['12th', 'Class 12']:
-            undergraduate_exams = [exam for exam in EXAMS_DATA if exam['level'] == 'Undergraduate']
-            recommendations.extend(undergraduate_exams)
-        elif 'graduate' in user.class_level.lower():
-            postgraduate_exams = [exam for exam in EXAMS_DATA if exam['level'] == 'Postgraduate']
-            recommendations.extend(postgraduate_exams)
+    token = _feed_serializer().dumps(session['user_id'])
+    return jsonify({
+        'url': url_for('exams.get_bookmarks_calendar', token=token, _external=True)
+    }), 200
+
+@exams_bp.route('/exams/recommendations', methods=['GET'])
+def get_exam_recommendations():
+    """Get personalized exam recommendations for user"""
+    if 'user_id' not in session:
+        return jsonify({'error': 'Authentication required'}), 401
     
-    # Remove duplicates
-    seen_ids = set()
-    unique_recommendations = []
-    for exam in recommendations:
-        if exam['id'] not in seen_ids:
-            unique_recommendations.append(exam)
-            seen_ids.add(exam['id'])
+    user_id = session['user_id']
+    recommender = EXAMS.current.recommender
+    result = recommender.cached(user_id)
     
-    # If no specific recommendations, show popular exams
-    if not unique_recommendations:
-        unique_recommendations = EXAMS_DATA[:5]  # Top 5 exams
+    if result is None:
+        user = db.session.execute(
+            db.select(User.stream, User.class_level).where(User.id == user_id)
+        ).first()
+        
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        result = recommender.recommend(user.stream, user.class_level)
+        recommender.remember(user_id, result)
     
-    return jsonify({
-        'recommended_exams': unique_recommendations,
-        'total': len(unique_recommendations),
+    exams, total = result
+    return spliced_response({
+        'recommended_exams': exams,
+        'total': total,
         'reason': 'Based on your profile preferences'
-    }), 200
-
+    })
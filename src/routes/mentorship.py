@@ -1,193 +1,109 @@
 from flask import Blueprint, jsonify, request, session
+from sqlalchemy.exc import IntegrityError
+from src.models.mentorship import MentorBooking, MentorRatingAggregate, MentorReview, MentorSuggestion
 from src.models.user import User, UserProfile, db
+from src.services.catalogs import Catalog, CatalogSnapshot
+from src.services.etags import conditional
+from src.services.facets import FacetCounter
+from src.services.fragments import FragmentCache, encode, spliced_response
+from src.services.mentor_availability import MentorAvailability
+from src.services.mentor_matching import SUGGESTION_COUNT
+from src.services.mentor_ranking import MentorRanker
+from src.services.mentor_ratings import LIVE_RATINGS, add_rating, blended_rating, refresh_live_ratings
+from src.services.pagination import decode_cursor, encode_cursor, page_size
+from src.services.projection import parse_fields, projection_plan
+from src.services.slot_holds import SLOT_HOLDS, booking_hold, hold_expiry, release_lapsed_hold, sweep_slot_holds
 from datetime import datetime, timedelta
 import json
-import uuid
 
 mentorship_bp = Blueprint('mentorship', __name__)
+mentorship_bp.before_request(refresh_live_ratings)
+mentorship_bp.before_request(sweep_slot_holds)
 
-# Mentor data (in real implementation, this would be in database)
-MENTORS_DATA = [
-    {
-        "id": 1,
-        "name": "Arjun Sharma",
-        "college": "IIT Delhi",
-        "course": "B.Tech Computer Science",
-        "year": "4th Year",
-        "expertise": ["JEE Preparation", "Computer Science", "Campus Life", "Placements"],
-        "rating": 4.9,
-        "reviews_count": 127,
-        "sessions_completed": 245,
-        "bio": "Final year CS student at IIT Delhi with internship experience at Google. Passionate about helping JEE aspirants achieve their dreams.",
-        "achievements": [
-            "JEE Advanced AIR 156",
-            "Google Summer Intern 2024",
-            "ACM ICPC Regionalist",
-            "Dean's List for 3 consecutive semesters"
-        ],
-        "availability": {
-            "days": ["Monday", "Wednesday", "Friday", "Sunday"],
-            "time_slots": ["10:00-12:00", "14:00-16:00", "19:00-21:00"]
-        },
-        "pricing": {
-            "per_session": 499,
-            "package_5": 2199,
-            "package_10": 3999
-        },
-        "languages": ["English", "Hindi"],
-        "location": "Delhi",
-        "profile_image": "/images/mentors/arjun.jpg",
-        "specializations": ["JEE Main", "JEE Advanced", "BITSAT"],
-        "response_time": "Within 2 hours",
-        "success_stories": 45,
-        "is_verified": True,
-        "is_available": True
-    },
-    {
-        "id": 2,
-        "name": "Priya Patel",
-        "college": "AIIMS Delhi",
-        "course": "MBBS",
-        "year": "3rd Year",
-        "expertise": ["NEET Preparation", "Medical Studies", "Study Techniques", "Time Management"],
-        "rating": 4.8,
-        "reviews_count": 89,
-        "sessions_completed": 156,
-        "bio": "MBBS student at AIIMS Delhi. Cleared NEET with AIR 23. Love helping medical aspirants with preparation strategies and motivation.",
-        "achievements": [
-            "NEET AIR 23",
-            "State Topper in 12th Boards",
-            "Medical Quiz Champion",
-            "Research publication in medical journal"
-        ],
-        "availability": {
-            "days": ["Tuesday", "Thursday", "Saturday", "Sunday"],
-            "time_slots": ["09:00-11:00", "15:00-17:00", "20:00-22:00"]
-        },
-        "pricing": {
-            "per_session": 599,
-            "package_5": 2699,
-            "package_10": 4999
-        },
-        "languages": ["English", "Hindi", "Gujarati"],
-        "location": "Delhi",
-        "profile_image": "/images/mentors/priya.jpg",
-        "specializations": ["NEET UG", "AIIMS", "Medical Career Guidance"],
-        "response_time": "Within 3 hours",
-        "success_stories": 32,
-        "is_verified": True,
-        "is_available": True
-    },
-    {
-        "id": 3,
-        "name": "Rahul Kumar",
-        "college": "IIM Bangalore",
-        "course": "MBA",
-        "year": "2nd Year",
-        "expertise": ["CAT Preparation", "MBA Admissions", "Interview Preparation", "Career Guidance"],
-        "rating": 4.7,
-        "reviews_count": 64,
-        "sessions_completed": 98,
-        "bio": "MBA student at IIM Bangalore. CAT 99.8 percentiler. Former software engineer with 3 years experience. Helping CAT aspirants crack the exam.",
-        "achievements": [
-            "CAT 99.8 percentile",
-            "IIM Bangalore MBA",
-            "3 years software engineering experience",
-            "Summer internship at McKinsey"
-        ],
-        "availability": {
-            "days": ["Monday", "Wednesday", "Friday", "Saturday"],
-            "time_slots": ["11:00-13:00", "16:00-18:00", "21:00-23:00"]
-        },
-        "pricing": {
-            "per_session": 699,
-            "package_5": 3199,
-            "package_10": 5999
-        },
-        "languages": ["English", "Hindi"],
-        "location": "Bangalore",
-        "profile_image": "/images/mentors/rahul.jpg",
-        "specializations": ["CAT", "MBA Admissions", "Career Switch"],
-        "response_time": "Within 4 hours",
-        "success_stories": 28,
-        "is_verified": True,
-        "is_available": True
-    },
-    {
-        "id": 4,
-        "name": "Sneha Reddy",
-        "college": "NLSIU Bangalore",
-        "course": "BA LLB",
-        "year": "4th Year",
-        "expertise": ["CLAT Preparation", "Law Studies", "Legal Career", "Moot Courts"],
-        "rating": 4.6,
-        "reviews_count": 42,
-        "sessions_completed": 67,
-        "bio": "Final year law student at NLSIU Bangalore. CLAT AIR 45. Active in moot courts and legal research. Passionate about legal education.",
-        "achievements": [
-            "CLAT AIR 45",
-            "National Moot Court Winner",
-            "Legal Research Publications",
-            "Internship at Supreme Court"
-        ],
-        "availability": {
-            "days": ["Tuesday", "Thursday", "Saturday"],
-            "time_slots": ["10:00-12:00", "17:00-19:00"]
-        },
-        "pricing": {
-            "per_session": 449,
-            "package_5": 1999,
-            "package_10": 3699
-        },
-        "languages": ["English", "Hindi", "Telugu"],
-        "location": "Bangalore",
-        "profile_image": "/images/mentors/sneha.jpg",
-        "specializations": ["CLAT", "Law Career Guidance", "Legal Studies"],
-        "response_time": "Within 6 hours",
-        "success_stories": 18,
-        "is_verified": True,
-        "is_available": True
-    },
-    {
-        "id": 5,
-        "name": "Vikash Singh",
-        "college": "NIT Trichy",
-        "course": "B.Tech Mechanical",
-        "year": "Alumni (2023)",
-        "expertise": ["JEE Main", "NIT Admissions", "Mechanical Engineering", "Placements"],
-        "rating": 4.5,
-        "reviews_count": 78,
-        "sessions_completed": 134,
-        "bio": "NIT Trichy alumnus working at Tata Motors. JEE Main AIR 1200. Helping students with JEE preparation and engineering career guidance.",
-        "achievements": [
-            "JEE Main AIR 1200",
-            "NIT Trichy Mechanical Engineering",
-            "Placed at Tata Motors",
-            "Technical Society President"
-        ],
-        "availability": {
-            "days": ["Saturday", "Sunday"],
-            "time_slots": ["09:00-11:00", "14:00-16:00", "19:00-21:00"]
-        },
-        "pricing": {
-            "per_session": 399,
-            "package_5": 1799,
-            "package_10": 3299
-        },
-        "languages": ["English", "Hindi"],
-        "location": "Chennai",
-        "profile_image": "/images/mentors/vikash.jpg",
-        "specializations": ["JEE Main", "NIT Admissions", "Mechanical Engineering"],
-        "response_time": "Within 8 hours",
-        "success_stories": 25,
-        "is_verified": True,
-        "is_available": True
-    }
-]
+class MentorIndexes(CatalogSnapshot):
+    """The mentor catalog with its facets, fragments, ranking indexes and compiled availability"""
+
+    def __init__(self, mentors, modified_at):
+        super().__init__(mentors, modified_at)
+        self.expertise_facet = FacetCounter('mentor_expertise', lambda m: m['expertise'], lambda: mentors, multi=True)
+        self.college_facet = FacetCounter('mentor_college', lambda m: m['college'], lambda: mentors)
+        self.fragments = FragmentCache('mentors', mentors)
+        self.ranker = MentorRanker(mentors)
+        self.availability = MentorAvailability(mentors)
+    
+    def get(self, mentor_id):
+        """A mentor record by id, or None"""
+        position = self.ranker.position(mentor_id)
+        return None if position is None else self.data[position]
+
+# Mentor catalog, loaded from src/data/mentors.json and swapped in whole on reload
+MENTORS = Catalog('mentors', MentorIndexes)
+
+# Per-session price bands of the search budget_range: (exclusive low, inclusive high)
+BUDGET_RANGES = {
+    'low': (None, 400),
+    'medium': (400, 600),
+    'high': (600, None)
+}
+
+# Booking statuses that no longer hold their slot
+RELEASED_STATUSES = ('cancelled', 'expired')
+
+# Availability horizon in days: default and maximum
+DEFAULT_AVAILABILITY_DAYS = 30
+MAX_AVAILABILITY_DAYS = 90
+
+def _ranking_cursor(cursor):
+    """(score, id) of the last mentor on the previous page, or None; raises ValueError if malformed"""
+    if not cursor:
+        return None
+    values = decode_cursor(cursor)
+    try:
+        return float(values['score']), int(values['id'])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError('Invalid cursor')
+
+def _live_fragments(indexes, mentors, fields):
+    """Encoded mentor records whose rating and reviews_count include the stored reviews
+    
+    Mentors without stored reviews are served from the pre-encoded fragments.
+    """
+    totals = LIVE_RATINGS.totals
+    project = projection_plan(fields) if fields is not None else None
+    fragments = []
+    for mentor in mentors:
+        reviews_count, rating_sum = totals.get(mentor['id'], (0, 0))
+        if not reviews_count:
+            fragments.append(indexes.fragments.get(mentor['id'], fields))
+            continue
+        rating, count = blended_rating(mentor, reviews_count, rating_sum)
+        live = dict(mentor, rating=round(rating, 2), reviews_count=count)
+        fragments.append(encode(project(live) if project else live))
+    return fragments
+
+def _ranked_page(indexes, mask, scores, fields):
+    """One page of the matching mentors, best first, or an error response"""
+    limit = page_size(request.args.get('limit', type=int))
+    try:
+        after = _ranking_cursor(request.args.get('cursor'))
+    except ValueError as e:
+        return None, (jsonify({'error': str(e)}), 400)
+    
+    positions, last, total = indexes.ranker.top(mask, scores, limit, after)
+    return {
+        'mentors': _live_fragments(indexes, [indexes.data[position] for position in positions], fields),
+        'total': total,
+        'next_cursor': encode_cursor({'score': last[0], 'id': last[1]}) if last else None,
+        'limit': limit
+    }, None
 
 @mentorship_bp.route('/mentors', methods=['GET'])
+@conditional('mentors', 'mentor_ratings')
 def get_all_mentors():
-    """Get all mentors with optional filtering"""
+    """Get mentors by live rating with optional filtering and ?fields= projection, one page at a time
+    
+    Pass the returned next_cursor as ?cursor= to fetch the following page.
+    """
     college = request.args.get('college')
     expertise = request.args.get('expertise')
     location = request.args.get('location')
@@ -195,109 +111,184 @@ def get_all_mentors():
     max_price = request.args.get('max_price', type=int)
     available_only = request.args.get('available_only', 'true').lower() == 'true'
     
-    mentors = MENTORS_DATA.copy()
+    try:
+        fields = parse_fields(request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    indexes = MENTORS.current
+    ranker = indexes.ranker
+    rating, _ = LIVE_RATINGS.columns(ranker)
     
     # Apply filters
+    mask = ranker.available.copy() if available_only else ranker.all()
+    
     if college:
-        mentors = [mentor for mentor in mentors if college.lower() in mentor['college'].lower()]
+        mask &= ranker.text_mask('college', college)
     
     if expertise:
-        mentors = [mentor for mentor in mentors if 
-                  any(expertise.lower() in exp.lower() for exp in mentor['expertise'])]
+        mask &= ranker.text_mask('expertise', expertise)
     
     if location:
-        mentors = [mentor for mentor in mentors if location.lower() in mentor['location'].lower()]
+        mask &= ranker.text_mask('location', location)
     
     if min_rating:
-        mentors = [mentor for mentor in mentors if mentor['rating'] >= min_rating]
+        mask &= rating >= min_rating
     
     if max_price:
-        mentors = [mentor for mentor in mentors if mentor['pricing']['per_session'] <= max_price]
+        mask &= ranker.price <= max_price
     
-    if available_only:
-        mentors = [mentor for mentor in mentors if mentor['is_available']]
+    # Best rated first
+    page, error = _ranked_page(indexes, mask, rating, fields)
+    if error:
+        return error
+    return spliced_response(page)
+
+@mentorship_bp.route('/mentors/suggested', methods=['GET'])
+def get_suggested_mentors():
+    """Get the mentors matched to the current user, with optional ?fields= projection
     
-    # Sort by rating (descending)
-    mentors.sort(key=lambda x: x['rating'], reverse=True)
+    Matches are computed offline by the suggest-mentors command; users without
+    any get the top-rated available mentors.
+    """
+    if 'user_id' not in session:
+        return jsonify({'error': 'Authentication required'}), 401
     
-    return jsonify({
-        'mentors': mentors,
-        'total': len(mentors)
-    }), 200
+    try:
+        fields = parse_fields(request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    indexes = MENTORS.current
+    suggestion = db.session.get(MentorSuggestion, session['user_id'])
+    
+    if suggestion:
+        # Mentors dropped from the catalog since the job ran are left out
+        matches = [(indexes.get(mentor_id), score) for mentor_id, score in json.loads(suggestion.mentors)]
+        matches = [(mentor, score) for mentor, score in matches if mentor is not None]
+        return spliced_response({
+            'mentors': _live_fragments(indexes, [mentor for mentor, _ in matches], fields),
+            'scores': [score for _, score in matches],
+            'personalized': True,
+            'computed_at': suggestion.computed_at.isoformat()
+        })
+    
+    ranker = indexes.ranker
+    rating, _ = LIVE_RATINGS.columns(ranker)
+    positions, _, _ = ranker.top(ranker.available, rating, SUGGESTION_COUNT)
+    return spliced_response({
+        'mentors': _live_fragments(indexes, [indexes.data[position] for position in positions], fields),
+        'scores': [],
+        'personalized': False,
+        'computed_at': None
+    })
 
 @mentorship_bp.route('/mentors/<int:mentor_id>', methods=['GET'])
+@conditional('mentors', 'mentor_ratings')
 def get_mentor_details(mentor_id):
-    """Get detailed information about a specific mentor"""
-    mentor = next((mentor for mentor in MENTORS_DATA if mentor['id'] == mentor_id), None)
+    """Get detailed information about a specific mentor, rated with the stored reviews"""
+    indexes = MENTORS.current
+    mentor = indexes.get(mentor_id)
     
     if not mentor:
         return jsonify({'error': 'Mentor not found'}), 404
     
-    return jsonify({'mentor': mentor}), 200
+    return spliced_response({'mentor': _live_fragments(indexes, [mentor], None)[0]})
 
 @mentorship_bp.route('/mentors/search', methods=['POST'])
 def search_mentors():
-    """Search mentors based on specific criteria"""
+    """Search mentors based on specific criteria, best matches first, with ?limit=, ?cursor= and ?fields="""
     data = request.json
     target_exam = data.get('target_exam')
     preferred_college = data.get('preferred_college')
     budget_range = data.get('budget_range')  # low, medium, high
     expertise_areas = data.get('expertise_areas', [])
     
-    mentors = MENTORS_DATA.copy()
+    try:
+        fields = parse_fields(request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    indexes = MENTORS.current
+    ranker = indexes.ranker
+    mask = ranker.all()
     
     # Filter by target exam
     if target_exam:
-        mentors = [mentor for mentor in mentors if 
-                  any(target_exam.lower() in spec.lower() for spec in mentor['specializations'])]
+        mask &= ranker.text_mask('specializations', target_exam)
     
     # Filter by preferred college
     if preferred_college:
-        mentors = [mentor for mentor in mentors if 
-                  preferred_college.lower() in mentor['college'].lower()]
+        mask &= ranker.text_mask('college', preferred_college)
     
     # Filter by budget range
-    if budget_range:
-        if budget_range == 'low':
-            mentors = [mentor for mentor in mentors if mentor['pricing']['per_session'] <= 400]
-        elif budget_range == 'medium':
-            mentors = [mentor for mentor in mentors if 400 < mentor['pricing']['per_session'] <= 600]
-        elif budget_range == 'high':
-            mentors = [mentor for mentor in mentors if mentor['pricing']['per_session'] > 600]
-    
-    # Filter by expertise areas
+    if budget_range in BUDGET_RANGES:
+        low, high = BUDGET_RANGES[budget_range]
+        if low is not None:
+            mask &= ranker.price > low
+        if high is not None:
+            mask &= ranker.price <= high
+    
+    # Filter by expertise areas (any of them)
     if expertise_areas:
-        mentors = [mentor for mentor in mentors if 
-                  any(area.lower() in exp.lower() for area in expertise_areas for exp in mentor['expertise'])]
-    
-    # Sort by rating and success stories
-    mentors.sort(key=lambda x: (x['rating'], x['success_stories']), reverse=True)
-    
-    return jsonify({
-        'mentors': mentors,
-        'total': len(mentors),
-        'search_criteria': data
-    }), 200
+        area_mask = ~ranker.all()
+        for area in expertise_areas:
+            area_mask |= ranker.text_mask('expertise', area)
+        mask &= area_mask
+    
+    # Weighted live rating, success stories and price fit
+    _, search_score = LIVE_RATINGS.columns(ranker)
+    page, error = _ranked_page(indexes, mask, search_score, fields)
+    if error:
+        return error
+    page['search_criteria'] = data
+    return spliced_response(page)
+
+def _slot_end(mentor, session_datetime):
+    """End of the mentor's slot starting at session_datetime, or None if no slot starts then"""
+    if session_datetime.strftime('%A') not in mentor['availability']['days']:
+        return None
+    
+    for time_slot in mentor['availability']['time_slots']:
+        start, _, end = time_slot.partition('-')
+        if start == session_datetime.strftime('%H:%M'):
+            slot_end = datetime.combine(session_datetime.date(), datetime.strptime(end, '%H:%M').time())
+            # Slots running past midnight end on the next day
+            return slot_end if slot_end > session_datetime else slot_end + timedelta(days=1)
+    return None
+
+def _mentor_info(mentor):
+    return {
+        'name': mentor['name'],
+        'college': mentor['college'],
+        'expertise': mentor['expertise']
+    }
 
 @mentorship_bp.route('/mentors/<int:mentor_id>/book', methods=['POST'])
-def book_mentor_session():
-    """Book a session with a mentor"""
+def book_mentor_session(mentor_id):
+    """Book a session with a mentor
+    
+    The slot is claimed by inserting the booking: a unique index on the
+    mentor's live bookings lets exactly one of several simultaneous requests
+    succeed, and the others get 409 without waiting on any lock held by the
+    application. The booking holds the slot until hold_expires_at; if it is
+    not paid for by then, the slot is released.
+    """
     if 'user_id' not in session:
         return jsonify({'error': 'Authentication required'}), 401
     
     try:
         data = request.json
-        mentor_id = data.get('mentor_id')
         session_date = data.get('session_date')
         session_time = data.get('session_time')
         session_type = data.get('session_type', 'single')  # single, package_5, package_10
         message = data.get('message', '')
         
-        if not all([mentor_id, session_date, session_time]):
-            return jsonify({'error': 'Mentor ID, date, and time are required'}), 400
+        if not all([session_date, session_time]):
+            return jsonify({'error': 'Date and time are required'}), 400
         
         # Check if mentor exists
-        mentor = next((mentor for mentor in MENTORS_DATA if mentor['id'] == mentor_id), None)
+        mentor = MENTORS.current.get(mentor_id)
         if not mentor:
             return jsonify({'error': 'Mentor not found'}), 404
         
@@ -312,6 +303,10 @@ def book_mentor_session():
         except ValueError:
             return jsonify({'error': 'Invalid date/time format'}), 400
         
+        slot_end = _slot_end(mentor, session_datetime)
+        if slot_end is None:
+            return jsonify({'error': 'The mentor has no slot starting at this date and time'}), 400
+        
         # Calculate pricing
         pricing = mentor['pricing']
         if session_type == 'package_5':
@@ -321,83 +316,146 @@ def book_mentor_session():
             amount = pricing['package_10']
             sessions_count = 10
         else:
+            session_type = 'single'
             amount = pricing['per_session']
             sessions_count = 1
         
-        # Create booking record (in real implementation, this would be stored in database)
-        booking = {
-            'id': str(uuid.uuid4()),
-            'user_id': session['user_id'],
-            'mentor_id': mentor_id,
-            'session_date': session_date,
-            'session_time': session_time,
-            'session_type': session_type,
-            'sessions_count': sessions_count,
-            'amount': amount,
-            'status': 'pending_payment',
-            'message': message,
-            'created_at': datetime.now().isoformat(),
-            'mentor_info': {
-                'name': mentor['name'],
-                'college': mentor['college'],
-                'expertise': mentor['expertise']
-            }
-        }
+        # A plain read first, so requests for a slot taken earlier fail without a write;
+        # only when the slot looks taken is a lapsed hold no sweeper has expired yet released
+        taken = db.session.scalar(
+            db.select(MentorBooking.id)
+            .where(MentorBooking.mentor_id == mentor_id)
+            .where(MentorBooking.slot_start == session_datetime)
+            .where(MentorBooking.status.notin_(RELEASED_STATUSES))
+        )
+        if taken and not release_lapsed_hold(mentor_id, session_datetime):
+            return jsonify({'error': 'This slot is already booked'}), 409
+        
+        booking = MentorBooking(
+            user_id=session['user_id'],
+            mentor_id=mentor_id,
+            slot_start=session_datetime,
+            slot_end=slot_end,
+            session_type=session_type,
+            sessions_count=sessions_count,
+            amount=amount,
+            message=message,
+            hold_expires_at=hold_expiry()
+        )
+        db.session.add(booking)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Another booking for the slot committed first
+            db.session.rollback()
+            return jsonify({'error': 'This slot is already booked'}), 409
+        SLOT_HOLDS.add(booking_hold(booking))
+        
+        booking_dict = booking.to_dict()
+        booking_dict['mentor_info'] = _mentor_info(mentor)
         
         return jsonify({
             'message': 'Session booking created successfully',
-            'booking': booking,
+            'booking': booking_dict,
             'payment_required': True
         }), 201
         
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': 'Internal server error'}), 500
 
+def _booked_slots(first_day, days, mentor_id=None):
+    """(mentor_id, slot_start) of paid bookings and live holds in the days from first_day
+    
+    Holds come from the in-memory hold store rather than the database.
+    """
+    start = datetime.combine(first_day, datetime.min.time())
+    end = start + timedelta(days=days)
+    query = (
+        db.select(MentorBooking.mentor_id, MentorBooking.slot_start)
+        .where(MentorBooking.slot_start >= start)
+        .where(MentorBooking.slot_start < end)
+        .where(MentorBooking.status.in_(('confirmed', 'completed')))
+    )
+    if mentor_id is not None:
+        query = query.where(MentorBooking.mentor_id == mentor_id)
+    held = [slot for slot in SLOT_HOLDS.held(mentor_id) if start <= slot[1] < end]
+    return db.session.execute(query).all() + held
+
 @mentorship_bp.route('/mentors/<int:mentor_id>/availability', methods=['GET'])
 def get_mentor_availability(mentor_id):
-    """Get mentor's availability for next 30 days"""
-    mentor = next((mentor for mentor in MENTORS_DATA if mentor['id'] == mentor_id), None)
-    
-    if not mentor:
+    """Get mentor's open and booked slots for the next ?days= days (default 30)"""
+    availability = MENTORS.current.availability
+    if mentor_id not in availability:
         return jsonify({'error': 'Mentor not found'}), 404
     
-    # Generate availability for next 30 days
-    availability = []
-    current_date = datetime.now().date()
+    days = request.args.get('days', DEFAULT_AVAILABILITY_DAYS, type=int)
+    days = max(1, min(days, MAX_AVAILABILITY_DAYS))
+    now = datetime.now()
+    today = now.date()
     
-    for i in range(30):
-        date = current_date + timedelta(days=i)
-        day_name = date.strftime('%A')
-        
-        if day_name in mentor['availability']['days']:
-            available_slots = []
-            for time_slot in mentor['availability']['time_slots']:
-                # In real implementation, check against existing bookings
-                available_slots.append({
-                    'time': time_slot,
-                    'available': True  # Simplified - would check actual bookings
-                })
-            
-            availability.append({
-                'date': date.isoformat(),
-                'day': day_name,
-                'slots': available_slots
-            })
+    free = availability.free(_booked_slots(today, days, mentor_id), today, days, now)
     
     return jsonify({
         'mentor_id': mentor_id,
-        'availability': availability
+        'availability': availability.day_slots(mentor_id, free, today)
+    }), 200
+
+@mentorship_bp.route('/mentors/free', methods=['GET'])
+def get_free_mentors():
+    """Get mentors with an open slot starting between ?start= and ?end= (ISO date-times)"""
+    try:
+        start = datetime.fromisoformat(request.args['start'])
+        end = datetime.fromisoformat(request.args['end'])
+    except (KeyError, ValueError):
+        return jsonify({'error': 'start and end date-times are required, e.g. 2025-07-01T09:00'}), 400
+    
+    if end <= start:
+        return jsonify({'error': 'end must be after start'}), 400
+    
+    first_day = start.date()
+    days = ((end - timedelta(microseconds=1)).date() - first_day).days + 1
+    if days > MAX_AVAILABILITY_DAYS:
+        return jsonify({'error': f'The window may span at most {MAX_AVAILABILITY_DAYS} days'}), 400
+    
+    indexes = MENTORS.current
+    availability = indexes.availability
+    free = availability.free(_booked_slots(first_day, days), first_day, days, datetime.now())
+    window = availability.window_mask(start, end, first_day, days)
+    
+    results = []
+    for mentor_id, slots in availability.free_in_window(free, window, first_day):
+        results.append({
+            'mentor_id': mentor_id,
+            'mentor_info': _mentor_info(indexes.get(mentor_id)),
+            'free_slots': [{'date': slot_start.date().isoformat(), 'time': label} for slot_start, label in slots]
+        })
+    
+    return jsonify({
+        'mentors': results,
+        'total': len(results)
     }), 200
 
 @mentorship_bp.route('/bookings', methods=['GET'])
 def get_user_bookings():
-    """Get user's mentor session bookings"""
+    """Get user's mentor session bookings, latest session first"""
     if 'user_id' not in session:
         return jsonify({'error': 'Authentication required'}), 401
     
-    # In real implementation, fetch from database
-    # For demo, return empty list
+    # Served by the (user_id, slot_start) index
+    rows = db.session.scalars(
+        db.select(MentorBooking)
+        .where(MentorBooking.user_id == session['user_id'])
+        .order_by(MentorBooking.slot_start.desc())
+    ).all()
+    
+    indexes = MENTORS.current
     bookings = []
+    for row in rows:
+        booking = row.to_dict()
+        mentor = indexes.get(row.mentor_id)
+        booking['mentor_info'] = _mentor_info(mentor) if mentor else None
+        bookings.append(booking)
     
     return jsonify({
         'bookings': bookings,
@@ -406,110 +464,167 @@ def get_user_bookings():
 
 @mentorship_bp.route('/bookings/<booking_id>/cancel', methods=['POST'])
 def cancel_booking(booking_id):
-    """Cancel a mentor session booking"""
+    """Cancel a mentor session booking, freeing its slot"""
     if 'user_id' not in session:
         return jsonify({'error': 'Authentication required'}), 401
     
     try:
-        # In real implementation, find and update booking in database
-        # Check cancellation policy, process refunds if applicable
+        booking = db.session.scalar(
+            db.select(MentorBooking)
+            .where(MentorBooking.id == booking_id)
+            .where(MentorBooking.user_id == session['user_id'])
+        )
+        if not booking:
+            return jsonify({'error': 'Booking not found'}), 404
+        
+        if booking.status == 'cancelled':
+            return jsonify({'error': 'Booking is already cancelled'}), 400
+        
+        if booking.status == 'expired':
+            return jsonify({'error': 'Booking expired before it was paid for'}), 400
+        
+        if booking.slot_start <= datetime.now():
+            return jsonify({'error': 'Past sessions cannot be cancelled'}), 400
+        
+        booking.status = 'cancelled'
+        booking.cancelled_at = datetime.utcnow()
+        booking.hold_expires_at = None
+        db.session.commit()
+        SLOT_HOLDS.remove(booking.id)
         
         return jsonify({
             'message': 'Booking cancelled successfully',
+            'booking': booking.to_dict(),
             'refund_info': 'Refund will be processed within 5-7 business days'
         }), 200
         
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': 'Internal server error'}), 500
 
+def _rating_summary(mentor, aggregate):
+    """Live average rating, review counts and star histogram of a mentor"""
+    reviews_count = aggregate.reviews_count if aggregate else 0
+    rating_sum = aggregate.rating_sum if aggregate else 0
+    average_rating, total_count = blended_rating(mentor, reviews_count, rating_sum)
+    return {
+        'average_rating': round(average_rating, 2),
+        'reviews_count': total_count,
+        'total_reviews': reviews_count,
+        'rating_histogram': {str(stars): getattr(aggregate, f'stars_{stars}') if aggregate else 0
+                             for stars in range(1, 6)}
+    }
+
 @mentorship_bp.route('/mentors/<int:mentor_id>/reviews', methods=['GET'])
 def get_mentor_reviews(mentor_id):
-    """Get reviews for a specific mentor"""
-    mentor = next((mentor for mentor in MENTORS_DATA if mentor['id'] == mentor_id), None)
+    """Get reviews for a specific mentor, newest first, one page at a time"""
+    mentor = MENTORS.current.get(mentor_id)
     
     if not mentor:
         return jsonify({'error': 'Mentor not found'}), 404
     
-    # Sample reviews (in real implementation, fetch from database)
-    reviews = [
-        {
-            'id': 1,
-            'user_name': 'Anonymous Student',
-            'rating': 5,
-            'comment': 'Excellent guidance for JEE preparation. Very helpful and patient.',
-            'date': '2024-06-15',
-            'verified': True
-        },
-        {
-            'id': 2,
-            'user_name': 'Anonymous Student',
-            'rating': 4,
-            'comment': 'Good session, learned a lot about college life and placements.',
-            'date': '2024-06-10',
-            'verified': True
-        }
-    ]
+    limit = page_size(request.args.get('limit', type=int))
+    cursor = request.args.get('cursor')
+    
+    query = db.select(MentorReview).where(MentorReview.mentor_id == mentor_id)
+    if cursor:
+        try:
+            before_id = int(decode_cursor(cursor)['id'])
+        except (KeyError, TypeError, ValueError):
+            return jsonify({'error': 'Invalid cursor'}), 400
+        query = query.where(MentorReview.id < before_id)
+    
+    # One extra row tells whether there is a next page
+    reviews = db.session.scalars(query.order_by(MentorReview.id.desc()).limit(limit + 1)).all()
+    next_cursor = None
+    if len(reviews) > limit:
+        reviews = reviews[:limit]
+        next_cursor = encode_cursor({'id': reviews[-1].id})
+    
+    # Counts come from the aggregate row, not from scanning the reviews
+    summary = _rating_summary(mentor, db.session.get(MentorRatingAggregate, mentor_id))
     
     return jsonify({
         'mentor_id': mentor_id,
-        'reviews': reviews,
-        'total_reviews': len(reviews),
-        'average_rating': mentor['rating']
+        'reviews': [review.to_dict() for review in reviews],
+        'next_cursor': next_cursor,
+        'limit': limit,
+        **summary
     }), 200
 
 @mentorship_bp.route('/mentors/<int:mentor_id>/reviews', methods=['POST'])
-def add_mentor_review():
+def add_mentor_review(mentor_id):
     """Add a review for a mentor"""
     if 'user_id' not in session:
         return jsonify({'error': 'Authentication required'}), 401
     
     try:
+        mentor = MENTORS.current.get(mentor_id)
+        
+        if not mentor:
+            return jsonify({'error': 'Mentor not found'}), 404
+        
         data = request.json
         rating = data.get('rating')
         comment = data.get('comment', '')
         
-        if not rating or rating < 1 or rating > 5:
+        if not isinstance(rating, int) or isinstance(rating, bool) or rating < 1 or rating > 5:
             return jsonify({'error': 'Rating must be between 1 and 5'}), 400
         
-        # In real implementation, check if user has completed session with mentor
-        # Store review in database
+        # Verified if the student has had a session with the mentor
+        verified = db.session.scalar(
+            db.select(MentorBooking.id)
+            .where(MentorBooking.user_id == session['user_id'])
+            .where(MentorBooking.mentor_id == mentor_id)
+            .where(MentorBooking.status.in_(('confirmed', 'completed')))
+            .where(MentorBooking.slot_start <= datetime.now())
+            .limit(1)
+        ) is not None
+        
+        review = MentorReview(
+            mentor_id=mentor_id,
+            user_id=session['user_id'],
+            rating=rating,
+            comment=comment,
+            verified=verified
+        )
+        
+        db.session.add(review)
+        try:
+            db.session.flush()
+        except IntegrityError:
+            # The student's earlier review of this mentor
+            db.session.rollback()
+            return jsonify({'error': 'You have already reviewed this mentor'}), 409
         
-        review = {
-            'id': str(uuid.uuid4()),
-            'user_id': session['user_id'],
-            'rating': rating,
-            'comment': comment,
-            'date': datetime.now().isoformat(),
-            'verified': True
-        }
+        # Same transaction as the review
+        add_rating(mentor_id, rating)
+        db.session.commit()
+        LIVE_RATINGS.expire()
         
         return jsonify({
             'message': 'Review added successfully',
-            'review': review
+            'review': review.to_dict(),
+            **_rating_summary(mentor, db.session.get(MentorRatingAggregate, mentor_id))
         }), 201
         
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': 'Internal server error'}), 500
 
 @mentorship_bp.route('/mentors/categories', methods=['GET'])
+@conditional('mentors')
 def get_mentor_categories():
     """Get all mentor expertise categories"""
-    all_expertise = []
-    for mentor in MENTORS_DATA:
-        all_expertise.extend(mentor['expertise'])
-    
-    unique_expertise = list(set(all_expertise))
-    
     return jsonify({
-        'categories': sorted(unique_expertise)
+        'categories': MENTORS.current.expertise_facet.sorted_values()
     }), 200
 
 @mentorship_bp.route('/mentors/colleges', methods=['GET'])
+@conditional('mentors')
 def get_mentor_colleges():
     """Get all colleges represented by mentors"""
-    colleges = list(set(mentor['college'] for mentor in MENTORS_DATA))
-    
     return jsonify({
-        'colleges': sorted(colleges)
+        'colleges': MENTORS.current.college_facet.sorted_values()
     }), 200
 
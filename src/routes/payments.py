@@ -1,78 +1,70 @@
 from flask import Blueprint, jsonify, request, session
+from src.models.mentorship import MentorBooking
 from src.models.user import User, Payment, db
+from src.services.catalogs import Catalog
+from src.services.etags import conditional
+from src.services.slot_holds import confirm_hold
 from datetime import datetime, timedelta
 import uuid
 import json
 
 payments_bp = Blueprint('payments', __name__)
 
-# Payment plans configuration
-PAYMENT_PLANS = {
-    'premium_monthly': {
-        'name': 'Premium Monthly',
-        'amount': 299.0,
-        'currency': 'INR',
-        'duration_days': 30,
-        'features': [
-            'Unlimited college recommendations',
-            'Priority mentor access',
-            'Advanced filtering options',
-            'Exam score tracking',
-            'Personalized study plans',
-            'Ad-free experience'
-        ]
-    },
-    'premium_yearly': {
-        'name': 'Premium Yearly',
-        'amount': 2999.0,
-        'currency': 'INR',
-        'duration_days': 365,
-        'features': [
-            'All monthly features',
-            '2 months free',
-            'Exclusive webinars',
-            'Career counseling sessions',
-            'Priority customer support'
-        ]
-    },
-    'mentorship_session': {
-        'name': 'One-on-One Mentorship',
-        'amount': 499.0,
-        'currency': 'INR',
-        'duration_days': 1,
-        'features': [
-            '1-hour video call with mentor',
-            'Personalized guidance',
-            'College selection advice',
-            'Exam preparation tips',
-            'Career roadmap discussion'
-        ]
-    },
-    'mentorship_package': {
-        'name': 'Mentorship Package (5 sessions)',
-        'amount': 2199.0,
-        'currency': 'INR',
-        'duration_days': 30,
-        'features': [
-            '5 one-hour sessions',
-            'Dedicated mentor assignment',
-            'Progress tracking',
-            'Study material recommendations',
-            'Mock interview sessions'
-        ]
-    }
-}
+# Payment plans, loaded from src/data/payment_plans.json and swapped in whole on reload
+PAYMENT_PLANS = Catalog('payment_plans')
 
 @payments_bp.route('/plans', methods=['GET'])
+@conditional('payment_plans')
 def get_payment_plans():
     """Get all available payment plans"""
     return jsonify({
-        'plans': PAYMENT_PLANS
+        'plans': PAYMENT_PLANS.current.data
     }), 200
 
+def _complete_booking(payment):
+    """Confirm the mentor booking a completed payment is for; False if its slot hold lapsed first"""
+    return payment.service_type != 'mentorship' or confirm_hold(payment.booking_id)
+
+def _create_booking_payment(booking_id, payment_method):
+    """Create a payment intent for a mentor booking that still holds its slot"""
+    booking = db.session.get(MentorBooking, booking_id)
+    
+    if not booking or booking.user_id != session['user_id']:
+        return jsonify({'error': 'Booking not found'}), 404
+    
+    if booking.status != 'pending_payment' or booking.hold_expires_at <= datetime.utcnow():
+        return jsonify({'error': 'Booking is not awaiting payment'}), 409
+    
+    payment = Payment(
+        user_id=booking.user_id,
+        amount=booking.amount,
+        currency='INR',
+        payment_method=payment_method,
+        service_type='mentorship',
+        booking_id=booking.id,
+        transaction_id=str(uuid.uuid4()),
+        status='pending'
+    )
+    
+    db.session.add(payment)
+    db.session.commit()
+    
+    return jsonify({
+        'message': 'Payment created successfully',
+        'payment': {
+            'payment_id': payment.id,
+            'transaction_id': payment.transaction_id,
+            'amount': payment.amount,
+            'currency': payment.currency,
+            'booking': booking.to_dict(),
+            'gateway_url': f'/api/payments/simulate-gateway/{payment.id}',
+            'status': 'pending'
+        }
+    }), 201
+
 @payments_bp.route('/create-payment', methods=['POST'])
 def create_payment():
-    """Create a new payment intent"""
+    """Create a new payment intent for a plan, or for a mentor booking via booking_id"""
     if 'user_id' not in session:
         return jsonify({'error': 'Authentication required'}), 401
     
@@ -81,10 +73,14 @@ def create_payment():
         plan_id = data.get('plan_id')
         payment_method = data.get('payment_method', 'razorpay')
         
-        if not plan_id or plan_id not in PAYMENT_PLANS:
+        if data.get('booking_id'):
+            return _create_booking_payment(data['booking_id'], payment_method)
+        
+        plans = PAYMENT_PLANS.current.data
+        if not plan_id or plan_id not in plans:
             return jsonify({'error': 'Invalid payment plan'}), 400
         
-        plan = PAYMENT_PLANS[plan_id]
+        plan = plans[plan_id]
         user = User.query.get(session['user_id'])
         
         if not user:
@@ -143,6 +139,15 @@ def simulate_payment_gateway(payment_id):
             return jsonify({'error': 'Payment already processed'}), 400
         
         if action == 'success':
+            # The booking's slot hold must still be live
+            if not _complete_booking(payment):
+                payment.status = 'failed'
+                db.session.commit()
+                return jsonify({
+                    'error': 'The booking expired before the payment completed',
+                    'payment': payment.to_dict()
+                }), 409
+            
             # Mark payment as completed
             payment.status = 'completed'
             payment.completed_at = datetime.utcnow()
@@ -206,6 +211,14 @@ def verify_payment():
         # In real implementation, verify with actual payment gateway
         # For demo, we'll check if gateway_payment_id is provided
         if gateway_payment_id and payment.status == 'pending':
+            if not _complete_booking(payment):
+                payment.status = 'failed'
+                db.session.commit()
+                return jsonify({
+                    'error': 'The booking expired before the payment completed',
+                    'payment': payment.to_dict()
+                }), 409
+            
             payment.status = 'completed'
             payment.completed_at = datetime.utcnow()
             payment.gateway_payment_id = gateway_payment_id
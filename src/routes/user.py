@@ -1,5 +1,11 @@
 from flask import Blueprint, jsonify, request, session
+from src.models.mentorship import MentorBooking, MentorReview, MentorSuggestion
+from src.models.outbox import NotificationOutbox
 from src.models.user import User, UserProfile, db
+from src.routes.community import delete_user_posts
+from src.routes.exams import EXAMS
+from src.services.mentor_ratings import LIVE_RATINGS, remove_ratings
+from src.services.slot_holds import SLOT_HOLDS
 import json
 
 user_bp = Blueprint('user', __name__)
@@ -53,6 +59,7 @@ def update_user(user_id):
         user.target_exams = json.dumps(data['target_exams'])
     
     db.session.commit()
+    EXAMS.current.recommender.invalidate(user_id)
     return jsonify(user.to_dict())
 
 @user_bp.route('/users/<int:user_id>', methods=['DELETE'])
@@ -67,9 +74,25 @@ def delete_user(user_id):
     profile = UserProfile.query.filter_by(user_id=user_id).first()
     if profile:
         db.session.delete(profile)
+    held = db.session.scalars(
+        db.select(MentorBooking.id)
+        .where(MentorBooking.user_id == user_id)
+        .where(MentorBooking.status == 'pending_payment')
+    ).all()
+    db.session.execute(db.delete(MentorBooking).where(MentorBooking.user_id == user_id))
+    reviews = MentorReview.query.filter_by(user_id=user_id).all()
+    remove_ratings(reviews)
+    db.session.execute(db.delete(MentorReview).where(MentorReview.user_id == user_id))
+    db.session.execute(db.delete(MentorSuggestion).where(MentorSuggestion.user_id == user_id))
+    delete_user_posts(user_id)
+    db.session.execute(db.delete(NotificationOutbox).where(NotificationOutbox.user_id == user_id))
     
     db.session.delete(user)
     db.session.commit()
+    EXAMS.current.recommender.invalidate(user_id)
+    LIVE_RATINGS.expire()
+    for booking_id in held:
+        SLOT_HOLDS.remove(booking_id)
     
     # Clear session
     session.clear()
@@ -0,0 +1,196 @@
+from datetime import datetime, timezone
+import json
+import logging
+import os
+import signal
+import threading
+import time
+
+from flask import current_app, g, has_app_context, has_request_context
+
+from src.services.etags import DATASET_VERSIONS, dataset_version, register_dataset_source
+
+logger = logging.getLogger(__name__)
+
+# Directory of the <name>.json catalog files
+CATALOG_DIR = os.environ.get('CATALOG_DATA_DIR') or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data'
+)
+
+# How often a worker looks at the files' modification times
+CHECK_INTERVAL_SECONDS = 5
+
+# All catalogs by name, so they can be reloaded together
+CATALOGS = {}
+
+_check_lock = threading.Lock()
+_next_check = 0.0
+_reloading = False
+
+
+class CatalogSnapshot:
+    """The state built from one version of a catalog file
+
+    Subclasses build their indexes, caches and pre-encoded responses in
+    ``__init__``; nothing in a snapshot is modified after it is swapped in.
+    ``version`` is the content hash the catalog's ETags are built from.
+    """
+
+    def __init__(self, data, modified_at):
+        self.data = data
+        self.modified_at = modified_at
+        self.version = dataset_version(data)
+
+
+class Catalog:
+    """A catalog loaded from a JSON data file, with everything derived from it
+
+    ``build(data, modified_at)`` returns the snapshot of derived state. A
+    reload builds the new snapshot off to the side and swaps it in with one
+    reference assignment, and a request keeps the snapshot it first read
+    (its ETag included) until it ends, so it sees a single consistent
+    version, old or new, and is never blocked by the rebuild. Replace data
+    files by renaming a complete file into place.
+
+    ``sync(data, version)``, if given, writes the new data to the database
+    before the snapshot is swapped in. It runs on reloads made inside an app
+    context; the first load, at import time, is synced at app startup.
+    """
+
+    def __init__(self, name, build=CatalogSnapshot, sync=None):
+        self.name = name
+        self.build = build
+        self.sync = sync
+        self.signature = None
+        self._current = None
+        self._lock = threading.Lock()
+        CATALOGS[name] = self
+        register_dataset_source(name, lambda: self.current.version)
+        self.reload()
+
+    @property
+    def current(self):
+        """The current snapshot, or within a request the one the request first read"""
+        if not has_request_context():
+            return self._current
+        pinned = g.setdefault('catalog_snapshots', {})
+        if self.name not in pinned:
+            pinned[self.name] = self._current
+        return pinned[self.name]
+
+    @current.setter
+    def current(self, snapshot):
+        self._current = snapshot
+
+    @property
+    def path(self):
+        return os.path.join(CATALOG_DIR, f'{self.name}.json')
+
+    def _signature(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def reload(self, force=True):
+        """Rebuild from the data file and swap the result in; returns False if the file is unchanged
+
+        Raises (leaving the current snapshot in place) if the file cannot be
+        read or the catalog cannot be built from it; the broken file is then
+        not retried until it changes again or a forced reload is requested.
+        """
+        with self._lock:
+            signature = self._signature()
+            if not force and signature == self.signature:
+                return False
+            self.signature = signature
+
+            with open(self.path, encoding='utf-8') as catalog_file:
+                data = json.load(catalog_file)
+            modified_at = datetime.fromtimestamp(signature[0] / 1e9, timezone.utc).replace(microsecond=0)
+            snapshot = self.build(data, modified_at)
+            if self.sync is not None and has_app_context():
+                self.sync(data, snapshot.version)
+
+            DATASET_VERSIONS[self.name] = snapshot.version
+            self.current = snapshot
+        return True
+
+
+def reload_catalogs(force=True):
+    """Reload every catalog; returns {name: 'reloaded', 'unchanged' or the error}
+
+    A catalog that fails to load keeps serving its previous snapshot.
+    """
+    results = {}
+    for name, catalog in list(CATALOGS.items()):
+        try:
+            results[name] = 'reloaded' if catalog.reload(force) else 'unchanged'
+        except Exception as e:
+            logger.exception('Reloading the %s catalog failed', name)
+            results[name] = f'error: {e}'
+    return results
+
+
+def _reload_changed(app):
+    global _reloading
+    try:
+        with app.app_context():
+            results = reload_catalogs(force=False)
+        reloaded = [name for name, result in results.items() if result == 'reloaded']
+        if reloaded:
+            logger.info('Reloaded catalogs: %s', ', '.join(reloaded))
+    finally:
+        _reloading = False
+
+
+def refresh_catalogs():
+    """Reload changed catalog files in a background thread, checking at most every CHECK_INTERVAL_SECONDS
+
+    Cheap enough to call before every request: between checks it only reads
+    the clock, and requests keep using the current snapshots while a reload
+    runs.
+    """
+    global _next_check, _reloading
+    now = time.monotonic()
+    if now < _next_check or not _check_lock.acquire(blocking=False):
+        return
+    try:
+        if now < _next_check or _reloading:
+            return
+        _next_check = now + CHECK_INTERVAL_SECONDS
+        if any(catalog.signature != catalog._signature() for catalog in CATALOGS.values()):
+            _reloading = True
+            threading.Thread(target=_reload_changed, args=(current_app._get_current_object(),),
+                             name='catalog-reload', daemon=True).start()
+    except OSError:
+        logger.exception('Checking the catalog files failed')
+    finally:
+        _check_lock.release()
+
+
+def catalog_status():
+    """Each catalog's file, modification time and content version"""
+    return {
+        name: {
+            'path': catalog.path,
+            'modified_at': catalog.current.modified_at.isoformat(),
+            'version': catalog.current.version
+        }
+        for name, catalog in CATALOGS.items()
+    }
+
+
+def _reload_in_app(app):
+    with app.app_context():
+        reload_catalogs()
+
+
+def install_reload_signal(app):
+    """Reload every catalog in the background, inside an app context, when the process receives SIGHUP
+
+    Only possible from the main thread, and only where SIGHUP exists.
+    """
+    def on_reload_signal(signum, frame):
+        threading.Thread(target=_reload_in_app, args=(app,), name='catalog-reload', daemon=True).start()
+
+    if hasattr(signal, 'SIGHUP') and threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGHUP, on_reload_signal)
@@ -0,0 +1,146 @@
+from concurrent.futures import ProcessPoolExecutor
+import os
+import threading
+import numpy as np
+
+# Processes scoring large batches, one pool shared by every request of a
+# server process; 0 or 1 scores in the request thread
+SCORING_WORKERS = int(os.environ.get('BATCH_SCORING_WORKERS') or 0)
+
+NO_MATCH = 0
+ELIGIBLE = 1
+REACH = 2
+
+STATUS_NAMES = {ELIGIBLE: 'eligible', REACH: 'reach'}
+
+# Students scored per broadcast; bounds the students x colleges matrices
+CHUNK_SIZE = 512
+
+
+class CutoffMatrix:
+    """Column arrays of every (exam, category) cutoff band, for scoring many students at once"""
+
+    def __init__(self, catalog):
+        self.state_codes = {}
+        self.category_codes = {}
+        self.bands = {}
+
+        for exam_name, category in catalog.cutoff_keys():
+            band = catalog.cutoff_band(exam_name, category)
+            ordinals = sorted(band.cutoff_info)
+            cutoffs = [band.cutoff_info[ordinal] for ordinal in ordinals]
+            colleges = [catalog.college_at(ordinal) for ordinal in ordinals]
+            self.bands[(exam_name, category)] = {
+                # Sorted by ordinal, so matches come out in NIRF order
+                'ordinals': np.array(ordinals, dtype=np.int64),
+                'rank': np.array([c.get('rank', np.nan) for c in cutoffs], dtype=np.float64),
+                'has_rank': np.array(['rank' in c for c in cutoffs], dtype=bool),
+                'percentile': np.array([c.get('percentile', np.nan) for c in cutoffs], dtype=np.float64),
+                'has_percentile': np.array(['percentile' in c for c in cutoffs], dtype=bool),
+                'state': np.array([self.state_codes.setdefault(c['state'], len(self.state_codes))
+                                   for c in colleges], dtype=np.int64),
+                'category': np.array([self.category_codes.setdefault(c['category'], len(self.category_codes))
+                                      for c in colleges], dtype=np.int64)
+            }
+
+    def score(self, rows):
+        """Score rows of (exam_name, rank, percentile, category, preferred_states, preferred_categories)
+
+        Returns one (ordinals, statuses) pair of arrays per row, in row order.
+        """
+        results = [None] * len(rows)
+        empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int8))
+
+        groups = {}
+        for index, row in enumerate(rows):
+            groups.setdefault((row[0], row[3]), []).append(index)
+
+        for key, indexes in groups.items():
+            band = self.bands.get(key)
+            if band is None:
+                for index in indexes:
+                    results[index] = empty
+                continue
+            for start in range(0, len(indexes), CHUNK_SIZE):
+                chunk = indexes[start:start + CHUNK_SIZE]
+                statuses = self._score_band(band, [rows[index] for index in chunk])
+                for index, row_statuses in zip(chunk, statuses):
+                    matched = np.flatnonzero(row_statuses)
+                    results[index] = (band['ordinals'][matched], row_statuses[matched])
+
+        return results
+
+    def _score_band(self, band, rows):
+        """Students x colleges status matrix for one band"""
+        ranks = np.array([row[1] or np.nan for row in rows], dtype=np.float64)[:, None]
+        percentiles = np.array([row[2] or np.nan for row in rows], dtype=np.float64)[:, None]
+        has_rank = ~np.isnan(ranks)
+        has_percentile = ~np.isnan(percentiles)
+
+        # Rank cutoffs take precedence; percentile is the fallback
+        use_rank = has_rank & band['has_rank']
+        eligible = np.where(
+            use_rank,
+            ranks <= band['rank'],
+            has_percentile & band['has_percentile'] & (percentiles >= band['percentile'])
+        )
+        reach = use_rank & ~eligible & (ranks <= band['rank'] * 1.2)
+
+        allowed = (self._preference_mask(rows, 4, self.state_codes, band['state'])
+                   & self._preference_mask(rows, 5, self.category_codes, band['category']))
+
+        statuses = np.zeros(eligible.shape, dtype=np.int8)
+        statuses[eligible & allowed] = ELIGIBLE
+        statuses[reach & allowed] = REACH
+        return statuses
+
+    @staticmethod
+    def _preference_mask(rows, field, codes, college_codes):
+        """Students x colleges mask of colleges matching each student's preference list"""
+        allowed = np.zeros((len(rows), len(codes) + 1), dtype=bool)
+        for i, row in enumerate(rows):
+            preferred = row[field]
+            if preferred:
+                allowed[i, [codes[value] for value in preferred if value in codes]] = True
+            else:
+                allowed[i] = True
+        return allowed[np.arange(len(rows))[:, None], college_codes[None, :]]
+
+
+_worker_matrix = None
+
+_pool = None  # (matrix, executor)
+_pool_lock = threading.Lock()
+
+
+def _init_worker(matrix):
+    global _worker_matrix
+    _worker_matrix = matrix
+
+
+def _score_in_worker(rows):
+    return _worker_matrix.score(rows)
+
+
+def _shared_pool(matrix):
+    """The process pool holding matrix, started on first use and replaced along with the matrix"""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool[0] is not matrix:
+            if _pool is not None:
+                # Batches already submitted to the old pool still finish
+                _pool[1].shutdown(wait=False)
+            _pool = (matrix, ProcessPoolExecutor(max_workers=SCORING_WORKERS, initializer=_init_worker,
+                                                 initargs=(matrix,)))
+        return _pool[1]
+
+
+def score_batch(matrix, rows, chunk_size=2000):
+    """Yield (ordinals, statuses) per row in order, spread over the shared pool if SCORING_WORKERS > 1"""
+    if SCORING_WORKERS <= 1 or len(rows) <= chunk_size:
+        yield from matrix.score(rows)
+        return
+
+    chunks = [rows[start:start + chunk_size] for start in range(0, len(rows), chunk_size)]
+    for results in _shared_pool(matrix).map(_score_in_worker, chunks):
+        yield from results
@@ -0,0 +1,222 @@
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+import numpy as np
+from src.services.college_batch import STATUS_NAMES
+from src.services.geo_index import GeoGrid
+from src.services.search_index import FUZZY_MATCH, TextSearchIndex
+
+
+class CollegeCatalog:
+    """In-memory college catalog with search, geo and cutoff indexes built once at load time
+
+    Listing and filtering /api/colleges is done in SQL on the college tables.
+    """
+
+    def __init__(self, colleges):
+        self.colleges = list(colleges)
+        self.by_id = {college['id']: college for college in self.colleges}
+
+        # Lowercased category, state and type as integer codes per position, for masking arrays of positions
+        self._field_codes = {}
+        for name in ('category', 'state', 'type'):
+            codes_by_value = {}
+            codes = np.array([codes_by_value.setdefault(college[name].lower(), len(codes_by_value) + 1)
+                              for college in self.colleges], dtype=np.int32)
+            self._field_codes[name] = (codes_by_value, codes)
+
+        # Substring search and autocomplete over name, full_name and location
+        self.search_index = TextSearchIndex(
+            self.colleges,
+            ('name', 'full_name', 'location'),
+            rank_key=lambda college: college.get('nirf_ranking') or float('inf')
+        )
+
+        # Spatial grid over each college's coordinates
+        self.geo_index = GeoGrid(self.colleges)
+
+        # Positions sorted by NIRF ranking. A college's index in this list is its
+        # "ordinal": sorting ordinals yields NIRF order with ties broken by catalog order.
+        ranked = sorted(range(len(self.colleges)), key=lambda p: self.colleges[p]['nirf_ranking'])
+        self._ranking_positions = ranked
+        self._ordinals_by_id = {self.colleges[p]['id']: ordinal for ordinal, p in enumerate(ranked)}
+
+        # Cutoff bands keyed by (exam, category)
+        self._cutoff_bands = {}
+        entries = defaultdict(list)
+        for ordinal, position in enumerate(ranked):
+            college = self.colleges[position]
+            for exam_name in college['accepted_exams']:
+                for category, cutoff_data in college['cutoffs'].get(exam_name, {}).items():
+                    if cutoff_data:
+                        entries[(exam_name, category)].append((ordinal, cutoff_data))
+        for key, band_entries in entries.items():
+            self._cutoff_bands[key] = CutoffBand(band_entries)
+
+    def get(self, college_id):
+        """Get a college by id"""
+        return self.by_id.get(college_id)
+
+    def nearby(self, lat, lon, radius_km=None, limit=None, category=None, state=None, college_type=None):
+        """(college, distance_km) pairs nearest first, within radius_km and/or the limit nearest"""
+        required = []
+        for name, value in (('category', category), ('state', state), ('type', college_type)):
+            if value:
+                codes_by_value, codes = self._field_codes[name]
+                code = codes_by_value.get(value.lower())
+                if code is None:
+                    return []
+                required.append((codes, code))
+
+        predicate = None
+        if required:
+            def predicate(positions):
+                mask = np.ones(len(positions), dtype=bool)
+                for codes, code in required:
+                    mask &= codes[positions] == code
+                return mask
+
+        if radius_km is None:
+            found = self.geo_index.nearest(lat, lon, limit, predicate)
+        elif limit is None:
+            found = self.geo_index.within(lat, lon, radius_km, predicate)
+        else:
+            found = self.geo_index.nearest(lat, lon, limit, predicate, max_radius_km=radius_km)
+        return [(self.colleges[position], distance) for position, distance in found]
+
+    def search_ids(self, query):
+        """Ids of colleges whose name, full name or location contains query"""
+        return [self.colleges[p]['id'] for p in self.search_index.search(query)]
+
+    def autocomplete(self, query, limit=10):
+        """Ranked (college, fuzzy) suggestions for a partially typed name or location"""
+        return [(self.colleges[p], quality == FUZZY_MATCH)
+                for p, quality in self.search_index.autocomplete(query, limit)]
+
+    def college_at(self, ordinal):
+        """Get a college by its NIRF ordinal"""
+        return self.colleges[self._ranking_positions[ordinal]]
+
+    def cutoff_band(self, exam_name, category):
+        """Get the CutoffBand for an (exam, category) pair, or None"""
+        return self._cutoff_bands.get((exam_name, category))
+
+    def cutoff_keys(self):
+        """All (exam, category) pairs that have cutoffs"""
+        return list(self._cutoff_bands)
+
+    def recommend(self, exam_name, rank=None, percentile=None, category='general',
+                  preferred_states=None, preferred_categories=None):
+        """Colleges whose cutoff admits the given rank/percentile, in NIRF order
+
+        Returns (college, eligibility_status, cutoff_data) tuples. A rank within
+        20% of a college's closing rank is reported as a "reach" option.
+        """
+        band = self._cutoff_bands.get((exam_name, category))
+        if band is None:
+            return []
+
+        matches = band.match(rank, percentile)
+
+        results = []
+        for ordinal in sorted(matches):
+            college = self.college_at(ordinal)
+            if preferred_states and college['state'] not in preferred_states:
+                continue
+            if preferred_categories and college['category'] not in preferred_categories:
+                continue
+            results.append((college, matches[ordinal], band.cutoff_info[ordinal]))
+        return results
+
+    def recommend_from_store(self, store, exam_name, rank=None, percentile=None, category='general',
+                             preferred_states=None, preferred_categories=None, year=None, round_number=None,
+                             quota=None, program=None):
+        """Like recommend, but judged on one round of a CutoffStore (the latest by default)
+
+        Returns (matches, (year, round)); the round is None when the store has no
+        cutoffs for the exam and category. Colleges missing from the catalog are skipped.
+        """
+        found = store.match(exam_name, category, rank, percentile, year, round_number, quota, program)
+        if found is None:
+            return [], None
+        college_ids, statuses, ranks, percentiles, year, round_number = found
+
+        ranked = []
+        for college_id, status, cutoff_rank, cutoff_percentile in zip(
+                college_ids.tolist(), statuses.tolist(), ranks.tolist(), percentiles.tolist()):
+            ordinal = self._ordinals_by_id.get(college_id)
+            if ordinal is None:
+                continue
+            college = self.college_at(ordinal)
+            if preferred_states and college['state'] not in preferred_states:
+                continue
+            if preferred_categories and college['category'] not in preferred_categories:
+                continue
+            cutoff_data = {'year': year, 'round': round_number}
+            if cutoff_rank == cutoff_rank:
+                cutoff_data['rank'] = int(cutoff_rank) if cutoff_rank.is_integer() else cutoff_rank
+            if cutoff_percentile == cutoff_percentile:
+                cutoff_data['percentile'] = cutoff_percentile
+            ranked.append((ordinal, college, STATUS_NAMES[status], cutoff_data))
+
+        ranked.sort(key=lambda match: match[0])
+        return [match[1:] for match in ranked], (year, round_number)
+
+
+def cutoff_status(cutoff_data, rank=None, percentile=None):
+    """'eligible', 'reach' or 'not_eligible' for one college's cutoff, by the rules of CutoffBand.match
+
+    Returns None when the cutoff cannot be compared with the given scores.
+    """
+    if rank and 'rank' in cutoff_data:
+        if rank <= cutoff_data['rank']:
+            return 'eligible'
+        return 'reach' if rank <= cutoff_data['rank'] * 1.2 else 'not_eligible'
+    if percentile and 'percentile' in cutoff_data:
+        return 'eligible' if percentile >= cutoff_data['percentile'] else 'not_eligible'
+    return None
+
+
+class CutoffBand:
+    """Cutoffs of one (exam, category) pair, sorted for bisecting"""
+
+    def __init__(self, entries):
+        self.cutoff_info = {ordinal: cutoff_data for ordinal, cutoff_data in entries}
+
+        by_rank = sorted((cutoff_data['rank'], ordinal) for ordinal, cutoff_data in entries
+                         if 'rank' in cutoff_data)
+        self.ranks = [cutoff for cutoff, _ in by_rank]
+        self.reach_limits = [cutoff * 1.2 for cutoff in self.ranks]
+        self.rank_ordinals = [ordinal for _, ordinal in by_rank]
+
+        by_percentile = sorted((cutoff_data['percentile'], 'rank' in cutoff_data, ordinal)
+                               for ordinal, cutoff_data in entries if 'percentile' in cutoff_data)
+        self.percentiles = [cutoff for cutoff, _, _ in by_percentile]
+        self.percentile_ordinals = [ordinal for _, _, ordinal in by_percentile]
+
+        # Percentile-only cutoffs, used when a rank was given but the college has no rank cutoff
+        unranked = [(cutoff, ordinal) for cutoff, has_rank, ordinal in by_percentile if not has_rank]
+        self.unranked_percentiles = [cutoff for cutoff, _ in unranked]
+        self.unranked_ordinals = [ordinal for _, ordinal in unranked]
+
+    def match(self, rank=None, percentile=None):
+        """Map ordinal -> 'eligible' or 'reach' for the given rank/percentile"""
+        matches = {}
+
+        if rank:
+            # Eligible: rank <= cutoff. Reach: cutoff < rank <= cutoff * 1.2
+            eligible_start = bisect_left(self.ranks, rank)
+            reach_start = bisect_left(self.reach_limits, rank)
+            for ordinal in self.rank_ordinals[eligible_start:]:
+                matches[ordinal] = 'eligible'
+            for ordinal in self.rank_ordinals[reach_start:eligible_start]:
+                matches[ordinal] = 'reach'
+            if percentile:
+                end = bisect_right(self.unranked_percentiles, percentile)
+                for ordinal in self.unranked_ordinals[:end]:
+                    matches[ordinal] = 'eligible'
+        elif percentile:
+            end = bisect_right(self.percentiles, percentile)
+            for ordinal in self.percentile_ordinals[:end]:
+                matches[ordinal] = 'eligible'
+
+        return matches
@@ -0,0 +1,90 @@
+import numpy as np
+
+LOWER_IS_BETTER = 'lower'
+HIGHER_IS_BETTER = 'higher'
+
+# (key, label, getter, direction) for every numeric comparison metric
+METRICS = (
+    ('nirf_ranking', 'NIRF Ranking', lambda c: c.get('nirf_ranking'), LOWER_IS_BETTER),
+    ('annual_fees', 'Annual Fees', lambda c: (c.get('fees') or {}).get('annual'), LOWER_IS_BETTER),
+    ('average_package', 'Average Placement Package',
+     lambda c: (c.get('placement') or {}).get('average_package'), HIGHER_IS_BETTER),
+    ('placement_rate', 'Placement Rate', lambda c: (c.get('placement') or {}).get('placement_rate'), HIGHER_IS_BETTER),
+    # Longer-established institutions rank first
+    ('established', 'Established Year', lambda c: c.get('established'), LOWER_IS_BETTER)
+)
+
+
+def _number(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return np.nan
+    return float(value)
+
+
+class ComparisonMatrix:
+    """Column view of the catalog's numeric comparison metrics
+
+    ``values`` is a colleges x metrics float array (NaN where a college lacks
+    a metric). ``compare`` gathers the requested rows and ranks every metric
+    with array operations, so comparing many colleges costs the same few
+    numpy calls as comparing two.
+    """
+
+    def __init__(self, colleges):
+        self.colleges = list(colleges)
+        self.rows = {college['id']: row for row, college in enumerate(self.colleges)}
+        self.values = np.array([[_number(getter(college)) for _, _, getter, _ in METRICS]
+                                for college in self.colleges], dtype=np.float64)
+        self.values = self.values.reshape(len(self.colleges), len(METRICS))
+        # +1 where lower is better, -1 where higher is better, so smaller scores always win
+        self.signs = np.array([1.0 if direction == LOWER_IS_BETTER else -1.0
+                               for _, _, _, direction in METRICS])
+
+    def compare(self, college_ids):
+        """Aligned columns, ranks and best/worst markers for the known ids, plus the unknown ones"""
+        rows = []
+        not_found = []
+        for college_id in dict.fromkeys(college_ids):
+            row = self.rows.get(college_id)
+            if row is None:
+                not_found.append(college_id)
+            else:
+                rows.append(row)
+
+        rows = np.array(rows, dtype=np.int64)
+        values = self.values[rows]
+        present = ~np.isnan(values)
+        scores = np.where(present, values * self.signs, np.inf)
+
+        # Competition ranking ("1224"): one plus the number of strictly better colleges
+        better = scores[None, :, :] < scores[:, None, :]
+        ranks = better.sum(axis=1) + 1
+        best_scores = scores.min(axis=0)
+        worst_scores = np.where(present, scores, -np.inf).max(axis=0)
+        best = present & (scores == best_scores)
+        worst = present & (scores == worst_scores)
+
+        colleges = [self.colleges[row] for row in rows.tolist()]
+        ids = [college['id'] for college in colleges]
+        comparison = {
+            'college_ids': ids,
+            'colleges': colleges,
+            'not_found': not_found,
+            'metrics': [],
+            'columns': {'location': [college.get('location') for college in colleges]}
+        }
+        rank_columns = np.where(present, ranks, 0).T.tolist()
+        present_columns = present.T.tolist()
+        for column, (key, label, getter, direction) in enumerate(METRICS):
+            comparison['columns'][key] = [getter(college) for college in colleges]
+            comparison['metrics'].append({
+                'key': key,
+                'label': label,
+                'better': direction,
+                # Colleges missing the metric get no rank
+                'ranks': [rank if has_value else None
+                          for rank, has_value in zip(rank_columns[column], present_columns[column])],
+                'best': [ids[i] for i in np.flatnonzero(best[:, column]).tolist()],
+                'worst': [ids[i] for i in np.flatnonzero(worst[:, column]).tolist()]
+            })
+        return comparison
@@ -0,0 +1,93 @@
+from src.models.college import CatalogTableVersion, College, CollegeCourse, CollegeCutoff
+from src.models.user import db
+from src.services.etags import dataset_version
+from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+import json
+
+# Name of the college tables' row in CatalogTableVersion
+TABLE_VERSION_NAME = 'colleges'
+
+
+def college_from_dict(data):
+    """Build a College (with courses and cutoffs) from a catalog record"""
+    fees = data.get('fees', {})
+    coordinates = data.get('coordinates') or {}
+    college = College(
+        id=data['id'],
+        name=data['name'],
+        full_name=data['full_name'],
+        location=data['location'],
+        state=data['state'],
+        type=data['type'],
+        category=data['category'],
+        nirf_ranking=data.get('nirf_ranking'),
+        established=data.get('established'),
+        website=data.get('website'),
+        latitude=coordinates.get('lat'),
+        longitude=coordinates.get('lon'),
+        fees_annual=fees.get('annual'),
+        fees_currency=fees.get('currency', 'INR'),
+        fees_category=fees.get('category'),
+        accepted_exams=json.dumps(data.get('accepted_exams', [])),
+        placement=json.dumps(data.get('placement', {})),
+        facilities=json.dumps(data.get('facilities', [])),
+        images=json.dumps(data.get('images', [])),
+        description=data.get('description'),
+        icon=data.get('icon')
+    )
+
+    college.courses = [
+        CollegeCourse(position=position, name=name)
+        for position, name in enumerate(data.get('courses', []))
+    ]
+    college.cutoffs = [
+        CollegeCutoff(exam=exam, category=category,
+                      rank=cutoff.get('rank'), percentile=cutoff.get('percentile'))
+        for exam, categories in data.get('cutoffs', {}).items()
+        for category, cutoff in categories.items()
+    ]
+    return college
+
+
+def load_colleges(colleges, version=None):
+    """Replace the contents of the college tables with catalog records
+
+    Also records the content version of the records (computed unless
+    given), which the ETag of /api/colleges includes and which the catalog
+    snapshots are compared against. Returns the number of colleges written.
+    """
+    db.session.execute(db.delete(CollegeCourse))
+    db.session.execute(db.delete(CollegeCutoff))
+    db.session.execute(db.delete(College))
+
+    db.session.add_all(college_from_dict(data) for data in colleges)
+    db.session.merge(CatalogTableVersion(name=TABLE_VERSION_NAME, version=version or dataset_version(colleges),
+                                         loaded_at=datetime.utcnow()))
+    db.session.commit()
+    return len(colleges)
+
+
+def sync_colleges(colleges, version):
+    """Load catalog records into the college tables unless they already hold this version
+
+    Run at startup and on every reload of the college catalog, so the tables
+    /api/colleges filters on match the catalog it serves the records from.
+    Returns the number of colleges written.
+    """
+    if loaded_version() == version:
+        return 0
+    try:
+        return load_colleges(colleges, version)
+    except IntegrityError:
+        # Another worker loaded them at the same time
+        db.session.rollback()
+        return 0
+
+
+def loaded_version():
+    """Version of the catalog records last loaded into the college tables ('' before the first load)"""
+    version = db.session.scalar(
+        db.select(CatalogTableVersion.version).where(CatalogTableVersion.name == TABLE_VERSION_NAME)
+    )
+    return version or ''
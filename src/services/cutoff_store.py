@@ -0,0 +1,335 @@
+from array import array
+import csv
+import json
+import os
+import shutil
+
+import numpy as np
+
+from src.services.college_batch import ELIGIBLE, NO_MATCH, REACH
+
+# Columns expected in a cutoff CSV; rank and percentile may be empty
+CSV_COLUMNS = ('college_id', 'exam', 'category', 'year', 'round', 'quota', 'program', 'rank', 'percentile')
+
+META_FILE = 'meta.json'
+FORMAT_VERSION = 1
+
+# Bit layout of the group key: exam | category | year | round
+EXAM_SHIFT = 40
+CATEGORY_SHIFT = 24
+YEAR_SHIFT = 8
+CATEGORY_MASK = (1 << 16) - 1
+YEAR_MASK = (1 << 16) - 1
+ROUND_MASK = (1 << 8) - 1
+
+
+def group_key(exam_code, category_code, year=0, round_number=0):
+    return (exam_code << EXAM_SHIFT) | (category_code << CATEGORY_SHIFT) | (year << YEAR_SHIFT) | round_number
+
+
+def _code(vocabulary, codes, value):
+    code = codes.get(value)
+    if code is None:
+        code = codes[value] = len(vocabulary)
+        vocabulary.append(value)
+    return code
+
+
+def build_cutoff_store(csv_path, output_dir):
+    """Convert a cutoff CSV into a directory of column files readable by CutoffStore
+
+    Rows are sorted by (exam, category, year, round, college), so one
+    counselling round of one exam and category is a contiguous slice. A
+    second permutation orders rows by college for history lookups. The new
+    store is written next to output_dir and swapped in once complete.
+    Returns the number of rows written.
+    """
+    vocabularies = {'exams': [], 'categories': [], 'quotas': [], 'programs': []}
+    codes = {name: {} for name in vocabularies}
+    groups = array('q')
+    college_ids = array('q')
+    quotas = array('q')
+    programs = array('q')
+    ranks = array('d')
+    percentiles = array('d')
+
+    with open(csv_path, newline='') as csv_file:
+        reader = csv.DictReader(csv_file)
+        missing = set(CSV_COLUMNS) - set(reader.fieldnames or ())
+        if missing:
+            raise ValueError(f'Cutoff CSV is missing columns: {", ".join(sorted(missing))}')
+        for line, row in enumerate(reader, 2):
+            try:
+                exam_code = _code(vocabularies['exams'], codes['exams'], row['exam'].strip())
+                category_code = _code(vocabularies['categories'], codes['categories'], row['category'].strip().lower())
+                year = int(row['year'])
+                round_number = int(row['round'] or 1)
+                if not 0 <= year <= YEAR_MASK or not 0 <= round_number <= ROUND_MASK:
+                    raise ValueError('year or round out of range')
+                groups.append(group_key(exam_code, category_code, year, round_number))
+                college_ids.append(int(row['college_id']))
+                quotas.append(_code(vocabularies['quotas'], codes['quotas'], row['quota'].strip()))
+                programs.append(_code(vocabularies['programs'], codes['programs'], row['program'].strip()))
+                ranks.append(float(row['rank']) if row['rank'].strip() else np.nan)
+                percentiles.append(float(row['percentile']) if row['percentile'].strip() else np.nan)
+            except (TypeError, ValueError) as e:
+                raise ValueError(f'Invalid cutoff row on line {line}: {e}') from e
+
+    if len(vocabularies['categories']) > CATEGORY_MASK:
+        raise ValueError('Too many categories')
+
+    columns = {
+        'group': np.frombuffer(groups, dtype=np.int64),
+        'college_id': np.frombuffer(college_ids, dtype=np.int64).astype(np.int32),
+        'quota': np.frombuffer(quotas, dtype=np.int64).astype(np.int32),
+        'program': np.frombuffer(programs, dtype=np.int64).astype(np.int32),
+        'rank': np.frombuffer(ranks, dtype=np.float64),
+        'percentile': np.frombuffer(percentiles, dtype=np.float64)
+    }
+    order = np.lexsort((columns['program'], columns['quota'], columns['college_id'], columns['group']))
+    columns = {name: column[order] for name, column in columns.items()}
+
+    # History index: rows ordered by college, then by group
+    columns['college_order'] = np.lexsort((np.arange(len(order)), columns['group'], columns['college_id'])).astype(np.int32)
+    columns['college_keys'] = columns['college_id'][columns['college_order']]
+
+    staging = f'{output_dir}.tmp-{os.getpid()}'
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    for name, column in columns.items():
+        np.save(os.path.join(staging, f'{name}.npy'), column)
+    with open(os.path.join(staging, META_FILE), 'w') as meta_file:
+        json.dump({'version': FORMAT_VERSION, 'rows': len(order), **vocabularies}, meta_file)
+
+    if os.path.exists(output_dir):
+        retired = f'{output_dir}.old-{os.getpid()}'
+        os.rename(output_dir, retired)
+        os.rename(staging, output_dir)
+        shutil.rmtree(retired, ignore_errors=True)
+    else:
+        os.rename(staging, output_dir)
+    return len(order)
+
+
+def open_cutoff_store(path):
+    """CutoffStore at path, or None when no store is configured there"""
+    if not path or not os.path.exists(os.path.join(path, META_FILE)):
+        return None
+    return CutoffStore(path)
+
+
+class CutoffStore:
+    """Read-only multi-year cutoff table, memory-mapped from the files of build_cutoff_store
+
+    Columns are opened with ``mmap_mode='r'``, so every worker process maps
+    the same page-cache pages and only the slices a query touches are read.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, META_FILE)) as meta_file:
+            meta = json.load(meta_file)
+        if meta.get('version') != FORMAT_VERSION:
+            raise ValueError(f'Unsupported cutoff store version: {meta.get("version")}')
+
+        self.rows = meta['rows']
+        self.exams = meta['exams']
+        self.categories = meta['categories']
+        self.quotas = meta['quotas']
+        self.programs = meta['programs']
+        self._exam_codes = {name: code for code, name in enumerate(self.exams)}
+        self._category_codes = {name: code for code, name in enumerate(self.categories)}
+        self._quota_codes = {name: code for code, name in enumerate(self.quotas)}
+        self._program_codes = {name: code for code, name in enumerate(self.programs)}
+
+        self.columns = {}
+        for name in ('group', 'college_id', 'quota', 'program', 'rank', 'percentile',
+                     'college_order', 'college_keys'):
+            self.columns[name] = np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+
+    def __len__(self):
+        return self.rows
+
+    def _group_range(self, low, high):
+        groups = self.columns['group']
+        return int(np.searchsorted(groups, low, 'left')), int(np.searchsorted(groups, high, 'left'))
+
+    def latest_round(self, exam_name, category):
+        """(year, round) of the most recent round with cutoffs for an exam and category, or None"""
+        exam_code = self._exam_codes.get(exam_name)
+        category_code = self._category_codes.get(category)
+        if exam_code is None or category_code is None:
+            return None
+        start, end = self._group_range(group_key(exam_code, category_code),
+                                       group_key(exam_code, category_code + 1))
+        if start == end:
+            return None
+        last = int(self.columns['group'][end - 1])
+        return (last >> YEAR_SHIFT) & YEAR_MASK, last & ROUND_MASK
+
+    def match(self, exam_name, category, rank=None, percentile=None, year=None, round_number=None,
+              quota=None, program=None):
+        """Colleges whose cutoff in one counselling round admits the given rank/percentile
+
+        Defaults to the latest round. A college with several quota/program
+        rows is judged by its most lenient one. Returns (college_ids,
+        statuses, ranks, percentiles, year, round) with one array entry per
+        matched college, or None if there is no such round.
+        """
+        found = self._round_range(exam_name, category, year, round_number)
+        if found is None:
+            return None
+        start, end, year, round_number = found
+
+        rows = slice(start, end)
+        college_ids = self.columns['college_id'][rows]
+        cutoff_ranks = self.columns['rank'][rows]
+        cutoff_percentiles = self.columns['percentile'][rows]
+
+        keep = None
+        for name, value, column_codes in (('quota', quota, self._quota_codes),
+                                          ('program', program, self._program_codes)):
+            if value is not None:
+                mask = self.columns[name][rows] == column_codes.get(value, -1)
+                keep = mask if keep is None else keep & mask
+        if keep is not None:
+            college_ids, cutoff_ranks, cutoff_percentiles = college_ids[keep], cutoff_ranks[keep], cutoff_percentiles[keep]
+        if not len(college_ids):
+            return None
+
+        # Rows are sorted by college within a round; fold each college's rows into its most lenient cutoff
+        starts = np.flatnonzero(np.concatenate(([True], college_ids[1:] != college_ids[:-1])))
+        college_ids = college_ids[starts]
+        cutoff_ranks = np.fmax.reduceat(cutoff_ranks, starts)
+        cutoff_percentiles = np.fmin.reduceat(cutoff_percentiles, starts)
+
+        has_rank = ~np.isnan(cutoff_ranks)
+        has_percentile = ~np.isnan(cutoff_percentiles)
+
+        # Rank cutoffs take precedence; percentile is the fallback
+        use_rank = has_rank & bool(rank)
+        eligible = np.where(use_rank, cutoff_ranks >= (rank or 0),
+                            has_percentile & bool(percentile) & (cutoff_percentiles <= (percentile or 0)))
+        reach = use_rank & ~eligible & ((rank or 0) <= cutoff_ranks * 1.2)
+
+        statuses = np.full(len(college_ids), NO_MATCH, dtype=np.int8)
+        statuses[eligible] = ELIGIBLE
+        statuses[reach] = REACH
+        matched = np.flatnonzero(statuses)
+        return (college_ids[matched], statuses[matched], cutoff_ranks[matched],
+                cutoff_percentiles[matched], year, round_number)
+
+    def cutoff(self, college_id, exam_name, category, year=None, round_number=None):
+        """One college's cutoff in one counselling round, folded across quota/program rows as match does
+
+        Defaults to the latest round. Returns a dict with year, round and the
+        rank and/or percentile cutoff, or None if the college has no cutoff there.
+        """
+        found = self._round_range(exam_name, category, year, round_number)
+        if found is None:
+            return None
+        start, end, year, round_number = found
+
+        # Rows are sorted by college within a round
+        college_ids = self.columns['college_id'][start:end]
+        if not np.iinfo(college_ids.dtype).min <= college_id <= np.iinfo(college_ids.dtype).max:
+            return None
+        college_id = college_ids.dtype.type(college_id)
+        low = start + int(np.searchsorted(college_ids, college_id, 'left'))
+        high = start + int(np.searchsorted(college_ids, college_id, 'right'))
+        if low == high:
+            return None
+
+        cutoff_rank = float(np.fmax.reduce(self.columns['rank'][low:high]))
+        cutoff_percentile = float(np.fmin.reduce(self.columns['percentile'][low:high]))
+        cutoff_data = {'year': year, 'round': round_number}
+        if cutoff_rank == cutoff_rank:
+            cutoff_data['rank'] = int(cutoff_rank) if cutoff_rank.is_integer() else cutoff_rank
+        if cutoff_percentile == cutoff_percentile:
+            cutoff_data['percentile'] = cutoff_percentile
+        return cutoff_data
+
+    def _round_range(self, exam_name, category, year=None, round_number=None):
+        """(start, end, year, round) of one round's rows, the latest by default, or None"""
+        if year is None or round_number is None:
+            latest = self.latest_round(exam_name, category)
+            if latest is None:
+                return None
+            if year is None:
+                year = latest[0]
+            if round_number is None:
+                round_number = latest[1] if year == latest[0] else self._last_round(exam_name, category, year)
+
+        exam_code = self._exam_codes.get(exam_name)
+        category_code = self._category_codes.get(category)
+        if exam_code is None or category_code is None or round_number is None:
+            return None
+        key = group_key(exam_code, category_code, year, round_number)
+        start, end = self._group_range(key, key + 1)
+        if start == end:
+            return None
+        return start, end, year, round_number
+
+    def _last_round(self, exam_name, category, year):
+        exam_code = self._exam_codes[exam_name]
+        category_code = self._category_codes[category]
+        start, end = self._group_range(group_key(exam_code, category_code, year),
+                                       group_key(exam_code, category_code, year + 1))
+        if start == end:
+            return None
+        return int(self.columns['group'][end - 1]) & ROUND_MASK
+
+    def history(self, college_id, exam_name=None, category=None, quota=None, program=None):
+        """Cutoff history of one college as a list of series, one per (exam, category, quota, program)
+
+        Each series lists its points in (year, round) order.
+        """
+        keys = self.columns['college_keys']
+        if not np.iinfo(keys.dtype).min <= college_id <= np.iinfo(keys.dtype).max:
+            return []
+        # Search with the column's own dtype so the mapped array is not converted
+        college_id = keys.dtype.type(college_id)
+        start = int(np.searchsorted(keys, college_id, 'left'))
+        end = int(np.searchsorted(keys, college_id, 'right'))
+        rows = np.asarray(self.columns['college_order'][start:end])
+        if not len(rows):
+            return []
+
+        groups = np.asarray(self.columns['group'][rows])
+        quotas = np.asarray(self.columns['quota'][rows])
+        programs = np.asarray(self.columns['program'][rows])
+        exam_codes = groups >> EXAM_SHIFT
+        category_codes = (groups >> CATEGORY_SHIFT) & CATEGORY_MASK
+
+        keep = np.ones(len(rows), dtype=bool)
+        for value, codes, column in ((exam_name, self._exam_codes, exam_codes),
+                                     (category, self._category_codes, category_codes),
+                                     (quota, self._quota_codes, quotas),
+                                     (program, self._program_codes, programs)):
+            if value is not None:
+                keep &= column == codes.get(value, -1)
+
+        rows = rows[keep]
+        groups = groups[keep]
+        ranks = np.asarray(self.columns['rank'][rows])
+        percentiles = np.asarray(self.columns['percentile'][rows])
+
+        series = {}
+        for group, quota_code, program_code, cutoff_rank, cutoff_percentile in zip(
+                groups.tolist(), quotas[keep].tolist(), programs[keep].tolist(), ranks.tolist(), percentiles.tolist()):
+            key = (group >> EXAM_SHIFT, (group >> CATEGORY_SHIFT) & CATEGORY_MASK, quota_code, program_code)
+            if key not in series:
+                series[key] = {
+                    'exam': self.exams[key[0]],
+                    'category': self.categories[key[1]],
+                    'quota': self.quotas[quota_code],
+                    'program': self.programs[program_code],
+                    'points': []
+                }
+            point = {'year': (group >> YEAR_SHIFT) & YEAR_MASK, 'round': group & ROUND_MASK}
+            if cutoff_rank == cutoff_rank:
+                point['rank'] = int(cutoff_rank) if cutoff_rank.is_integer() else cutoff_rank
+            if cutoff_percentile == cutoff_percentile:
+                point['percentile'] = cutoff_percentile
+            series[key]['points'].append(point)
+        return list(series.values())
@@ -0,0 +1,113 @@
+from datetime import date, datetime
+import json
+import time
+
+from src.models.outbox import NotificationOutbox
+from src.models.user import UserProfile, db
+from src.services.exam_calendar import DEADLINE_WINDOW_DAYS, DateIndex, urgency
+from src.services.fragments import encode
+
+DIGEST_KIND = 'deadline_digest'
+
+# Profiles fetched per round trip, and outbox rows per bulk insert
+BATCH_SIZE = 2000
+
+
+def _deadline_fragments(exams, today, window_days):
+    """Encoded digest entry per exam id whose application deadline is within the window"""
+    first = today.toordinal()
+    fragments = {}
+    for exam, days_remaining in DateIndex(exams, 'application_deadline').between(first, first + window_days):
+        fragments[exam['id']] = (days_remaining, encode({
+            'exam_id': exam['id'],
+            'name': exam['name'],
+            'application_deadline': exam['application_deadline'],
+            'days_remaining': days_remaining,
+            'urgency': urgency(days_remaining)
+        }).decode('utf-8'))
+    return fragments
+
+
+def generate_deadline_digests(exams, today=None, window_days=DEADLINE_WINDOW_DAYS,
+                              batch_size=BATCH_SIZE, progress=None):
+    """Write a deadline digest to the outbox for every user with a bookmarked exam closing soon
+
+    Profiles are streamed with ``yield_per`` (a server-side cursor where the
+    database supports one) and matched against an in-memory map of upcoming
+    deadlines, so memory stays bounded by the batch size. Digests are written
+    with one bulk insert per batch, in the same transaction as the read, and
+    committed at the end. Unsent digests from an earlier run for the same day
+    are replaced; users already sent one that day are skipped.
+    ``progress``, if given, is called with the running stats after each batch.
+    Returns the stats: profiles scanned, digests written, seconds and rates.
+    """
+    today = today or date.today()
+    started = time.perf_counter()
+    stats = {'profiles': 0, 'digests': 0, 'seconds': 0.0, 'profiles_per_second': 0.0}
+
+    deadlines = _deadline_fragments(exams, today, window_days)
+    prefix = f'{{"date":"{today.isoformat()}","deadlines":['
+
+    db.session.execute(
+        db.delete(NotificationOutbox)
+        .where(NotificationOutbox.kind == DIGEST_KIND)
+        .where(NotificationOutbox.digest_date == today)
+        .where(NotificationOutbox.sent_at.is_(None))
+    )
+    already_sent = set(db.session.scalars(
+        db.select(NotificationOutbox.user_id)
+        .where(NotificationOutbox.kind == DIGEST_KIND)
+        .where(NotificationOutbox.digest_date == today)
+    ))
+
+    if deadlines:
+        profiles = db.select(UserProfile.user_id, UserProfile.preferred_exams).where(
+            UserProfile.preferred_exams.is_not(None)
+        )
+        created_at = datetime.utcnow()
+        pending = []
+
+        result = db.session.execute(profiles, execution_options={'yield_per': batch_size})
+        for batch in result.partitions():
+            for user_id, preferred_exams in batch:
+                try:
+                    bookmarked = json.loads(preferred_exams)
+                except ValueError:
+                    continue
+                if not isinstance(bookmarked, list) or user_id in already_sent:
+                    continue
+                exam_ids = {exam_id for exam_id in bookmarked if isinstance(exam_id, int)}
+                entries = sorted(deadlines[exam_id] for exam_id in exam_ids if exam_id in deadlines)
+                if entries:
+                    pending.append({
+                        'user_id': user_id,
+                        'kind': DIGEST_KIND,
+                        'digest_date': today,
+                        'payload': prefix + ','.join(fragment for _, fragment in entries) + ']}',
+                        'created_at': created_at
+                    })
+            stats['profiles'] += len(batch)
+
+            if len(pending) >= batch_size:
+                stats['digests'] += _insert(pending)
+                pending = []
+            if progress:
+                progress(_rates(stats, started))
+
+        stats['digests'] += _insert(pending)
+
+    db.session.commit()
+    return _rates(stats, started)
+
+
+def _insert(rows):
+    """Bulk insert outbox rows; returns the number written"""
+    if rows:
+        db.session.execute(db.insert(NotificationOutbox), rows)
+    return len(rows)
+
+
+def _rates(stats, started):
+    stats['seconds'] = round(time.perf_counter() - started, 3)
+    stats['profiles_per_second'] = round(stats['profiles'] / stats['seconds']) if stats['seconds'] else 0
+    return stats
@@ -0,0 +1,117 @@
+from collections import OrderedDict
+from functools import wraps
+import hashlib
+import json
+import threading
+
+from flask import make_response, request
+
+# Content hash of each registered dataset, computed when it is (re)loaded
+DATASET_VERSIONS = {}
+
+# Functions returning the current version of datasets kept outside this
+# process, e.g. in database tables, called for every conditional request
+DATASET_SOURCES = {}
+
+# Remembered response sizes, used to report the bytes a 304 saved
+MAX_REMEMBERED_SIZES = 4096
+
+_lock = threading.Lock()
+_stats = {}
+_sizes = OrderedDict()
+
+
+def dataset_version(data):
+    """Content hash of a dataset"""
+    encoded = json.dumps(data, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def register_dataset(name, data):
+    """Record the version of a dataset; call again whenever the data is replaced"""
+    version = dataset_version(data)
+    DATASET_VERSIONS[name] = version
+    return version
+
+
+def register_dataset_source(name, source):
+    """Look up a dataset's version by calling source() on every conditional request"""
+    DATASET_SOURCES[name] = source
+
+
+def _current_version(name):
+    source = DATASET_SOURCES.get(name)
+    return source() if source else DATASET_VERSIONS[name]
+
+
+def catalog_etag(datasets):
+    """Strong ETag for the current request over the given datasets' versions
+
+    The etag depends only on the dataset versions, the path and the query
+    arguments, so it is known before any filtering or serialization happens.
+    """
+    key = [[_current_version(name) for name in datasets], request.path,
+           sorted(request.args.items(multi=True))]
+    return hashlib.sha1(json.dumps(key).encode('utf-8')).hexdigest()
+
+
+def conditional(*datasets):
+    """Serve a catalog view with a strong ETag, answering If-None-Match with 304
+
+    Only use on GET views whose body depends solely on the named datasets and
+    the request's path and query string.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = catalog_etag(datasets)
+            endpoint = request.endpoint
+
+            if request.if_none_match.contains_weak(etag):
+                with _lock:
+                    stats = _endpoint_stats(endpoint)
+                    stats['hits'] += 1
+                    stats['bytes_saved'] += _sizes.get(etag, 0)
+                response = make_response('', 304)
+                response.set_etag(etag)
+                return response
+
+            response = make_response(view(*args, **kwargs))
+            with _lock:
+                stats = _endpoint_stats(endpoint)
+                stats['misses'] += 1
+                if response.status_code == 200:
+                    size = response.calculate_content_length() or 0
+                    stats['bytes_sent'] += size
+                    _sizes[etag] = size
+                    _sizes.move_to_end(etag)
+                    if len(_sizes) > MAX_REMEMBERED_SIZES:
+                        _sizes.popitem(last=False)
+            if response.status_code == 200:
+                response.set_etag(etag)
+            return response
+        return wrapper
+    return decorator
+
+
+def _endpoint_stats(endpoint):
+    if endpoint not in _stats:
+        _stats[endpoint] = {'hits': 0, 'misses': 0, 'bytes_sent': 0, 'bytes_saved': 0}
+    return _stats[endpoint]
+
+
+def etag_stats():
+    """Conditional request counters per endpoint, plus totals"""
+    with _lock:
+        endpoints = {endpoint: dict(stats) for endpoint, stats in _stats.items()}
+    totals = {'hits': 0, 'misses': 0, 'bytes_sent': 0, 'bytes_saved': 0}
+    for stats in endpoints.values():
+        for key in totals:
+            totals[key] += stats[key]
+    requests = totals['hits'] + totals['misses']
+    totals['hit_ratio'] = round(totals['hits'] / requests, 4) if requests else 0.0
+    return {
+        'datasets': dict(DATASET_VERSIONS),
+        'endpoints': endpoints,
+        'totals': totals
+    }
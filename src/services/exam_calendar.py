@@ -0,0 +1,97 @@
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime
+
+from src.services.fragments import encode
+
+# Deadline urgency by days remaining: (last day of the bucket, label)
+URGENCY_LEVELS = ((7, 'urgent'), (15, 'moderate'))
+DEFAULT_URGENCY = 'normal'
+
+# Deadlines further away than this are not listed
+DEADLINE_WINDOW_DAYS = 30
+
+
+def urgency(days_remaining):
+    """Urgency label for a deadline days_remaining days away"""
+    for last_day, label in URGENCY_LEVELS:
+        if days_remaining <= last_day:
+            return label
+    return DEFAULT_URGENCY
+
+
+class DateIndex:
+    """Records sorted by one 'YYYY-MM-DD' field, as date ordinals for bisecting
+
+    Records whose field is missing or not a valid date are left out. Ties keep
+    catalog order.
+    """
+
+    def __init__(self, records, field):
+        entries = []
+        for position, record in enumerate(records):
+            try:
+                day = datetime.strptime(record[field], '%Y-%m-%d').date()
+            except (KeyError, TypeError, ValueError):
+                continue
+            entries.append((day.toordinal(), position, record))
+        entries.sort(key=lambda entry: entry[:2])
+        self.ordinals = [ordinal for ordinal, _, _ in entries]
+        self.records = [record for _, _, record in entries]
+
+    def between(self, first, last=None):
+        """(record, days from first) for dates from ordinal first through ordinal last, in date order"""
+        start = bisect_left(self.ordinals, first)
+        end = len(self.ordinals) if last is None else bisect_right(self.ordinals, last, start)
+        return [(self.records[i], self.ordinals[i] - first) for i in range(start, end)]
+
+
+class ExamCalendar:
+    """Exam and application deadline dates parsed once, with each day's lists memoized
+
+    The memo is keyed by calendar day, so it is dropped at the first request
+    after midnight; ``reload`` drops it along with the indexes.
+    """
+
+    def __init__(self, exams):
+        self.reload(exams)
+
+    def reload(self, exams):
+        """Rebuild the date indexes from a new exam catalog"""
+        self._exam_dates = DateIndex(exams, 'exam_date')
+        self._deadlines = DateIndex(exams, 'application_deadline')
+        self._memo = (None, {})
+
+    def _memoized(self, name, today, build):
+        day, memo = self._memo
+        if day != today:
+            # A new day (or a reload): start a fresh memo
+            day, memo = today, {}
+            self._memo = (day, memo)
+        if name not in memo:
+            memo[name] = build(today.toordinal())
+        return memo[name]
+
+    def upcoming(self, today=None):
+        """(encoded list, count) of exams on or after today, each with days_remaining"""
+        return self._memoized('upcoming', today or date.today(), self._build_upcoming)
+
+    def deadlines(self, today=None):
+        """(encoded list, count) of exams whose application deadline is within the window, with urgency"""
+        return self._memoized('deadlines', today or date.today(), self._build_deadlines)
+
+    def _build_upcoming(self, today):
+        exams = []
+        for exam, days_remaining in self._exam_dates.between(today):
+            exam_copy = exam.copy()
+            exam_copy['days_remaining'] = days_remaining
+            exams.append(exam_copy)
+        return encode(exams), len(exams)
+
+    def _build_deadlines(self, today):
+        exams = []
+        for exam, days_remaining in self._deadlines.between(today, today + DEADLINE_WINDOW_DAYS):
+            exam_copy = exam.copy()
+            exam_copy['deadline_days_remaining'] = days_remaining
+            exam_copy['urgency'] = urgency(days_remaining)
+            exams.append(exam_copy)
+        return encode(exams), len(exams)
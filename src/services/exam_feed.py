@@ -0,0 +1,142 @@
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+import hashlib
+import threading
+
+# Exam date fields published as all-day events, with the event title suffix
+FEED_EVENTS = (
+    ('application_deadline', 'Application deadline'),
+    ('exam_date', 'Exam day'),
+    ('result_date', 'Result'),
+)
+
+PRODUCT_ID = '-//EduPath//Exam Calendar//EN'
+CALENDAR_NAME = 'EduPath exam dates'
+UID_DOMAIN = 'edupath'
+
+# Rendered feeds kept in memory, least recently polled dropped first
+MAX_CACHED_FEEDS = 10000
+
+# Last-Modified when neither the catalog nor the profile has a date
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _escape(text):
+    """Escape a TEXT property value (RFC 5545, 3.3.11)"""
+    return (str(text).replace('\\', '\\\\').replace(';', '\\;')
+            .replace(',', '\\,').replace('\n', '\\n'))
+
+
+def _fold(line):
+    """Content line folded at 75 octets without splitting a UTF-8 character, CRLF terminated"""
+    encoded = line.encode('utf-8')
+    parts = []
+    limit = 75
+    while len(encoded) > limit:
+        cut = limit
+        while encoded[cut] & 0xC0 == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut])
+        encoded = encoded[cut:]
+        # Continuation lines start with a space, which counts towards the limit
+        limit = 74
+    parts.append(encoded)
+    return b'\r\n '.join(parts) + b'\r\n'
+
+
+def _lines(*lines):
+    return b''.join(_fold(line) for line in lines)
+
+
+def _exam_events(exam):
+    """(head, tail) byte strings per event of an exam, split where DTSTAMP goes"""
+    events = []
+    for field, title in FEED_EVENTS:
+        try:
+            day = datetime.strptime(exam[field], '%Y-%m-%d').date()
+        except (KeyError, TypeError, ValueError):
+            continue
+        head = _lines(
+            'BEGIN:VEVENT',
+            f'UID:exam-{exam["id"]}-{field.replace("_", "-")}@{UID_DOMAIN}'
+        )
+        tail = [
+            f'DTSTART;VALUE=DATE:{day:%Y%m%d}',
+            f'DTEND;VALUE=DATE:{day + timedelta(days=1):%Y%m%d}',
+            f'SUMMARY:{_escape(exam["name"] + " " + title)}',
+            'TRANSP:TRANSPARENT'
+        ]
+        if exam.get('full_name'):
+            tail.append(f'DESCRIPTION:{_escape(exam["full_name"])}')
+        if exam.get('official_website'):
+            tail.append(f'URL:{exam["official_website"]}')
+        tail.append('END:VEVENT')
+        events.append((head, _lines(*tail)))
+    return events
+
+
+class BookmarkFeeds:
+    """iCalendar feeds of users' bookmarked exam dates
+
+    Each exam's events are rendered once, when the catalog is loaded. A user's
+    feed is validated by their profile's ``updated_at`` and the catalog's
+    version and modification time (``modified_at``), so an unchanged feed can
+    be answered with 304 (or served from memory) after reading that one column.
+    """
+
+    def __init__(self, exams, modified_at=EPOCH):
+        self._lock = threading.Lock()
+        self._events = {exam['id']: _exam_events(exam) for exam in exams}
+        self._feeds = OrderedDict()
+        self.modified_at = modified_at
+
+        digest = hashlib.sha256()
+        for exam_id, exam_events in self._events.items():
+            digest.update(str(exam_id).encode('utf-8'))
+            for head, tail in exam_events:
+                digest.update(head + tail)
+        self._version = digest.hexdigest()[:16]
+
+    def validators(self, user_id, updated_at):
+        """(etag, last_modified) of a user's feed; updated_at is None for users without a profile
+
+        HTTP dates have whole seconds, so updated_at is rounded up: a bookmark
+        changed later within the same second must not compare as unmodified.
+        A last_modified still in the future is not a usable validator yet.
+        """
+        profile_version = updated_at.isoformat() if updated_at else ''
+        etag = hashlib.sha1(f'{user_id}:{profile_version}:{self._version}'.encode('utf-8')).hexdigest()
+        last_modified = EPOCH
+        if updated_at:
+            last_modified = updated_at.replace(microsecond=0, tzinfo=timezone.utc)
+            if updated_at.microsecond:
+                last_modified += timedelta(seconds=1)
+        return etag, max(last_modified, self.modified_at)
+
+    def feed(self, user_id, etag, last_modified, load_bookmarks):
+        """A user's feed as bytes; load_bookmarks() is only called when it is not cached under etag"""
+        with self._lock:
+            cached = self._feeds.get(user_id)
+            if cached is not None and cached[0] == etag:
+                self._feeds.move_to_end(user_id)
+                return cached[1]
+
+        stamp = _lines(f'DTSTAMP:{last_modified:%Y%m%dT%H%M%SZ}')
+        body = [_lines('BEGIN:VCALENDAR', 'VERSION:2.0', f'PRODID:{PRODUCT_ID}',
+                       'CALSCALE:GREGORIAN', 'METHOD:PUBLISH', f'X-WR-CALNAME:{CALENDAR_NAME}')]
+        seen = set()
+        for exam_id in load_bookmarks():
+            if exam_id in seen:
+                continue
+            seen.add(exam_id)
+            for head, tail in self._events.get(exam_id, ()):
+                body.extend((head, stamp, tail))
+        body.append(_lines('END:VCALENDAR'))
+        body = b''.join(body)
+
+        with self._lock:
+            self._feeds[user_id] = (etag, body)
+            self._feeds.move_to_end(user_id)
+            if len(self._feeds) > MAX_CACHED_FEEDS:
+                self._feeds.popitem(last=False)
+        return body
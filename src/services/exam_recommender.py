@@ -0,0 +1,93 @@
+from collections import OrderedDict, defaultdict
+import threading
+import time
+
+from src.services.fragments import encode
+
+# Class levels recommended undergraduate exams; other levels mentioning
+# "graduate" get postgraduate exams
+UNDERGRADUATE_CLASS_LEVELS = ('12th', 'Class 12')
+
+# Exams recommended when the profile matches no rule
+POPULAR_COUNT = 5
+
+# Per-user entries kept, and how long one may be served before the profile is
+# read again (other worker processes do not see this process's invalidations)
+MAX_CACHED_USERS = 10000
+USER_TTL_SECONDS = 300
+
+
+class ExamRecommender:
+    """Exam recommendation rules over stream and level buckets built at load
+
+    Results are memoized per (stream, class_level) as encoded JSON, and each
+    user's last result is cached so repeat requests need no database access
+    until ``invalidate`` is called for that user or the entry expires.
+    """
+
+    def __init__(self, exams):
+        self._lock = threading.Lock()
+        self.reload(exams)
+
+    def reload(self, exams):
+        """Rebuild the buckets from a new exam catalog and drop every cached result"""
+        by_stream = defaultdict(list)
+        by_level = defaultdict(list)
+        for exam in exams:
+            by_stream[exam['stream'].lower()].append(exam)
+            by_level[exam['level']].append(exam)
+        with self._lock:
+            self._by_stream = dict(by_stream)
+            self._by_level = dict(by_level)
+            self._popular = list(exams[:POPULAR_COUNT])
+            self._results = {}
+            self._users = OrderedDict()
+
+    def _matching(self, stream, class_level):
+        recommendations = []
+        if stream:
+            recommendations.extend(self._by_stream.get(stream.lower(), []))
+        if class_level:
+            if class_level in UNDERGRADUATE_CLASS_LEVELS:
+                recommendations.extend(self._by_level.get('Undergraduate', []))
+            elif 'graduate' in class_level.lower():
+                recommendations.extend(self._by_level.get('Postgraduate', []))
+
+        # Dict keys keep the position of each exam's first occurrence
+        unique = list({exam['id']: exam for exam in recommendations}.values())
+        return unique or self._popular
+
+    def recommend(self, stream, class_level):
+        """(encoded exam list, count) for a profile's stream and class level"""
+        key = (stream, class_level)
+        result = self._results.get(key)
+        if result is None:
+            exams = self._matching(stream, class_level)
+            result = self._results[key] = (encode(exams), len(exams))
+        return result
+
+    def cached(self, user_id):
+        """A user's cached result, or None if it has to be recomputed"""
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is None:
+                return None
+            expires, result = entry
+            if expires < time.monotonic():
+                del self._users[user_id]
+                return None
+            self._users.move_to_end(user_id)
+            return result
+
+    def remember(self, user_id, result):
+        """Cache a user's result until invalidated or expired"""
+        with self._lock:
+            self._users[user_id] = (time.monotonic() + USER_TTL_SECONDS, result)
+            self._users.move_to_end(user_id)
+            if len(self._users) > MAX_CACHED_USERS:
+                self._users.popitem(last=False)
+
+    def invalidate(self, user_id):
+        """Forget a user's cached result after their profile changes"""
+        with self._lock:
+            self._users.pop(user_id, None)
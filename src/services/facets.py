@@ -0,0 +1,105 @@
+from collections import Counter
+import threading
+
+# All counters by name, so they can be checked together
+FACET_COUNTERS = {}
+
+
+class FacetCounter:
+    """Value counts of one field across a dataset, maintained incrementally
+
+    ``key`` returns the facet value of a record, or a list of values when
+    ``multi`` is set (e.g. a mentor's expertise list). ``source`` returns the
+    current records and is used for the initial count and for consistency checks.
+    """
+
+    def __init__(self, name, key, source, multi=False):
+        self.name = name
+        self.key = key
+        self.source = source
+        self.multi = multi
+        self._lock = threading.Lock()
+        self._counts = self.recount()
+        self._snapshot = None
+        FACET_COUNTERS[name] = self
+
+    def _values(self, record):
+        values = self.key(record)
+        if not self.multi:
+            return [values]
+        return values or []
+
+    def recount(self):
+        """Count every record from scratch"""
+        counts = Counter()
+        for record in self.source():
+            counts.update(self._values(record))
+        return counts
+
+    def add(self, record):
+        """Count a new record"""
+        with self._lock:
+            self._counts.update(self._values(record))
+            self._snapshot = None
+
+    def remove(self, record):
+        """Stop counting a record"""
+        with self._lock:
+            for value in self._values(record):
+                self._counts[value] -= 1
+                if self._counts[value] <= 0:
+                    del self._counts[value]
+            self._snapshot = None
+
+    def update(self, old_record, new_record):
+        """Move a record's counts from its old values to its new ones"""
+        self.remove(old_record)
+        self.add(new_record)
+
+    def snapshot(self):
+        """Counts and sorted values, rebuilt only after a change"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                counts = dict(self._counts)
+                snapshot = {
+                    'counts': counts,
+                    'values': list(counts),
+                    'sorted_values': sorted(counts),
+                    'most_common': self._counts.most_common()
+                }
+                self._snapshot = snapshot
+        return snapshot
+
+    def counts(self):
+        return self.snapshot()['counts']
+
+    def values(self):
+        return self.snapshot()['values']
+
+    def sorted_values(self):
+        return self.snapshot()['sorted_values']
+
+    def most_common(self, n=None):
+        most_common = self.snapshot()['most_common']
+        return most_common if n is None else most_common[:n]
+
+    def check(self):
+        """Compare the maintained counts against a full recount
+
+        Returns {value: (maintained, recounted)} for every value that differs.
+        """
+        with self._lock:
+            maintained = dict(self._counts)
+        recounted = self.recount()
+        return {
+            value: (maintained.get(value, 0), recounted.get(value, 0))
+            for value in set(maintained) | set(recounted)
+            if maintained.get(value, 0) != recounted.get(value, 0)
+        }
+
+
+def check_all():
+    """Run check() on every registered counter, returning mismatches by counter name"""
+    return {name: mismatches for name, counter in FACET_COUNTERS.items()
+            if (mismatches := counter.check())}
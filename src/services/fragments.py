@@ -0,0 +1,113 @@
+from collections import OrderedDict
+import json
+import threading
+
+from flask import Response
+
+from src.services.projection import projection_plan
+
+# All fragment caches by name, so a catalog reload can refresh them together
+FRAGMENT_CACHES = {}
+
+# Field sets whose projected fragments are kept per cache
+MAX_PROJECTIONS = 32
+
+
+def encode(value):
+    """Encode a value the way jsonify does outside debug mode"""
+    return json.dumps(value, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+
+class FragmentCache:
+    """Catalog records encoded to JSON bytes once, looked up by id
+
+    Views splice the cached bytes into their response bodies with
+    ``spliced_response`` instead of serializing the records again. Sparse
+    fieldsets (see ``src.services.projection``) are encoded on first use and
+    cached per field set. Call ``reload`` with the new records whenever the
+    catalog is replaced.
+    """
+
+    def __init__(self, name, records, key='id'):
+        self.name = name
+        self.key = key
+        self._lock = threading.Lock()
+        self.reload(records)
+        FRAGMENT_CACHES[name] = self
+
+    def reload(self, records):
+        """Re-encode every record; readers see the old or the new cache, never a mix"""
+        records = {record[self.key]: record for record in records}
+        fragments = {key: encode(record) for key, record in records.items()}
+        with self._lock:
+            self._records = records
+            self._fragments = fragments
+            self._projections = OrderedDict()
+
+    def get(self, key, fields=None):
+        """Encoded record for key, projected to fields if given, or None"""
+        if fields is None:
+            return self._fragments.get(key)
+        record = self._records.get(key)
+        if record is None:
+            return None
+        projected = self._projected(fields)
+        fragment = projected.get(key)
+        if fragment is None:
+            fragment = projected[key] = encode(projection_plan(fields)(record))
+        return fragment
+
+    def many(self, records, fields=None):
+        """Encoded records, projected to fields if given; records that are not cached are encoded directly"""
+        key = self.key
+        if fields is None:
+            fragments = self._fragments
+            return [fragments.get(record[key]) or encode(record) for record in records]
+
+        project = projection_plan(fields)
+        projected = self._projected(fields)
+        cached = self._records
+        result = []
+        for record in records:
+            fragment = projected.get(record[key])
+            if fragment is None:
+                fragment = encode(project(record))
+                if cached.get(record[key]) is record:
+                    projected[record[key]] = fragment
+            result.append(fragment)
+        return result
+
+    def _projected(self, fields):
+        """Projected fragments for a field set, evicting the least recently used set"""
+        with self._lock:
+            projections = self._projections
+            projected = projections.get(fields)
+            if projected is None:
+                projected = projections[fields] = {}
+                if len(projections) > MAX_PROJECTIONS:
+                    projections.popitem(last=False)
+            else:
+                projections.move_to_end(fields)
+            return projected
+
+    def __len__(self):
+        return len(self._fragments)
+
+
+def spliced_response(body, status=200):
+    """JSON response for a dict whose bytes values, or lists of bytes, are already encoded"""
+    parts = [b'{']
+    for index, name in enumerate(sorted(body)):
+        if index:
+            parts.append(b',')
+        parts.append(encode(name))
+        parts.append(b':')
+        value = body[name]
+        if isinstance(value, bytes):
+            parts.append(value)
+        elif isinstance(value, list) and all(isinstance(item, bytes) for item in value):
+            parts.append(b'[' + b','.join(value) + b']')
+        else:
+            parts.append(encode(value))
+    parts.append(b'}\n')
+    return Response(b''.join(parts), status=status, mimetype='application/json')
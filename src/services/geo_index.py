@@ -0,0 +1,145 @@
+from collections import defaultdict
+import math
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+# Grid cell size; about 28 km north-south
+CELL_DEGREES = 0.25
+
+# Half the earth's circumference; no two points are further apart
+MAX_DISTANCE_KM = math.pi * EARTH_RADIUS_KM
+
+
+def haversine_km(lat, lon, lats, lons):
+    """Great-circle distances in km from one point to arrays of points, all in radians"""
+    a = (np.sin((lats - lat) / 2) ** 2
+         + math.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class GeoGrid:
+    """Fixed-size lat/lon grid over records' coordinates for radius and nearest-k queries
+
+    A radius query only computes distances for points in the grid cells
+    overlapping the circle's bounding box. Nearest-k queries grow the radius
+    until it holds k points. Records without coordinates are not indexed.
+    """
+
+    def __init__(self, records, cell_degrees=CELL_DEGREES):
+        self.cell_degrees = cell_degrees
+        self._rows = math.ceil(180 / cell_degrees)
+        self._columns = math.ceil(360 / cell_degrees)
+
+        positions, lats, lons = [], [], []
+        for position, record in enumerate(records):
+            coordinates = record.get('coordinates') or {}
+            lat, lon = coordinates.get('lat'), coordinates.get('lon')
+            if lat is None or lon is None:
+                continue
+            positions.append(position)
+            lats.append(lat)
+            lons.append(lon)
+
+        self.positions = np.array(positions, dtype=np.int64)
+        self._lats = np.radians(np.array(lats, dtype=np.float64))
+        self._lons = np.radians(np.array(lons, dtype=np.float64))
+
+        cells = defaultdict(list)
+        for index, (lat, lon) in enumerate(zip(lats, lons)):
+            cells[self._cell(lat, lon)].append(index)
+        self._cells = {cell: np.array(indexes, dtype=np.int64) for cell, indexes in cells.items()}
+
+        # Occupied cells as arrays, for boxes spanning more cells than are occupied
+        self._cell_keys = list(self._cells)
+        self._cell_rows = np.array([row for row, _ in self._cell_keys], dtype=np.int64)
+        self._cell_columns = np.array([column for _, column in self._cell_keys], dtype=np.int64)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def _cell(self, lat, lon):
+        row = min(int((lat + 90) // self.cell_degrees), self._rows - 1)
+        column = int((lon + 180) // self.cell_degrees) % self._columns
+        return row, column
+
+    def _candidates(self, lat, lon, radius_km):
+        """Indexes of points in the cells overlapping the circle's bounding box"""
+        lat_delta = radius_km / KM_PER_DEGREE
+        top = lat + lat_delta
+        bottom = lat - lat_delta
+        widest = max(abs(top), abs(bottom))
+        lon_delta = 180 if widest >= 90 else lat_delta / math.cos(math.radians(widest))
+
+        first_row = self._cell(max(bottom, -90), 0)[0]
+        last_row = self._cell(min(top, 90), 0)[0]
+        if lon_delta >= 180:
+            first_column, last_column = 0, self._columns - 1
+        else:
+            first_column = self._cell(0, lon - lon_delta)[1]
+            last_column = self._cell(0, lon + lon_delta)[1]
+        # A box crossing the antimeridian wraps around to the first columns
+        wraps = first_column > last_column
+        width = (self._columns - first_column + last_column + 1) if wraps else (last_column - first_column + 1)
+
+        cells = self._cells
+        if (last_row - first_row + 1) * width <= len(cells):
+            if wraps:
+                column_range = list(range(first_column, self._columns)) + list(range(last_column + 1))
+            else:
+                column_range = range(first_column, last_column + 1)
+            found = [cells[(row, column)] for row in range(first_row, last_row + 1)
+                     for column in column_range if (row, column) in cells]
+        else:
+            rows, columns = self._cell_rows, self._cell_columns
+            in_rows = (rows >= first_row) & (rows <= last_row)
+            if wraps:
+                in_columns = (columns >= first_column) | (columns <= last_column)
+            else:
+                in_columns = (columns >= first_column) & (columns <= last_column)
+            found = [cells[self._cell_keys[i]] for i in np.flatnonzero(in_rows & in_columns).tolist()]
+
+        if not found:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(found)
+
+    def _query(self, lat, lon, radius_km, predicate):
+        """Unordered (positions, distances) arrays of points within radius_km"""
+        indexes = self._candidates(lat, lon, radius_km)
+        if predicate is not None and len(indexes):
+            indexes = indexes[predicate(self.positions[indexes])]
+        distances = haversine_km(math.radians(lat), math.radians(lon), self._lats[indexes], self._lons[indexes])
+        inside = distances <= radius_km
+        return self.positions[indexes[inside]], distances[inside]
+
+    @staticmethod
+    def _ordered(positions, distances):
+        # Nearest first, ties in catalog order
+        order = np.lexsort((positions, distances))
+        return list(zip(positions[order].tolist(), distances[order].tolist()))
+
+    def within(self, lat, lon, radius_km, predicate=None):
+        """(position, distance_km) of points within radius_km, nearest first
+
+        ``predicate`` optionally takes an array of positions and returns a
+        boolean mask of the ones to keep.
+        """
+        return self._ordered(*self._query(lat, lon, radius_km, predicate))
+
+    def nearest(self, lat, lon, k, predicate=None, max_radius_km=MAX_DISTANCE_KM):
+        """(position, distance_km) of the k points nearest to (lat, lon), within max_radius_km"""
+        radius = min(self.cell_degrees * KM_PER_DEGREE, max_radius_km)
+        while True:
+            positions, distances = self._query(lat, lon, radius, predicate)
+            if len(positions) >= k or radius >= max_radius_km:
+                break
+            radius = min(radius * 2, max_radius_km)
+
+        if len(positions) > k:
+            # Keep everything up to the k-th distance so ties are broken by position
+            kth = np.partition(distances, k - 1)[k - 1]
+            keep = distances <= kth
+            positions, distances = positions[keep], distances[keep]
+        return self._ordered(positions, distances)[:k]
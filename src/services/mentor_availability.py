@@ -0,0 +1,163 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# Slot starts are placed on a grid of this many minutes; one day of grid
+# positions must fit in a uint64
+GRID_MINUTES = 30
+UNITS_PER_DAY = 24 * 60 // GRID_MINUTES
+
+WEEKDAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+
+def _unit(minute_of_day):
+    return minute_of_day // GRID_MINUTES
+
+
+def _bit(unit):
+    return np.uint64(1) << np.uint64(unit)
+
+
+def _units_mask(first_unit, last_unit):
+    """uint64 with bits first_unit through last_unit - 1 set"""
+    first_unit = max(0, min(first_unit, UNITS_PER_DAY))
+    last_unit = max(first_unit, min(last_unit, UNITS_PER_DAY))
+    return ((np.uint64(1) << np.uint64(last_unit - first_unit)) - np.uint64(1)) << np.uint64(first_unit)
+
+
+def _minute_of_day(moment):
+    return moment.hour * 60 + moment.minute
+
+
+class MentorAvailability:
+    """Mentors' weekly slot patterns compiled to bitmasks
+
+    Each bit of a day's uint64 is a grid position that a slot starts at.
+    ``weekly`` holds one row of seven day masks per mentor (all zero for
+    unavailable mentors). Over a horizon of days, the free slots are the
+    weekly pattern AND NOT the booked bitmap, computed for every mentor at
+    once. Raises ValueError for a slot that does not start on the grid.
+    """
+
+    def __init__(self, mentors):
+        self.mentor_ids = np.array([mentor['id'] for mentor in mentors], dtype=np.int64)
+        self._rows = {mentor['id']: row for row, mentor in enumerate(mentors)}
+        self.weekly = np.zeros((len(mentors), len(WEEKDAYS)), dtype=np.uint64)
+        # Per mentor: (grid position, slot label such as '10:00-12:00') in time order
+        self.slot_labels = []
+
+        for row, mentor in enumerate(mentors):
+            labels = {}
+            for time_slot in mentor['availability']['time_slots']:
+                start = datetime.strptime(time_slot.partition('-')[0], '%H:%M')
+                minute = _minute_of_day(start)
+                if minute % GRID_MINUTES:
+                    raise ValueError(f'Mentor {mentor["id"]} slot {time_slot} does not start on '
+                                     f'the {GRID_MINUTES}-minute grid')
+                labels[_unit(minute)] = time_slot
+            self.slot_labels.append(sorted(labels.items()))
+
+            if not mentor['is_available']:
+                continue
+            day_mask = np.uint64(0)
+            for unit in labels:
+                day_mask |= _bit(unit)
+            for weekday, name in enumerate(WEEKDAYS):
+                if name in mentor['availability']['days']:
+                    self.weekly[row, weekday] = day_mask
+
+    def __contains__(self, mentor_id):
+        return mentor_id in self._rows
+
+    def pattern(self, first_day, days):
+        """(mentors, days) uint64 slot masks of the weekly patterns from first_day"""
+        weekdays = (np.arange(days) + first_day.weekday()) % len(WEEKDAYS)
+        return self.weekly[:, weekdays]
+
+    def booked(self, bookings, first_day, days):
+        """(mentors, days) uint64 bitmap of booked slot starts; bookings are (mentor_id, slot_start)"""
+        bitmap = np.zeros((len(self.mentor_ids), days), dtype=np.uint64)
+        first = first_day.toordinal()
+        rows, offsets, units = [], [], []
+        for mentor_id, slot_start in bookings:
+            row = self._rows.get(mentor_id)
+            offset = slot_start.toordinal() - first
+            if row is None or not 0 <= offset < days:
+                continue
+            rows.append(row)
+            offsets.append(offset)
+            units.append(_unit(_minute_of_day(slot_start)))
+        if rows:
+            np.bitwise_or.at(bitmap, (np.array(rows), np.array(offsets)),
+                             np.uint64(1) << np.array(units, dtype=np.uint64))
+        return bitmap
+
+    def free(self, bookings, first_day, days, now=None):
+        """(mentors, days) uint64 masks of open slots, leaving out slots that started before now"""
+        free = self.pattern(first_day, days) & ~self.booked(bookings, first_day, days)
+        if now is not None:
+            offset = (now.date() - first_day).days
+            if offset >= days:
+                free[:] = 0
+            elif offset >= 0:
+                free[:, :offset] = 0
+                # Slots starting at or before the current minute are gone
+                free[:, offset] &= ~_units_mask(0, _unit(_minute_of_day(now)) + 1)
+        return free
+
+    def day_slots(self, mentor_id, free, first_day):
+        """Availability days of one mentor: date, day name and every slot with whether it is open"""
+        row = self._rows[mentor_id]
+        labels = self.slot_labels[row]
+        pattern = self.pattern(first_day, free.shape[1])[row]
+        open_slots = free[row]
+
+        days = []
+        for offset in np.flatnonzero(pattern).tolist():
+            date = first_day + timedelta(days=offset)
+            day_open = int(open_slots[offset])
+            days.append({
+                'date': date.isoformat(),
+                'day': WEEKDAYS[date.weekday()],
+                'slots': [{'time': label, 'available': bool(day_open >> unit & 1)} for unit, label in labels]
+            })
+        return days
+
+    def window_mask(self, start, end, first_day, days):
+        """(days,) uint64 masks of the grid positions from start (inclusive) to end (exclusive)"""
+        masks = np.zeros(days, dtype=np.uint64)
+        for offset in range(days):
+            day_start = datetime.combine(first_day + timedelta(days=offset), datetime.min.time())
+            first = max(start, day_start)
+            last = min(end, day_start + timedelta(days=1))
+            if first >= last:
+                continue
+            first_unit = -(-int((first - day_start).total_seconds()) // (GRID_MINUTES * 60))
+            last_unit = -(-int((last - day_start).total_seconds()) // (GRID_MINUTES * 60))
+            masks[offset] = _units_mask(first_unit, last_unit)
+        return masks
+
+    def free_in_window(self, free, window, first_day):
+        """[(mentor_id, [(slot start, slot label)])] of mentors with an open slot starting in the window
+
+        ``free`` comes from ``free`` and ``window`` from ``window_mask`` over
+        the same days; mentors are matched with one vectorized AND across all
+        of them, and only matching mentors are decoded.
+        """
+        in_window = free & window
+        day_starts = [datetime.combine(first_day + timedelta(days=offset), datetime.min.time())
+                      for offset in range(in_window.shape[1])]
+
+        matches = []
+        last_row = None
+        # Row-major order: each mentor's (day, mask) pairs come together, by day
+        rows, offsets = np.nonzero(in_window)
+        for row, offset, day_mask in zip(rows.tolist(), offsets.tolist(), in_window[rows, offsets].tolist()):
+            if row != last_row:
+                starts = []
+                matches.append((int(self.mentor_ids[row]), starts))
+                last_row = row
+            for unit, label in self.slot_labels[row]:
+                if day_mask >> unit & 1:
+                    starts.append((day_starts[offset] + timedelta(minutes=unit * GRID_MINUTES), label))
+        return matches
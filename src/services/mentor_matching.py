@@ -0,0 +1,246 @@
+from datetime import datetime
+import json
+import time
+
+import numpy as np
+from scipy import sparse
+
+from src.models.mentorship import MentorSuggestion
+from src.models.user import User, UserProfile, db
+from src.services.search_index import tokenize
+
+# Score added by each kind of feature a student and a mentor share
+FEATURE_WEIGHTS = {
+    'exam': 3.0,  # a target exam the mentor specializes in
+    'college': 2.0,  # a target college the mentor studies at
+    'institute': 1.0,  # same institute family, e.g. any IIT
+    'stream': 1.0  # a mentor exam in the student's stream
+}
+
+# Mentors kept per student
+SUGGESTION_COUNT = 10
+
+# Students scored per sparse product; bounds the size of the score matrix
+CHUNK_SIZE = 2000
+
+# Score matrix cells (students x mentors) made dense at once for top-N selection
+MAX_SCORE_CELLS = 4000000
+
+# Distinct student feature sets whose matches are remembered across chunks
+MAX_MEMO_PROFILES = 50000
+
+
+def _normalized(text):
+    return ' '.join(tokenize(text))
+
+
+def _contains_run(tokens, run):
+    """Whether run occurs as consecutive tokens in tokens"""
+    width = len(run)
+    return any(tokens[start:start + width] == run for start in range(len(tokens) - width + 1))
+
+
+class MentorMatcher:
+    """Students and mentors encoded as sparse feature vectors over a shared vocabulary
+
+    Mentor features come from their specializations, expertise and college;
+    exams are resolved against the exam catalog so they also carry a stream.
+    A student's score for a mentor is the weighted count of shared features,
+    so one sparse product scores a whole chunk of students at once. Students
+    with the same features get the same matches, so each distinct feature
+    set is scored once. Only available mentors are matched.
+    """
+
+    def __init__(self, mentors, exams, colleges):
+        self._exams = {exam['id']: exam for exam in exams}
+        self._exam_names = {_normalized(exam['name']): exam['id'] for exam in exams}
+        self._exam_tokens = [(exam['id'], tokenize(exam['name'])) for exam in exams]
+        self._college_names = {college['id']: college['name'] for college in colleges}
+
+        # Mentor columns in tie-break order: rating descending, then id
+        mentors = sorted(mentors, key=lambda mentor: (-mentor['rating'], mentor['id']))
+        self.ids = np.array([mentor['id'] for mentor in mentors], dtype=np.int64)
+        self.vocabulary = {}
+        self._memo = {}
+
+        indices, indptr = [], [0]
+        for mentor in mentors:
+            if mentor['is_available']:
+                for feature in sorted(self._mentor_features(mentor), key=repr):
+                    indices.append(self.vocabulary.setdefault(feature, len(self.vocabulary)))
+            indptr.append(len(indices))
+        self.weights = np.array([FEATURE_WEIGHTS[feature[0]] for feature in self.vocabulary], dtype=np.float64)
+        # Features x mentors, so a chunk of student rows multiplies it directly
+        self.mentor_matrix = sparse.csr_matrix(
+            (np.ones(len(indices)), np.array(indices, dtype=np.int64), np.array(indptr, dtype=np.int64)),
+            shape=(len(mentors), len(self.vocabulary))
+        ).T.tocsr()
+
+    def _exam_features(self, exam_id):
+        return {('exam', exam_id), ('stream', self._exams[exam_id]['stream'].lower())}
+
+    def _college_features(self, name):
+        tokens = tokenize(name)
+        if not tokens:
+            return set()
+        return {('college', ' '.join(tokens)), ('institute', tokens[0])}
+
+    def _mentor_features(self, mentor):
+        features = self._college_features(mentor['college'])
+        for value in mentor['specializations'] + mentor['expertise']:
+            tokens = tokenize(value)
+            resolved = [exam_id for exam_id, run in self._exam_tokens if run and _contains_run(tokens, run)]
+            for exam_id in resolved:
+                features |= self._exam_features(exam_id)
+            if not resolved and value in mentor['specializations'] and tokens:
+                # An exam or track outside the catalog still matches the same name
+                features.add(('exam', ' '.join(tokens)))
+        return features
+
+    def user_features(self, stream, target_exams, target_colleges):
+        """Features of a student from User.stream and the decoded target_exams and target_colleges lists"""
+        features = set()
+        if stream:
+            features.add(('stream', stream.lower()))
+        for exam in target_exams:
+            if isinstance(exam, int) and not isinstance(exam, bool) and exam in self._exams:
+                features |= self._exam_features(exam)
+            elif isinstance(exam, str) and _normalized(exam):
+                exam_id = self._exam_names.get(_normalized(exam))
+                features |= self._exam_features(exam_id) if exam_id else {('exam', _normalized(exam))}
+        for college in target_colleges:
+            if isinstance(college, int) and not isinstance(college, bool):
+                college = self._college_names.get(college)
+            if isinstance(college, str):
+                features |= self._college_features(college)
+        return features
+
+    def columns(self, features):
+        """Vocabulary columns of a student's features; features no mentor has are dropped"""
+        vocabulary = self.vocabulary
+        return frozenset(vocabulary[feature] for feature in features if feature in vocabulary)
+
+    def user_matrix(self, column_sets):
+        """Students x features matrix of feature weights, one row per set of columns"""
+        indices = np.fromiter((column for columns in column_sets for column in sorted(columns)), dtype=np.int64)
+        indptr = np.cumsum([0] + [len(columns) for columns in column_sets], dtype=np.int64)
+        return sparse.csr_matrix((self.weights[indices], indices, indptr),
+                                 shape=(len(column_sets), len(self.vocabulary)))
+
+    def match(self, users_features, count=SUGGESTION_COUNT):
+        """[(mentor_id, score)] of the best count mentors per student, from their feature sets"""
+        keys = [(count, self.columns(features)) for features in users_features]
+        missing = list(dict.fromkeys(key for key in keys if key not in self._memo))
+        if missing:
+            if len(self._memo) + len(missing) > MAX_MEMO_PROFILES:
+                self._memo.clear()
+            matches = self.top_matches(self.user_matrix([columns for _, columns in missing]), count)
+            self._memo.update(zip(missing, matches))
+        return [self._memo[key] for key in keys]
+
+    def top_matches(self, user_matrix, count=SUGGESTION_COUNT):
+        """Per student row, [(mentor_id, score)] of the best count mentors with a positive score
+
+        Ties are broken by mentor rating, then id, which is the column order.
+        Rows are scored in blocks of at most MAX_SCORE_CELLS dense cells; in
+        each block, one partition finds every row's count-th best score, the
+        columns above it are kept, and the earliest columns equal to it fill
+        the remaining places.
+        """
+        mentor_count = len(self.ids)
+        matches = []
+        block_rows = max(1, MAX_SCORE_CELLS // max(mentor_count, 1))
+        for start in range(0, user_matrix.shape[0], block_rows):
+            scores = (user_matrix[start:start + block_rows] @ self.mentor_matrix).toarray()
+            if count < mentor_count:
+                threshold = np.partition(scores, mentor_count - count, axis=1)[:, mentor_count - count, None]
+                above = scores > threshold
+                at = scores == threshold
+                places = count - np.count_nonzero(above, axis=1)[:, None]
+                selected = (above | (at & (np.cumsum(at, axis=1) <= places))) & (scores > 0)
+            else:
+                selected = scores > 0
+
+            rows, columns = np.nonzero(selected)
+            values = scores[rows, columns]
+            # Best score first; equal scores keep their column order
+            order = np.lexsort((columns, -values, rows))
+            block = [[] for _ in range(scores.shape[0])]
+            for row, mentor_id, score in zip(rows[order].tolist(), self.ids[columns[order]].tolist(),
+                                             values[order].tolist()):
+                block[row].append((mentor_id, score))
+            matches.extend(block)
+        return matches
+
+
+def _decoded_list(value):
+    try:
+        decoded = json.loads(value) if value else []
+    except ValueError:
+        return []
+    return decoded if isinstance(decoded, list) else []
+
+
+def generate_mentor_suggestions(mentors, exams, colleges, count=SUGGESTION_COUNT,
+                                chunk_size=CHUNK_SIZE, progress=None):
+    """Compute and store the top mentor matches of every student
+
+    Students are read in keyset chunks of ``chunk_size`` ids; each chunk is
+    scored with one sparse product, its previous suggestions are replaced
+    with one bulk insert, and it is committed, so memory is bounded by the
+    chunk size and readers see each student's old or new list. Students
+    without a match lose their stored suggestions. ``progress``, if given,
+    is called with the running stats after each chunk. Returns the stats:
+    users scanned, suggestions written, seconds and rates.
+    """
+    started = time.perf_counter()
+    stats = {'users': 0, 'suggested': 0, 'seconds': 0.0, 'users_per_second': 0.0}
+    matcher = MentorMatcher(mentors, exams, colleges)
+
+    users = (
+        db.select(User.id, User.stream, User.target_exams, UserProfile.target_colleges)
+        .outerjoin(UserProfile, UserProfile.user_id == User.id)
+        .order_by(User.id)
+        .limit(chunk_size)
+    )
+    last_id = None
+    while True:
+        # Keyset chunks rather than one streamed cursor, which a commit would close
+        chunk = db.session.execute(users if last_id is None else users.where(User.id > last_id)).all()
+        if not chunk:
+            break
+        # A user with several profile rows is scored on the first
+        first_rows = {}
+        for row in chunk:
+            first_rows.setdefault(row.id, row)
+        chunk = list(first_rows.values())
+        user_ids = [row.id for row in chunk]
+        last_id = user_ids[-1]
+        features = [
+            matcher.user_features(row.stream, _decoded_list(row.target_exams), _decoded_list(row.target_colleges))
+            for row in chunk
+        ]
+        computed_at = datetime.utcnow()
+        rows = [
+            {'user_id': user_id, 'mentors': json.dumps(matches), 'computed_at': computed_at}
+            for user_id, matches in zip(user_ids, matcher.match(features, count))
+            if matches
+        ]
+
+        db.session.execute(db.delete(MentorSuggestion).where(MentorSuggestion.user_id.in_(user_ids)))
+        if rows:
+            db.session.execute(db.insert(MentorSuggestion), rows)
+        db.session.commit()
+
+        stats['users'] += len(chunk)
+        stats['suggested'] += len(rows)
+        if progress:
+            progress(_rates(stats, started))
+
+    return _rates(stats, started)
+
+
+def _rates(stats, started):
+    stats['seconds'] = round(time.perf_counter() - started, 3)
+    stats['users_per_second'] = round(stats['users'] / stats['seconds']) if stats['seconds'] else 0
+    return stats
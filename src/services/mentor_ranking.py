@@ -0,0 +1,167 @@
+from collections import defaultdict
+import math
+
+import numpy as np
+
+from src.services.search_index import tokenize
+
+# Weights of the search ranking score; each component is scaled to 0..1
+SEARCH_WEIGHTS = {'rating': 0.6, 'success_stories': 0.3, 'price_fit': 0.1}
+
+# Query tokens whose vocabulary lookups are remembered, per field
+MAX_MEMO_TOKENS = 4096
+
+
+class TokenField:
+    """Lowercased values of one text field per mentor, with a token -> mentors inverted index
+
+    ``mask`` gives exactly the mentors having the query as a substring of one
+    of their values, like ``query in value.lower()`` over every value, but
+    only verifies the mentors whose tokens can contain the query's tokens.
+    """
+
+    def __init__(self, values_per_mentor):
+        self.values = [tuple(value.lower() for value in values) for values in values_per_mentor]
+        postings = defaultdict(list)
+        for position, values in enumerate(self.values):
+            for token in {token for value in values for token in tokenize(value)}:
+                postings[token].append(position)
+        self._postings = {token: np.array(positions, dtype=np.int64) for token, positions in postings.items()}
+        self._memo = {}
+
+    def _containing(self, token):
+        """Sorted positions of mentors with a token containing token"""
+        positions = self._memo.get(token)
+        if positions is None:
+            found = [posting for word, posting in self._postings.items() if token in word]
+            positions = np.unique(np.concatenate(found)) if found else np.empty(0, dtype=np.int64)
+            if len(self._memo) >= MAX_MEMO_TOKENS:
+                self._memo.clear()
+            self._memo[token] = positions
+        return positions
+
+    def mask(self, query):
+        """Boolean mask of mentors with query as a substring of one of their values"""
+        query = query.lower()
+        mask = np.zeros(len(self.values), dtype=bool)
+        tokens = set(tokenize(query))
+        if not tokens:
+            candidates = range(len(self.values))
+        else:
+            candidates = None
+            for token in tokens:
+                positions = self._containing(token)
+                candidates = positions if candidates is None else np.intersect1d(candidates, positions,
+                                                                                assume_unique=True)
+            if tokens == {query}:
+                # A single bare token: every candidate contains it
+                mask[candidates] = True
+                return mask
+            candidates = candidates.tolist()
+
+        values = self.values
+        mask[[p for p in candidates if any(query in value for value in values[p])]] = True
+        return mask
+
+
+class MentorRanker:
+    """Mentor columns, text indexes and ranking scores built once per catalog load
+
+    Filters are boolean masks over all mentors, and a page of results is the
+    best ``limit`` of the matching mentors selected with a partial partition,
+    so no request sorts the whole catalog.
+    """
+
+    def __init__(self, mentors):
+        self.ids = np.array([mentor['id'] for mentor in mentors], dtype=np.int64)
+        self._positions = {mentor['id']: position for position, mentor in enumerate(mentors)}
+        self.rating = np.array([mentor['rating'] for mentor in mentors], dtype=np.float64)
+        self.reviews_count = np.array([mentor['reviews_count'] for mentor in mentors], dtype=np.float64)
+        self.success_stories = np.array([mentor['success_stories'] for mentor in mentors], dtype=np.float64)
+        self.price = np.array([mentor['pricing']['per_session'] for mentor in mentors], dtype=np.float64)
+        self.available = np.array([bool(mentor['is_available']) for mentor in mentors], dtype=bool)
+
+        self.fields = {
+            'college': TokenField([[mentor['college']] for mentor in mentors]),
+            'location': TokenField([[mentor['location']] for mentor in mentors]),
+            'expertise': TokenField([mentor['expertise'] for mentor in mentors]),
+            'specializations': TokenField([mentor['specializations'] for mentor in mentors]),
+        }
+
+        self.search_score = self._search_score(self.rating)
+
+    def _search_score(self, rating):
+        return (
+            SEARCH_WEIGHTS['rating'] * _scaled(rating)
+            + SEARCH_WEIGHTS['success_stories'] * _scaled(np.log1p(self.success_stories))
+            + SEARCH_WEIGHTS['price_fit'] * (1 - _scaled(self.price))
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    def position(self, mentor_id):
+        """Position of a mentor in the catalog, or None"""
+        return self._positions.get(mentor_id)
+
+    def all(self):
+        return np.ones(len(self.ids), dtype=bool)
+
+    def text_mask(self, field, query):
+        return self.fields[field].mask(query)
+
+    def with_reviews(self, totals):
+        """(rating, search score) arrays with stored review totals folded into the catalog ratings
+
+        ``totals`` maps mentor id to (reviews_count, rating_sum) of the stored
+        reviews; the catalog rating and reviews_count stand for the reviews
+        from before they were stored. Ids not in the catalog are ignored.
+        """
+        counts = np.zeros(len(self.ids))
+        sums = np.zeros(len(self.ids))
+        for mentor_id, (reviews_count, rating_sum) in totals.items():
+            position = self._positions.get(mentor_id)
+            if position is not None:
+                counts[position] = reviews_count
+                sums[position] = rating_sum
+
+        rating = self.rating.copy()
+        reviewed = np.flatnonzero(counts)
+        baseline = self.reviews_count[reviewed]
+        rating[reviewed] = ((self.rating[reviewed] * baseline + sums[reviewed])
+                            / np.maximum(baseline + counts[reviewed], 1))
+        return rating, self._search_score(rating)
+
+    def top(self, mask, scores, limit, after=None):
+        """(positions of the next page, (score, id) of its last row or None, total matches)
+
+        Rows are ordered by score descending, then id ascending. ``after`` is
+        the (score, id) of the previous page's last row.
+        """
+        total = int(np.count_nonzero(mask))
+        if after is not None:
+            score, mentor_id = after
+            mask = mask & ((scores < score) | ((scores == score) & (self.ids > mentor_id)))
+
+        candidates = np.flatnonzero(mask)
+        if len(candidates) > limit:
+            # Keep everything scoring at least the limit-th best, so ties at the cut are settled by id
+            threshold = np.partition(scores[candidates], len(candidates) - limit)[len(candidates) - limit]
+            candidates = candidates[scores[candidates] >= threshold]
+        order = np.lexsort((self.ids[candidates], -scores[candidates]))
+        page = candidates[order[:limit]]
+
+        last = None
+        if len(page) == limit and np.count_nonzero(mask) > limit:
+            last = (float(scores[page[-1]]), int(self.ids[page[-1]]))
+        return page.tolist(), last, total
+
+
+def _scaled(values):
+    """Values scaled to 0..1 over their range (all zero when they are all equal)"""
+    if not len(values):
+        return values
+    low, high = values.min(), values.max()
+    if math.isclose(low, high):
+        return np.zeros_like(values)
+    return (values - low) / (high - low)
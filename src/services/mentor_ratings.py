@@ -0,0 +1,173 @@
+from datetime import datetime, timedelta
+import hashlib
+import logging
+import threading
+import time
+
+from sqlalchemy.exc import IntegrityError
+
+from src.models.mentorship import MentorRatingAggregate
+from src.models.user import db
+from src.services.etags import DATASET_VERSIONS
+
+logger = logging.getLogger(__name__)
+
+# Dataset name of the live totals, for ETags of views ranked by them
+DATASET = 'mentor_ratings'
+
+# How often a worker reads the aggregates updated since its last look
+CHECK_INTERVAL_SECONDS = 5
+
+# Aggregates updated up to this long before the newest one seen are read
+# again, so a transaction that committed late is not missed
+RESCAN_SECONDS = 60
+
+
+def _star_column(rating):
+    return getattr(MentorRatingAggregate, f'stars_{rating}')
+
+
+def _change_rating(mentor_id, rating, step):
+    """Add step reviews of rating stars to the mentor's aggregate; returns False if it has no row"""
+    stars = _star_column(rating)
+    result = db.session.execute(
+        db.update(MentorRatingAggregate)
+        .where(MentorRatingAggregate.mentor_id == mentor_id)
+        .values({
+            MentorRatingAggregate.reviews_count: MentorRatingAggregate.reviews_count + step,
+            MentorRatingAggregate.rating_sum: MentorRatingAggregate.rating_sum + step * rating,
+            stars: stars + step,
+            MentorRatingAggregate.updated_at: datetime.utcnow()
+        })
+    )
+    return result.rowcount > 0
+
+
+def add_rating(mentor_id, rating):
+    """Count a new review in the mentor's aggregate, in the caller's transaction
+
+    The increment is a single UPDATE, so concurrent reviews of one mentor
+    never lose counts; the first review creates the row under a savepoint
+    and falls back to the UPDATE if another transaction created it first.
+    """
+    if _change_rating(mentor_id, rating, 1):
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.add(MentorRatingAggregate(
+                mentor_id=mentor_id,
+                reviews_count=1,
+                rating_sum=rating,
+                updated_at=datetime.utcnow(),
+                **{f'stars_{rating}': 1}
+            ))
+    except IntegrityError:
+        _change_rating(mentor_id, rating, 1)
+
+
+def remove_ratings(reviews):
+    """Take deleted reviews out of their mentors' aggregates, in the caller's transaction"""
+    for review in reviews:
+        _change_rating(review.mentor_id, review.rating, -1)
+
+
+def blended_rating(mentor, reviews_count, rating_sum):
+    """(average rating, reviews count) of a catalog mentor with its stored reviews added
+
+    The catalog's rating and reviews_count stand for the reviews collected
+    before reviews were stored.
+    """
+    count = mentor['reviews_count'] + reviews_count
+    if not count:
+        return mentor['rating'], 0
+    return (mentor['rating'] * mentor['reviews_count'] + rating_sum) / count, count
+
+
+def _row_hash(mentor_id, totals):
+    digest = hashlib.sha1(f'{mentor_id}:{totals[0]}:{totals[1]}'.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big')
+
+
+class LiveRatings:
+    """Every mentor's stored review totals, mirrored from the aggregate table
+
+    ``refresh`` reads only the aggregates updated since the last look, at
+    most every CHECK_INTERVAL_SECONDS. The ``mentor_ratings`` dataset version
+    is an order-independent hash of all totals, kept up to date row by row,
+    so workers holding the same totals produce the same ETags.
+    """
+
+    def __init__(self):
+        self.totals = {}  # mentor_id -> (reviews_count, rating_sum)
+        self._digest = 0
+        self._seen = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._columns = None
+        DATASET_VERSIONS[DATASET] = f'{self._digest:016x}'
+
+    def apply(self, rows):
+        """Take in (mentor_id, reviews_count, rating_sum) rows"""
+        with self._lock:
+            changed = False
+            for mentor_id, reviews_count, rating_sum in rows:
+                totals = (reviews_count, rating_sum)
+                old = self.totals.get(mentor_id, (0, 0))
+                if totals == old:
+                    continue
+                self._digest ^= _row_hash(mentor_id, old) ^ _row_hash(mentor_id, totals)
+                self.totals[mentor_id] = totals
+                changed = True
+            if changed:
+                DATASET_VERSIONS[DATASET] = f'{self._digest:016x}'
+
+    def expire(self):
+        """Read the aggregates again on the next refresh, e.g. after this worker changed them"""
+        self._next_check = 0.0
+
+    def refresh(self):
+        """Read the aggregates updated since the last refresh, if one is due; never raises"""
+        now = time.monotonic()
+        if now < self._next_check or not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            self._next_check = now + CHECK_INTERVAL_SECONDS
+            query = db.select(
+                MentorRatingAggregate.mentor_id,
+                MentorRatingAggregate.reviews_count,
+                MentorRatingAggregate.rating_sum,
+                MentorRatingAggregate.updated_at
+            )
+            if self._seen is not None:
+                query = query.where(MentorRatingAggregate.updated_at >= self._seen - timedelta(seconds=RESCAN_SECONDS))
+            rows = db.session.execute(query).all()
+            if rows:
+                newest = max(row.updated_at for row in rows)
+                self._seen = newest if self._seen is None else max(self._seen, newest)
+            self.apply((row.mentor_id, row.reviews_count, row.rating_sum) for row in rows)
+        except Exception:
+            db.session.rollback()
+            logger.exception('Could not refresh mentor rating aggregates')
+        finally:
+            self._refresh_lock.release()
+
+    def columns(self, ranker):
+        """(rating, search score) arrays of the ranker's mentors with the stored reviews folded in"""
+        with self._lock:
+            version = DATASET_VERSIONS[DATASET]
+            cached = self._columns
+            if cached and cached[0] is ranker and cached[1] == version:
+                return cached[2]
+            totals = dict(self.totals)
+        columns = ranker.with_reviews(totals)
+        self._columns = (ranker, version, columns)
+        return columns
+
+
+LIVE_RATINGS = LiveRatings()
+
+
+def refresh_live_ratings():
+    """before_request hook keeping LIVE_RATINGS current"""
+    LIVE_RATINGS.refresh()
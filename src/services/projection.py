@@ -0,0 +1,67 @@
+from functools import lru_cache
+
+# Limits on a ?fields= parameter
+MAX_FIELDS = 50
+MAX_DEPTH = 4
+
+# Always returned so clients can fetch the full record
+ALWAYS_INCLUDED = ('id',)
+
+
+def parse_fields(raw):
+    """Normalized field set for a comma-separated ?fields= value, or None for full records
+
+    Raises ValueError for an oversized or malformed field list.
+    """
+    if raw is None or not raw.strip():
+        return None
+    paths = {path.strip() for path in raw.split(',') if path.strip()}
+    if len(paths) > MAX_FIELDS:
+        raise ValueError(f'At most {MAX_FIELDS} fields may be requested')
+    for path in paths:
+        parts = path.split('.')
+        if len(parts) > MAX_DEPTH or not all(parts):
+            raise ValueError(f'Invalid field: {path}')
+    paths.update(ALWAYS_INCLUDED)
+    return tuple(sorted(paths))
+
+
+@lru_cache(maxsize=256)
+def projection_plan(fields):
+    """Compiled projection function for a field set from parse_fields
+
+    Dotted paths select into nested objects, and into every object of a
+    nested list. Paths a record does not have are left out.
+    """
+    tree = {}
+    for path in fields:
+        node = tree
+        *parents, leaf = path.split('.')
+        for part in parents:
+            child = node.get(part, {})
+            if child is None:
+                # A parent path was requested whole
+                break
+            node = node.setdefault(part, child)
+        else:
+            node[leaf] = None
+    return _compile(tree)
+
+
+def _compile(tree):
+    leaves = tuple(key for key, child in tree.items() if child is None)
+    branches = tuple((key, _compile(child)) for key, child in tree.items() if child is not None)
+
+    def project(record):
+        projected = {key: record[key] for key in leaves if key in record}
+        for key, project_child in branches:
+            if key not in record:
+                continue
+            value = record[key]
+            if isinstance(value, dict):
+                projected[key] = project_child(value)
+            elif isinstance(value, list):
+                projected[key] = [project_child(item) if isinstance(item, dict) else item for item in value]
+        return projected
+
+    return project
@@ -0,0 +1,100 @@
+from collections import Counter
+
+from sqlalchemy.exc import IntegrityError
+
+from src.models.community import Question, QuestionFacetCount, QuestionTag
+from src.models.user import db
+from src.services.facets import FACET_COUNTERS
+
+
+class QuestionFacet:
+    """Question counts per category or tag, kept in the QuestionFacetCount table
+
+    Counts are changed with single UPDATE statements in the transaction that
+    adds or deletes the questions, so every worker reads the same counts and
+    the facet endpoints never group the questions. Values are counted
+    case-insensitively and shown in the spelling they were first counted
+    with. Registered with the facet counters, so ``check`` compares the
+    counts against a recount (needs an app context).
+    """
+
+    def __init__(self, name, facet, recount_query):
+        self.name = name
+        self.facet = facet
+        self._recount_query = recount_query
+        FACET_COUNTERS[name] = self
+
+    def _change(self, key, step):
+        return db.session.execute(
+            db.update(QuestionFacetCount)
+            .where(QuestionFacetCount.facet == self.facet)
+            .where(QuestionFacetCount.key == key)
+            .values(count=QuestionFacetCount.count + step)
+        ).rowcount > 0
+
+    def add(self, key, label):
+        """Count a question with this value, in the caller's transaction"""
+        if self._change(key, 1):
+            return
+        try:
+            with db.session.begin_nested():
+                db.session.add(QuestionFacetCount(facet=self.facet, key=key, label=label, count=1))
+        except IntegrityError:
+            # Another transaction counted the value first
+            self._change(key, 1)
+
+    def remove(self, counts):
+        """Stop counting questions, given {key: number of questions}, in the caller's transaction"""
+        for key, count in counts.items():
+            self._change(key, -count)
+        db.session.execute(
+            db.delete(QuestionFacetCount)
+            .where(QuestionFacetCount.facet == self.facet)
+            .where(QuestionFacetCount.count <= 0)
+        )
+
+    def counts(self):
+        """{label: count} of every value"""
+        return dict(db.session.execute(
+            db.select(QuestionFacetCount.label, QuestionFacetCount.count)
+            .where(QuestionFacetCount.facet == self.facet)
+        ).all())
+
+    def most_common(self, n):
+        """[(label, count)] of the n most used values"""
+        return [tuple(row) for row in db.session.execute(
+            db.select(QuestionFacetCount.label, QuestionFacetCount.count)
+            .where(QuestionFacetCount.facet == self.facet)
+            .order_by(QuestionFacetCount.count.desc(), QuestionFacetCount.key)
+            .limit(n)
+        ).all()]
+
+    def recount(self):
+        """Count every question from scratch, by key"""
+        return Counter(dict(db.session.execute(self._recount_query).all()))
+
+    def check(self):
+        """Compare the maintained counts against a full recount
+
+        Returns {key: (maintained, recounted)} for every value that differs.
+        """
+        maintained = dict(db.session.execute(
+            db.select(QuestionFacetCount.key, QuestionFacetCount.count)
+            .where(QuestionFacetCount.facet == self.facet)
+        ).all())
+        recounted = self.recount()
+        return {
+            key: (maintained.get(key, 0), recounted.get(key, 0))
+            for key in set(maintained) | set(recounted)
+            if maintained.get(key, 0) != recounted.get(key, 0)
+        }
+
+
+QUESTION_CATEGORY_FACET = QuestionFacet(
+    'question_category', 'category',
+    db.select(Question.category_key, db.func.count(Question.id)).group_by(Question.category_key)
+)
+QUESTION_TAG_FACET = QuestionFacet(
+    'question_tag', 'tag',
+    db.select(QuestionTag.tag_key, db.func.count(QuestionTag.question_id)).group_by(QuestionTag.tag_key)
+)
@@ -0,0 +1,60 @@
+import logging
+
+from sqlalchemy import inspect
+
+from src.models.mentorship import MentorBooking
+from src.models.user import Payment, db
+
+logger = logging.getLogger(__name__)
+
+
+def _add_column(inspector, model, name):
+    """Add a model column missing from its table; returns whether it was added"""
+    table = model.__table__
+    if name in {column['name'] for column in inspector.get_columns(table.name)}:
+        return False
+    column_type = table.c[name].type.compile(dialect=db.engine.dialect)
+    db.session.execute(db.text(f'ALTER TABLE {table.name} ADD COLUMN {name} {column_type}'))
+    return True
+
+
+def _index(model, name):
+    return next(index for index in model.__table__.indexes if index.name == name)
+
+
+def upgrade_schema():
+    """Bring tables created by earlier versions in line with the models; returns the steps applied
+
+    db.create_all only creates missing tables, so columns and indexes added
+    to existing tables are applied here. Every step checks the live schema
+    first, so running it again, or from several workers at once, is safe; a
+    worker that loses a race rolls back and leaves the step to the winner.
+    """
+    applied = []
+    try:
+        inspector = inspect(db.engine)
+
+        # Mentor slot holds: booking hold expiry, and payments linked to the booking they pay for
+        if _add_column(inspector, MentorBooking, 'hold_expires_at'):
+            applied.append('mentor_booking.hold_expires_at')
+        if _add_column(inspector, Payment, 'booking_id'):
+            applied.append('payment.booking_id')
+
+        # The slot index now also ignores expired holds; the hold index marks the upgraded schema
+        booking_indexes = {index['name'] for index in inspector.get_indexes(MentorBooking.__table__.name)}
+        if 'ix_mentor_booking_hold' not in booking_indexes:
+            if 'uq_mentor_booking_slot' in booking_indexes:
+                db.session.execute(db.text('DROP INDEX uq_mentor_booking_slot'))
+            _index(MentorBooking, 'uq_mentor_booking_slot').create(db.session.connection())
+            _index(MentorBooking, 'ix_mentor_booking_hold').create(db.session.connection())
+            applied.append('mentor_booking slot and hold indexes')
+
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        logger.exception('Upgrading the database schema failed')
+        return []
+
+    if applied:
+        logger.info('Upgraded database schema: %s', ', '.join(applied))
+    return applied
@@ -0,0 +1,188 @@
+from bisect import bisect_left
+from collections import defaultdict
+from itertools import groupby
+import heapq
+import re
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+ALPHABET = 'abcdefghijklmnopqrstuvwxyz0123456789'
+
+# Size of the grams used for substring candidate lookup
+GRAM_SIZE = 3
+
+# A short last token can expand to many vocabulary words; past this many it is
+# only checked against candidates found through the other tokens
+MAX_PREFIX_STREAM_WORDS = 64
+
+# Separator between fields in the joined search text; queries containing it never match
+SEPARATOR = '\x00'
+
+# Match quality, lower is better
+EXACT_MATCH = 0
+FUZZY_MATCH = 1
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def edit_variants(word):
+    """All strings within one edit (delete, transpose, replace, insert) of word"""
+    splits = [(word[:i], word[i:]) for i in range(len(word) + 1)]
+    variants = set()
+    for left, right in splits:
+        if right:
+            variants.add(left + right[1:])
+            if len(right) > 1:
+                variants.add(left + right[1] + right[0] + right[2:])
+            for char in ALPHABET:
+                variants.add(left + char + right[1:])
+        for char in ALPHABET:
+            variants.add(left + char + right)
+    variants.discard(word)
+    return variants
+
+
+class TextSearchIndex:
+    """Substring search and typo-tolerant autocomplete over a few text fields
+
+    Substring search looks up the rarest trigram of the query and verifies
+    the candidates, so it returns exactly what a full ``in`` scan would.
+    Autocomplete matches query tokens against a sorted token vocabulary
+    (completed tokens exactly, the last token as a prefix), falling back to
+    tokens within one edit when there are too few matches. Token postings are
+    kept in rank order, so the top-k search walks the most selective posting
+    list from the best-ranked record and stops after k verified matches.
+    """
+
+    def __init__(self, records, fields, rank_key):
+        self.records = list(records)
+        self._joined = []
+        self._gram_postings = gram_postings = defaultdict(list)
+
+        for position, record in enumerate(self.records):
+            joined = SEPARATOR.join(str(record.get(field) or '').lower() for field in fields)
+            self._joined.append(joined)
+            for gram in {joined[i:i + GRAM_SIZE] for i in range(len(joined) - GRAM_SIZE + 1)}:
+                gram_postings[gram].append(position)
+
+        # Autocomplete works on ranks: a record's index in rank_key order
+        self._positions_by_rank = sorted(range(len(self.records)),
+                                         key=lambda p: (rank_key(self.records[p]), p))
+        self._rank_tokens = []
+        token_postings = defaultdict(list)
+        for rank, position in enumerate(self._positions_by_rank):
+            tokens = frozenset(tokenize(self._joined[position]))
+            self._rank_tokens.append(tokens)
+            for token in tokens:
+                token_postings[token].append(rank)
+
+        self._vocabulary = sorted(token_postings)
+        self._token_postings = dict(token_postings)
+
+    def candidates(self, query):
+        """Positions that may contain query (a superset), or None if every record may"""
+        query = query.lower()
+        if len(query) < GRAM_SIZE:
+            return None
+        grams = {query[i:i + GRAM_SIZE] for i in range(len(query) - GRAM_SIZE + 1)}
+        postings = [self._gram_postings.get(gram, ()) for gram in grams]
+        return min(postings, key=len)
+
+    def matches(self, position, query):
+        """Whether query (already lowercased) is a substring of any field of a record"""
+        return query in self._joined[position] and SEPARATOR not in query
+
+    def search(self, query):
+        """Positions of records with query as a substring of any field, in order"""
+        query = query.lower()
+        if SEPARATOR in query:
+            return []
+        candidates = self.candidates(query)
+        if candidates is None:
+            candidates = range(len(self.records))
+        joined = self._joined
+        return [p for p in candidates if query in joined[p]]
+
+    def autocomplete(self, query, limit=10):
+        """Top suggestions for a partially typed query, as (position, match quality) pairs"""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        *complete, last = tokens
+        words = [{token} for token in complete]
+        prefixes = [last]
+
+        ranks = self._top_matches(words, prefixes, limit, exclude=())
+        results = [(rank, EXACT_MATCH) for rank in ranks]
+
+        if len(results) < limit:
+            fuzzy_words = [group | set(self._word_variants(token)) for group, token in zip(words, complete)]
+            fuzzy_prefixes = prefixes + self._prefix_variants(last)
+            if fuzzy_words != words or fuzzy_prefixes != prefixes:
+                ranks = self._top_matches(fuzzy_words, fuzzy_prefixes, limit - len(results), exclude=set(ranks))
+                results.extend((rank, FUZZY_MATCH) for rank in ranks)
+
+        return [(self._positions_by_rank[rank], quality) for rank, quality in results]
+
+    def _top_matches(self, words, prefixes, limit, exclude):
+        """Best-ranked records having a token from every word group and a token starting with a prefix"""
+        prefixes = tuple(prefixes)
+
+        # Drive the walk from the most selective posting list
+        streams = [self._merged_postings(group) for group in words]
+        prefix_words = [word for prefix in prefixes for word in self._words_with_prefix(prefix)]
+        if not prefix_words:
+            return []
+        if not streams or len(prefix_words) <= MAX_PREFIX_STREAM_WORDS:
+            streams.append(self._merged_postings(prefix_words))
+        driver = min(streams, key=lambda stream: stream[1])[0]
+
+        rank_tokens = self._rank_tokens
+        results = []
+        for rank in driver:
+            if rank in exclude:
+                continue
+            tokens = rank_tokens[rank]
+            if not all(tokens & group for group in words):
+                continue
+            if not any(token.startswith(prefixes) for token in tokens):
+                continue
+            results.append(rank)
+            if len(results) >= limit:
+                break
+        return results
+
+    def _merged_postings(self, words):
+        """(iterator over ranks in order, upper bound on its length) for the union of words' postings"""
+        postings = [self._token_postings[word] for word in words if word in self._token_postings]
+        size = sum(len(posting) for posting in postings)
+        if len(postings) == 1:
+            return iter(postings[0]), size
+        return (rank for rank, _ in groupby(heapq.merge(*postings))), size
+
+    def _words_with_prefix(self, prefix):
+        vocabulary = self._vocabulary
+        start = bisect_left(vocabulary, prefix)
+        end = bisect_left(vocabulary, prefix + '\uffff', start)
+        return vocabulary[start:end]
+
+    def _has_prefix(self, prefix):
+        vocabulary = self._vocabulary
+        start = bisect_left(vocabulary, prefix)
+        return start < len(vocabulary) and vocabulary[start].startswith(prefix)
+
+    def _word_variants(self, word):
+        """Vocabulary words within one edit of word"""
+        if len(word) < 3:
+            return []
+        return [variant for variant in edit_variants(word) if variant in self._token_postings]
+
+    def _prefix_variants(self, prefix):
+        """Prefixes within one edit of prefix that start some vocabulary word"""
+        if len(prefix) < 3:
+            # One edit on a very short prefix matches nearly everything
+            return []
+        return [variant for variant in edit_variants(prefix)
+                if len(variant) >= 3 and self._has_prefix(variant)]
@@ -0,0 +1,208 @@
+from collections import namedtuple
+from datetime import datetime, timedelta
+import logging
+import threading
+import time
+
+from src.models.mentorship import MentorBooking
+from src.models.user import db
+
+logger = logging.getLogger(__name__)
+
+# How long a pending-payment booking holds its slot
+HOLD_TTL_SECONDS = 15 * 60
+
+# Timing wheel resolution and size; one rotation covers TICK_SECONDS * WHEEL_SIZE
+TICK_SECONDS = 1
+WHEEL_SIZE = 1024
+
+# How often a worker expires due holds, and re-reads the live holds of every worker
+SWEEP_INTERVAL_SECONDS = 1
+SYNC_INTERVAL_SECONDS = 5
+
+EPOCH = datetime(1970, 1, 1)
+
+Hold = namedtuple('Hold', 'booking_id mentor_id slot_start expires_at')
+
+
+def hold_expiry(now=None):
+    """UTC time a hold placed now expires"""
+    return (now or datetime.utcnow()) + timedelta(seconds=HOLD_TTL_SECONDS)
+
+
+class SlotHolds:
+    """Live slot holds of pending-payment bookings, expired through a hashed timing wheel
+
+    Each hold sits in the bucket of its expiry tick. ``advance`` visits only
+    the buckets of the ticks that passed since its last call and returns the
+    holds that expired, so expiry costs O(1) amortized per hold and never
+    scans all holds; a hold more than one rotation away stays in its bucket
+    until its tick comes round. Removed holds are dropped from their bucket
+    lazily. Times are naive UTC, like ``hold_expires_at``.
+    """
+
+    def __init__(self, tick_seconds=TICK_SECONDS, wheel_size=WHEEL_SIZE, now=None):
+        self.tick_seconds = tick_seconds
+        self._buckets = [[] for _ in range(wheel_size)]
+        self._holds = {}  # booking_id -> Hold
+        self._by_mentor = {}  # mentor_id -> {booking_id: Hold}
+        self._tick = self._tick_of(now or datetime.utcnow())
+        self._lock = threading.Lock()
+
+    def _tick_of(self, moment):
+        return int((moment - EPOCH).total_seconds() // self.tick_seconds)
+
+    def _expiry_tick(self, hold):
+        """First tick at or after the hold's expiry, so it never expires early"""
+        return int(-(-(hold.expires_at - EPOCH).total_seconds() // self.tick_seconds))
+
+    def __len__(self):
+        return len(self._holds)
+
+    def __contains__(self, booking_id):
+        return booking_id in self._holds
+
+    def add(self, hold):
+        """Place or replace a hold; one already past its expiry goes at the next tick"""
+        with self._lock:
+            self._discard(hold.booking_id)
+            self._holds[hold.booking_id] = hold
+            self._by_mentor.setdefault(hold.mentor_id, {})[hold.booking_id] = hold
+            tick = max(self._expiry_tick(hold), self._tick + 1)
+            self._buckets[tick % len(self._buckets)].append(hold)
+
+    def remove(self, booking_id):
+        """Drop a hold that was paid for or cancelled; returns it, or None"""
+        with self._lock:
+            return self._discard(booking_id)
+
+    def _discard(self, booking_id):
+        hold = self._holds.pop(booking_id, None)
+        if hold is not None:
+            held = self._by_mentor[hold.mentor_id]
+            del held[booking_id]
+            if not held:
+                del self._by_mentor[hold.mentor_id]
+        return hold
+
+    def advance(self, now=None):
+        """Expire and return the holds whose expiry tick has passed"""
+        now_tick = self._tick_of(now or datetime.utcnow())
+        expired = []
+        with self._lock:
+            # After a long pause every bucket is visited once, not once per tick
+            first = max(self._tick + 1, now_tick - len(self._buckets) + 1)
+            for tick in range(first, now_tick + 1):
+                index = tick % len(self._buckets)
+                waiting = []
+                for hold in self._buckets[index]:
+                    if self._holds.get(hold.booking_id) is not hold:
+                        continue
+                    if self._expiry_tick(hold) > now_tick:
+                        waiting.append(hold)
+                    else:
+                        self._discard(hold.booking_id)
+                        expired.append(hold)
+                self._buckets[index] = waiting
+            self._tick = max(self._tick, now_tick)
+        return expired
+
+    def held(self, mentor_id=None):
+        """(mentor_id, slot_start) of the live holds, of one mentor if given"""
+        with self._lock:
+            if mentor_id is not None:
+                return [(hold.mentor_id, hold.slot_start) for hold in self._by_mentor.get(mentor_id, {}).values()]
+            return [(hold.mentor_id, hold.slot_start) for hold in self._holds.values()]
+
+    def replace(self, holds):
+        """Make the live holds exactly the given ones, e.g. as read from the database"""
+        holds = {hold.booking_id: hold for hold in holds}
+        with self._lock:
+            current = dict(self._holds)
+        for booking_id in current:
+            if booking_id not in holds:
+                self.remove(booking_id)
+        for booking_id, hold in holds.items():
+            if current.get(booking_id) != hold:
+                self.add(hold)
+
+
+SLOT_HOLDS = SlotHolds()
+
+_sweep_lock = threading.Lock()
+_next_sweep = 0.0
+_next_sync = 0.0
+
+
+def booking_hold(booking):
+    return Hold(booking.id, booking.mentor_id, booking.slot_start, booking.hold_expires_at)
+
+
+def _expire(ids=None, mentor_id=None, slot_start=None, now=None):
+    """Mark due pending-payment bookings expired, in the caller's transaction; returns how many"""
+    query = (
+        db.update(MentorBooking)
+        .where(MentorBooking.status == 'pending_payment')
+        .where(MentorBooking.hold_expires_at <= (now or datetime.utcnow()))
+        .values(status='expired')
+    )
+    if ids is not None:
+        query = query.where(MentorBooking.id.in_(ids))
+    if mentor_id is not None:
+        query = query.where(MentorBooking.mentor_id == mentor_id).where(MentorBooking.slot_start == slot_start)
+    return db.session.execute(query).rowcount
+
+
+def release_lapsed_hold(mentor_id, slot_start):
+    """Expire a lapsed hold on one slot, in the caller's transaction, so the slot can be booked again"""
+    return _expire(mentor_id=mentor_id, slot_start=slot_start) > 0
+
+
+def confirm_hold(booking_id):
+    """Convert a live hold into a confirmed booking, in the caller's transaction; False if it lapsed"""
+    converted = db.session.execute(
+        db.update(MentorBooking)
+        .where(MentorBooking.id == booking_id)
+        .where(MentorBooking.status == 'pending_payment')
+        .where(MentorBooking.hold_expires_at > datetime.utcnow())
+        .values(status='confirmed', hold_expires_at=None)
+    ).rowcount > 0
+    if converted:
+        SLOT_HOLDS.remove(booking_id)
+    return converted
+
+
+def sweep_slot_holds():
+    """before_request hook expiring due holds; never raises
+
+    Holds this worker's wheel expires are marked expired by id. Every
+    SYNC_INTERVAL_SECONDS the holds of all workers are re-read through the
+    (status, hold_expires_at) index, and lapsed ones left by a stopped
+    worker are expired.
+    """
+    global _next_sweep, _next_sync
+    started = time.monotonic()
+    if started < _next_sweep or not _sweep_lock.acquire(blocking=False):
+        return
+    try:
+        _next_sweep = started + SWEEP_INTERVAL_SECONDS
+        now = datetime.utcnow()
+        expired = SLOT_HOLDS.advance(now)
+        if expired:
+            _expire(ids=[hold.booking_id for hold in expired], now=now)
+        if started >= _next_sync:
+            _next_sync = started + SYNC_INTERVAL_SECONDS
+            _expire(now=now)
+            live = db.session.execute(
+                db.select(MentorBooking.id, MentorBooking.mentor_id, MentorBooking.slot_start,
+                          MentorBooking.hold_expires_at)
+                .where(MentorBooking.status == 'pending_payment')
+                .where(MentorBooking.hold_expires_at > now)
+            ).all()
+            SLOT_HOLDS.replace(Hold(*row) for row in live)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        logger.exception('Could not sweep mentor slot holds')
+    finally:
+        _sweep_lock.release()